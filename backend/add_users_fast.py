@@ -9,6 +9,7 @@ import uuid
 from datetime import datetime
 from app.db.session import init_db, get_db
 from sqlalchemy import text
+from app.utils.cuisines import cuisine_mask
 
 FIRST_NAMES = [
     "Emma", "Liam", "Olivia", "Noah", "Ava", "Ethan", "Sophia", "Mason",
@@ -80,12 +81,12 @@ async def add_users_fast(num_users=50):
                     INSERT INTO taste_dna (
                         id, user_id, adventure_score, spice_tolerance,
                         price_sensitivity, cuisine_diversity, ambiance_preference,
-                        preferred_cuisines, dietary_restrictions, quiz_answers,
+                        preferred_cuisines, cuisine_mask, dietary_restrictions, quiz_answers,
                         created_at, updated_at
                     ) VALUES (
                         :id, :user_id, :adventure, :spice,
                         :price, :diversity, :ambiance,
-                        :cuisines, :dietary, :quiz,
+                        :cuisines, :cuisine_mask, :dietary, :quiz,
                         :created_at, :updated_at
                     )
                 """), {
@@ -97,6 +98,7 @@ async def add_users_fast(num_users=50):
                     "diversity": round(random.uniform(0.2, 1.0), 2),
                     "ambiance": random.choice(AMBIANCES),
                     "cuisines": str(cuisines).replace("'", '"'),
+                    "cuisine_mask": cuisine_mask(cuisines),
                     "dietary": "[]",
                     "quiz": "[]",
                     "created_at": datetime.utcnow(),
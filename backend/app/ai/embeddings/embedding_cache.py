@@ -0,0 +1,141 @@
+"""Cache for TasteDNA embeddings.
+
+Keys are a hash of the encoder input vector plus the active model version,
+so identical profiles share one entry and a changed profile or new weights
+never reads a stale embedding. Entries are never wrong, only unused, so
+the LRU bound and the Redis TTL are the only eviction.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.db.redis_client import redis_client
+from app.ai.embeddings.taste_encoder import TasteEmbeddingService, taste_embedding_service
+
+settings = get_settings()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-process LRU, then optional Redis."""
+
+    KEY_PREFIX = "embedding"
+
+    def __init__(
+        self,
+        embedding_service: TasteEmbeddingService = taste_embedding_service,
+        max_entries: int = settings.embedding_cache_size,
+        ttl: int = settings.embedding_cache_ttl,
+    ):
+        self.embedding_service = embedding_service
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def fingerprint(self, taste_dna: Dict) -> str:
+        """Stable key for a TasteDNA dict: hash of its encoder input vector."""
+        features = self.embedding_service._prepare_input(taste_dna)
+        digest = hashlib.sha1(features.astype(np.float32).tobytes())
+        digest.update(self.embedding_service.model_version.encode())
+        return digest.hexdigest()
+
+    def _redis_key(self, fingerprint: str) -> str:
+        return f"{self.KEY_PREFIX}:{fingerprint}"
+
+    def _get_local(self, fingerprint: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._entries.get(fingerprint)
+            if embedding is not None:
+                self._entries.move_to_end(fingerprint)
+            return embedding
+
+    def _put_local(self, fingerprint: str, embedding: List[float]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[fingerprint] = embedding
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_embedding(self, taste_dna: Dict) -> List[float]:
+        """Return the embedding for a TasteDNA dict, encoding only on a miss.
+
+        Args:
+            taste_dna: TasteDNA dict (as from ``TasteDNA.to_dict()``)
+        """
+        fingerprint = self.fingerprint(taste_dna)
+
+        embedding = self._get_local(fingerprint)
+        if embedding is not None:
+            self.hits += 1
+            return embedding
+
+        embedding = await self._redis_get(fingerprint)
+        if embedding is not None:
+            self.redis_hits += 1
+            self._put_local(fingerprint, embedding)
+            return embedding
+
+        self.misses += 1
+        embedding = self.embedding_service.generate_embedding(taste_dna)
+        self._put_local(fingerprint, embedding)
+        await self._redis_set(fingerprint, embedding)
+        return embedding
+
+    # The Redis tier is best-effort: an unreachable server just means a miss
+    async def _redis_get(self, fingerprint: str) -> Optional[List[float]]:
+        try:
+            return await redis_client.get(self._redis_key(fingerprint))
+        except Exception:
+            return None
+
+    async def _redis_set(self, fingerprint: str, embedding: List[float]):
+        try:
+            await redis_client.set(self._redis_key(fingerprint), embedding, ttl=self.ttl)
+        except Exception:
+            pass
+
+    async def invalidate(self, fingerprint: str):
+        """Drop one entry from both tiers."""
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+        try:
+            await redis_client.delete(self._redis_key(fingerprint))
+        except Exception:
+            pass
+
+    def clear(self):
+        """Empty the in-process tier and reset counters."""
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.redis_hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Global cache instance
+embedding_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Dependency to get embedding cache."""
+    return embedding_cache
@@ -1,127 +1,215 @@
-"""PyTorch model for encoding TasteDNA into embeddings."""
+"""Encoding TasteDNA into embeddings.
 
-from typing import List, Dict
+Inference runs on NumPy from exported TasteEncoder weights; torch is only
+imported (from ``torch_encoder``) to create or export those weights.
+"""
+
+import hashlib
+import importlib.util
+import os
+from typing import List, Dict, Optional
 import numpy as np
 
-try:
-    import torch
-    import torch.nn as nn
-    import torch.nn.functional as F
-    TORCH_AVAILABLE = True
-except ImportError:
-    TORCH_AVAILABLE = False
+from app.config import get_settings
+from app.utils.cuisines import CUISINE_TYPES, CUISINE_INDEX
 
+settings = get_settings()
 
-# Cuisine mapping for one-hot encoding
-CUISINE_TYPES = [
-    "italian", "japanese", "mexican", "chinese", "indian", "thai",
-    "french", "mediterranean", "korean", "vietnamese", "american",
-    "middle_eastern", "greek", "spanish", "ethiopian", "brazilian",
-]
+# Checked without importing torch, which is slow and memory-heavy
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
 
 # Ambiance mapping
 AMBIANCE_TYPES = ["casual", "upscale", "cozy", "trendy", "lively"]
 
-
-if TORCH_AVAILABLE:
-    class TasteEncoder(nn.Module):
-        """Neural network for encoding taste profiles into embeddings."""
-
-        def __init__(self, input_dim: int = 64, embedding_dim: int = 512):
-            super().__init__()
-            self.encoder = nn.Sequential(
-                nn.Linear(input_dim, 256),
-                nn.ReLU(),
-                nn.Dropout(0.2),
-                nn.Linear(256, 512),
-                nn.ReLU(),
-                nn.Dropout(0.1),
-                nn.Linear(512, embedding_dim),
-                nn.LayerNorm(embedding_dim),
-            )
-
-        def forward(self, x: torch.Tensor) -> torch.Tensor:
-            """Forward pass - encode input to normalized embedding."""
-            embedding = self.encoder(x)
-            return F.normalize(embedding, p=2, dim=1)
+# Column offsets into the encoder input vector
+AMBIANCE_INDEX = {ambiance: i for i, ambiance in enumerate(AMBIANCE_TYPES)}
+CORE_FEATURES = 4
+CUISINE_OFFSET = CORE_FEATURES
+AMBIANCE_OFFSET = CUISINE_OFFSET + len(CUISINE_TYPES)
+
+
+class NumpyTasteEncoder:
+    """NumPy inference engine for exported TasteEncoder weights.
+
+    Mirrors TasteEncoder.forward in eval mode: three Linear layers with ReLU,
+    LayerNorm, then L2 normalization. Weights come from
+    ``torch_encoder.export_weights``.
+    """
+
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        # Store weights transposed so each layer is a plain ``x @ W``
+        self.w1 = np.ascontiguousarray(weights["w1"].T, dtype=np.float32)
+        self.b1 = np.asarray(weights["b1"], dtype=np.float32)
+        self.w2 = np.ascontiguousarray(weights["w2"].T, dtype=np.float32)
+        self.b2 = np.asarray(weights["b2"], dtype=np.float32)
+        self.w3 = np.ascontiguousarray(weights["w3"].T, dtype=np.float32)
+        self.b3 = np.asarray(weights["b3"], dtype=np.float32)
+        self.ln_weight = np.asarray(weights["ln_weight"], dtype=np.float32)
+        self.ln_bias = np.asarray(weights["ln_bias"], dtype=np.float32)
+        self.ln_eps = float(weights["ln_eps"])
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyTasteEncoder":
+        """Load weights from an .npz file."""
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    @property
+    def input_dim(self) -> int:
+        return self.w1.shape[0]
+
+    @property
+    def embedding_dim(self) -> int:
+        return self.w3.shape[1]
+
+    def fingerprint(self) -> str:
+        """Short digest of the weights, stable across processes."""
+        digest = hashlib.sha1()
+        for array in (self.w1, self.b1, self.w2, self.b2, self.w3, self.b3, self.ln_weight, self.ln_bias):
+            digest.update(array.tobytes())
+        digest.update(np.float32(self.ln_eps).tobytes())
+        return digest.hexdigest()[:16]
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """Encode an (n, input_dim) matrix to (n, embedding_dim) unit vectors."""
+        h = np.maximum(x @ self.w1 + self.b1, 0.0)
+        h = np.maximum(h @ self.w2 + self.b2, 0.0)
+        h = h @ self.w3 + self.b3
+
+        mean = h.mean(axis=1, keepdims=True)
+        var = h.var(axis=1, keepdims=True)
+        h = (h - mean) / np.sqrt(var + self.ln_eps) * self.ln_weight + self.ln_bias
+
+        norm = np.linalg.norm(h, axis=1, keepdims=True)
+        return h / np.maximum(norm, 1e-12)
 
 
 class TasteEmbeddingService:
     """Service for generating taste embeddings."""
 
-    EMBEDDING_DIM = 512
-
-    def __init__(self):
-        self.model = None
-        if TORCH_AVAILABLE:
-            self.model = TasteEncoder(input_dim=64, embedding_dim=self.EMBEDDING_DIM)
-            self.model.eval()
-
-    def _encode_cuisines(self, cuisines: List[str]) -> List[float]:
-        """One-hot encode cuisine preferences."""
-        encoding = [0.0] * len(CUISINE_TYPES)
-        for cuisine in cuisines:
-            cuisine_lower = cuisine.lower().replace(" ", "_")
-            if cuisine_lower in CUISINE_TYPES:
-                idx = CUISINE_TYPES.index(cuisine_lower)
-                encoding[idx] = 1.0
-        return encoding
-
-    def _encode_ambiance(self, ambiance: str) -> List[float]:
-        """One-hot encode ambiance preference."""
-        encoding = [0.0] * len(AMBIANCE_TYPES)
-        if ambiance and ambiance.lower() in AMBIANCE_TYPES:
-            idx = AMBIANCE_TYPES.index(ambiance.lower())
-            encoding[idx] = 1.0
-        return encoding
+    INPUT_DIM = 64
+    EMBEDDING_DIM = settings.embedding_dim
+    DEFAULT_BATCH_SIZE = 1024
+    FALLBACK_SEED = 42
+
+    def __init__(self, weights_path: Optional[str] = None):
+        self.model: Optional[NumpyTasteEncoder] = None
+        # Identifies the active weights; part of every embedding cache key
+        self.model_version = f"fallback-{self.FALLBACK_SEED}-{self.EMBEDDING_DIM}"
+
+        # Fixed random projection used when no encoder weights are available.
+        # Built once from a private Generator, so it never touches global RNG
+        # state and is safe to share across threads. The bias keeps profiles
+        # that are scalar multiples of each other from collapsing together.
+        rng = np.random.default_rng(self.FALLBACK_SEED)
+        scale = 1.0 / np.sqrt(self.INPUT_DIM)
+        self._fallback_projection = (
+            rng.standard_normal((self.INPUT_DIM, self.EMBEDDING_DIM)) * scale
+        ).astype(np.float32)
+        self._fallback_bias = (rng.standard_normal(self.EMBEDDING_DIM) * scale).astype(np.float32)
+
+        if weights_path is None:
+            weights_path = settings.taste_encoder_weights_path
+        if not weights_path:
+            return
+
+        if not os.path.exists(weights_path) and TORCH_AVAILABLE:
+            # First start: one worker initializes the torch model and exports
+            # it (under a file lock), then every worker loads that same file.
+            from app.ai.embeddings.torch_encoder import ensure_initialized_weights
+            ensure_initialized_weights(weights_path, self.INPUT_DIM, self.EMBEDDING_DIM)
+
+        if os.path.exists(weights_path):
+            model = NumpyTasteEncoder.load(weights_path)
+            if (model.input_dim, model.embedding_dim) != (self.INPUT_DIM, self.EMBEDDING_DIM):
+                raise ValueError(
+                    f"Encoder weights {weights_path} have shape "
+                    f"{model.input_dim}->{model.embedding_dim}, "
+                    f"expected {self.INPUT_DIM}->{self.EMBEDDING_DIM}"
+                )
+            self.model = model
+            self.model_version = model.fingerprint()
 
     def _prepare_input(self, taste_dna: Dict) -> np.ndarray:
         """Prepare TasteDNA dict as input vector."""
-        # Core metrics (4 values)
-        core = [
-            taste_dna.get("adventure_score", 0.5),
-            taste_dna.get("spice_tolerance", 0.5),
-            taste_dna.get("price_sensitivity", 0.5),
-            taste_dna.get("cuisine_diversity", 0.5),
-        ]
+        return self._prepare_inputs([taste_dna])[0]
+
+    def _prepare_inputs(self, taste_dnas: List[Dict]) -> np.ndarray:
+        """Prepare TasteDNA dicts as an (n, INPUT_DIM) input matrix.
 
-        # Cuisine encoding (16 values)
-        cuisines = self._encode_cuisines(taste_dna.get("preferred_cuisines", []))
+        Layout per row: 4 core metrics, 16 one-hot cuisines, 5 one-hot
+        ambiances, zero padding up to INPUT_DIM.
+        """
+        n = len(taste_dnas)
+        features = np.zeros((n, self.INPUT_DIM), dtype=np.float32)
+        if n == 0:
+            return features
 
-        # Ambiance encoding (5 values)
-        ambiance = self._encode_ambiance(taste_dna.get("ambiance_preference", "casual"))
+        # Core metrics (4 values)
+        features[:, :CORE_FEATURES] = [
+            (
+                dna.get("adventure_score", 0.5),
+                dna.get("spice_tolerance", 0.5),
+                dna.get("price_sensitivity", 0.5),
+                dna.get("cuisine_diversity", 0.5),
+            )
+            for dna in taste_dnas
+        ]
 
-        # Combine all features
-        features = core + cuisines + ambiance
+        # Collect one-hot positions, then set them in a single scatter
+        rows, cols = [], []
+        for row, dna in enumerate(taste_dnas):
+            for cuisine in dna.get("preferred_cuisines", []) or []:
+                idx = CUISINE_INDEX.get(cuisine.lower().replace(" ", "_"))
+                if idx is not None:
+                    rows.append(row)
+                    cols.append(CUISINE_OFFSET + idx)
 
-        # Pad to 64 dimensions if needed
-        while len(features) < 64:
-            features.append(0.0)
+            ambiance = dna.get("ambiance_preference", "casual")
+            idx = AMBIANCE_INDEX.get(ambiance.lower()) if ambiance else None
+            if idx is not None:
+                rows.append(row)
+                cols.append(AMBIANCE_OFFSET + idx)
 
-        return np.array(features[:64], dtype=np.float32)
+        features[rows, cols] = 1.0
+        return features
 
     def generate_embedding(self, taste_dna: Dict) -> List[float]:
         """Generate embedding vector from TasteDNA."""
-        input_vector = self._prepare_input(taste_dna)
-
-        if TORCH_AVAILABLE and self.model:
-            # Use PyTorch model
-            with torch.no_grad():
-                input_tensor = torch.tensor(input_vector).unsqueeze(0)
-                embedding = self.model(input_tensor)
-                return embedding.squeeze(0).tolist()
-        else:
-            # Fallback: Use input features expanded to embedding dim
-            # This is a simple fallback when PyTorch is not available
-            np.random.seed(int(sum(input_vector) * 1000) % (2**32))
-            embedding = np.random.randn(self.EMBEDDING_DIM).astype(np.float32)
-            # Incorporate actual taste features
-            for i, val in enumerate(input_vector):
-                if val > 0:
-                    embedding[i * 8:(i + 1) * 8] += val
-            # Normalize
-            embedding = embedding / np.linalg.norm(embedding)
-            return embedding.tolist()
+        return self.generate_embeddings([taste_dna])[0].tolist()
+
+    def generate_embeddings(
+        self,
+        taste_dnas: List[Dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> np.ndarray:
+        """Generate embeddings for many TasteDNA dicts at once.
+
+        Builds the input matrix in one go and runs one forward pass per
+        chunk of ``batch_size`` rows. Returns a float32 array of shape
+        (len(taste_dnas), EMBEDDING_DIM) in input order.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        inputs = self._prepare_inputs(taste_dnas)
+        embeddings = np.empty((len(inputs), self.EMBEDDING_DIM), dtype=np.float32)
+
+        for start in range(0, len(inputs), batch_size):
+            chunk = inputs[start:start + batch_size]
+            encode = self.model if self.model is not None else self._fallback_embeddings
+            embeddings[start:start + len(chunk)] = encode(chunk)
+
+        return embeddings
+
+    def _fallback_embeddings(self, inputs: np.ndarray) -> np.ndarray:
+        """Fallback: project input features to embedding dim with a fixed matrix.
+
+        Deterministic and stateless; distinct inputs map to distinct unit vectors.
+        """
+        embeddings = inputs @ self._fallback_projection + self._fallback_bias
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
 
     def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """Compute cosine similarity between two embeddings."""
@@ -0,0 +1,145 @@
+"""PyTorch TasteEncoder model for training and weight export.
+
+Importing this module imports torch. Serving uses the NumPy engine in
+``taste_encoder`` and only needs the exported ``.npz`` weights.
+"""
+
+import argparse
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from app.config import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
+# Max absolute difference allowed between torch and NumPy embeddings
+PARITY_TOLERANCE = 1e-5
+
+
+class TasteEncoder(nn.Module):
+    """Neural network for encoding taste profiles into embeddings."""
+
+    def __init__(self, input_dim: int = 64, embedding_dim: int = 512):
+        super().__init__()
+        self.encoder = nn.Sequential(
+            nn.Linear(input_dim, 256),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(256, 512),
+            nn.ReLU(),
+            nn.Dropout(0.1),
+            nn.Linear(512, embedding_dim),
+            nn.LayerNorm(embedding_dim),
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Forward pass - encode input to normalized embedding."""
+        embedding = self.encoder(x)
+        return F.normalize(embedding, p=2, dim=1)
+
+
+def export_weights(model: TasteEncoder, path: str):
+    """Write TasteEncoder weights to an .npz file for NumPy inference.
+
+    Writes to a temp file and renames it, so concurrently starting workers
+    never load a partial file.
+    """
+    layers = model.encoder
+    linear1, linear2, linear3, layer_norm = layers[0], layers[3], layers[6], layers[7]
+
+    def to_numpy(tensor: torch.Tensor) -> np.ndarray:
+        return tensor.detach().cpu().numpy().astype(np.float32)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            w1=to_numpy(linear1.weight), b1=to_numpy(linear1.bias),
+            w2=to_numpy(linear2.weight), b2=to_numpy(linear2.bias),
+            w3=to_numpy(linear3.weight), b3=to_numpy(linear3.bias),
+            ln_weight=to_numpy(layer_norm.weight), ln_bias=to_numpy(layer_norm.bias),
+            ln_eps=np.float32(layer_norm.eps),
+        )
+    os.replace(tmp_path, path)
+
+
+def export_initialized_weights(path: str, input_dim: int = 64, embedding_dim: int = 512) -> TasteEncoder:
+    """Build a fresh TasteEncoder and export its weights."""
+    model = TasteEncoder(input_dim=input_dim, embedding_dim=embedding_dim)
+    model.eval()
+    export_weights(model, path)
+    return model
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock on `path` (a no-op where fcntl is unavailable)."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_initialized_weights(path: str, input_dim: int = 64, embedding_dim: int = 512) -> bool:
+    """Export freshly initialized weights to `path` unless the file exists.
+
+    Workers starting together serialize on a lock file next to `path` and
+    recheck for the weights once they hold it, so only the first one
+    initializes and every worker then loads that same file. Returns True
+    if this call wrote the weights.
+    """
+    with _file_lock(f"{path}.lock"):
+        if os.path.exists(path):
+            return False
+        export_initialized_weights(path, input_dim, embedding_dim)
+        return True
+
+
+def check_parity(model: TasteEncoder, path: str, num_samples: int = 1024, seed: int = 0) -> float:
+    """Compare torch and NumPy outputs on random inputs.
+
+    Returns the max absolute difference; raises if above PARITY_TOLERANCE.
+    """
+    from app.ai.embeddings.taste_encoder import NumpyTasteEncoder
+
+    engine = NumpyTasteEncoder.load(path)
+    rng = np.random.default_rng(seed)
+    inputs = rng.random((num_samples, engine.input_dim), dtype=np.float32)
+
+    model.eval()
+    with torch.no_grad():
+        expected = model(torch.from_numpy(inputs)).numpy()
+    max_diff = float(np.abs(engine(inputs) - expected).max())
+    if max_diff > PARITY_TOLERANCE:
+        raise ValueError(f"NumPy encoder differs from torch by {max_diff:.2e}")
+    return max_diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export TasteEncoder weights for NumPy inference")
+    parser.add_argument("output", help="Destination .npz path")
+    parser.add_argument("--checkpoint", help="Optional torch state_dict to load before export")
+    parser.add_argument(
+        "--embedding-dim", type=int, default=get_settings().embedding_dim,
+        help="Output dimension (defaults to EMBEDDING_DIM)",
+    )
+    args = parser.parse_args()
+
+    encoder = TasteEncoder(embedding_dim=args.embedding_dim)
+    if args.checkpoint:
+        encoder.load_state_dict(torch.load(args.checkpoint, map_location="cpu"))
+    encoder.eval()
+    export_weights(encoder, args.output)
+    print(f"Exported to {args.output} (max diff vs torch: {check_parity(encoder, args.output):.2e})")
@@ -17,6 +17,7 @@ from app.models.user import User
 from app.models.taste_dna import TasteDNA
 from app.models.date_night import DateNightPairing
 from app.core.exceptions import TasteDNANotFoundException
+from app.utils.cuisines import cuisines_from_mask, shared_cuisines
 
 router = APIRouter()
 
@@ -291,9 +292,7 @@ def _calculate_compatibility(dna1: TasteDNA, dna2: TasteDNA) -> dict:
     score = 1 - (adventure_diff + spice_diff + price_diff + diversity_diff) / 4
 
     # Common cuisines bonus
-    cuisines1 = set(dna1.preferred_cuisines or [])
-    cuisines2 = set(dna2.preferred_cuisines or [])
-    common_cuisines = list(cuisines1 & cuisines2)
+    common_cuisines = shared_cuisines(dna1.preferred_cuisines, dna2.cuisine_mask)
     if common_cuisines:
         score = min(1.0, score + 0.1 * len(common_cuisines))
 
@@ -307,7 +306,7 @@ def _calculate_compatibility(dna1: TasteDNA, dna2: TasteDNA) -> dict:
         "spice_tolerance": min(dna1.spice_tolerance, dna2.spice_tolerance),  # Use lower
         "price_sensitivity": (dna1.price_sensitivity + dna2.price_sensitivity) / 2,
         "cuisine_diversity": (dna1.cuisine_diversity + dna2.cuisine_diversity) / 2,
-        "preferred_cuisines": common_cuisines or list(cuisines1 | cuisines2)[:5],
+        "preferred_cuisines": common_cuisines or cuisines_from_mask(dna1.cuisine_mask | dna2.cuisine_mask)[:5],
         "ambiance_preference": dna1.ambiance_preference or dna2.ambiance_preference,
     }
 
@@ -141,7 +141,7 @@ async def get_saved_restaurants(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get user's saved restaurants - always fetch fresh data from Yelp."""
+    """Get user's saved restaurants with current Yelp data (within the cache freshness SLA)."""
     result = await db.execute(
         select(SavedRestaurant)
         .where(SavedRestaurant.user_id == current_user.id)
@@ -149,22 +149,21 @@ async def get_saved_restaurants(
     )
     saved = result.scalars().all()
 
-    # Always fetch fresh restaurant data from Yelp instead of using stored snapshots
+    # Use current Yelp data instead of stored snapshots; hours / is_closed are
+    # never older than yelp_cache_volatile_max_age
+    restaurants, _ = await yelp_service.get_businesses([s.restaurant_id for s in saved])
     saved_list = []
-    for s in saved:
-        try:
-            # Fetch current data from Yelp API
-            fresh_data = await yelp_service.get_business(s.restaurant_id)
-            saved_list.append({
-                "restaurant_id": s.restaurant_id,
-                "restaurant_name": fresh_data.get("name", s.restaurant_name),
-                "restaurant_data": fresh_data,  # Always use fresh Yelp data
-                "notes": s.notes,
-                "saved_at": s.created_at,
-            })
-        except Exception:
+    for s, fresh_data in zip(saved, restaurants):
+        if fresh_data is None:
             # If restaurant no longer exists on Yelp, skip it
             continue
+        saved_list.append({
+            "restaurant_id": s.restaurant_id,
+            "restaurant_name": fresh_data.get("name", s.restaurant_name),
+            "restaurant_data": fresh_data,
+            "notes": s.notes,
+            "saved_at": s.created_at,
+        })
 
     return saved_list
 
@@ -1,9 +1,12 @@
 """TasteDNA API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, List
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.config import get_settings
+from app.db.session import get_db, async_session_maker
 from app.db.redis_client import redis_client
 from app.schemas.taste_dna import (
     QuizResponse,
@@ -14,10 +17,15 @@ from app.schemas.taste_dna import (
 )
 from app.services.taste_dna_service import taste_dna_service
 from app.services.twin_matching_service import twin_matching_service
+from app.services.twin_graph_service import twin_graph_service
+from app.services.taste_profile_index import taste_profile_index
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.models.taste_dna import TasteDNA
 from app.core.exceptions import TasteDNANotFoundException
 
+settings = get_settings()
+
 router = APIRouter()
 
 
@@ -33,9 +41,37 @@ async def get_quiz_questions(
     )
 
 
+async def _match_exact_twins(db: AsyncSession, user_id: str, taste_dna: TasteDNA) -> List[Dict]:
+    """Exact vector match: store embedding, find and store twins, update reverse edges."""
+    # Store embedding and find twins (the commit also saves the indexed snapshot)
+    await twin_matching_service.store_user_embedding(user_id, taste_dna)
+    twins = await twin_matching_service.find_twins(db, user_id, taste_dna)
+    twin_matching_service.mark_indexed(taste_dna)
+    await twin_matching_service.update_twin_relationships(db, user_id, twins)
+
+    # Invalidate cache for the user who just submitted the quiz
+    await redis_client.invalidate_twin_list(str(user_id))
+
+    # Rescore this user in other users' twin lists (cached lists updated in place)
+    await twin_graph_service.apply_profile_change(db, user_id, taste_dna, twins)
+    return twins
+
+
+async def _refresh_exact_twins(user_id: str):
+    """Background task replacing approximate twins with the exact match."""
+    try:
+        async with async_session_maker() as db:
+            taste_dna = await taste_dna_service.get_user_taste_dna(db, user_id)
+            if taste_dna:
+                await _match_exact_twins(db, user_id, taste_dna)
+    except Exception as e:
+        print(f"⚠ Warning: Exact twin match failed for {user_id}: {e}")
+
+
 @router.post("/quiz/submit", response_model=TasteDNACalculationResult)
 async def submit_quiz(
     submission: QuizSubmission,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -44,27 +80,32 @@ async def submit_quiz(
     taste_dna = await taste_dna_service.create_taste_dna(
         db, current_user.id, submission
     )
-
-    # Store embedding and find twins
-    await twin_matching_service.store_user_embedding(
-        current_user.id, taste_dna
-    )
-    twins = await twin_matching_service.find_twins(
-        db, current_user.id, taste_dna
-    )
-    await twin_matching_service.update_twin_relationships(
-        db, current_user.id, twins
-    )
-
-    # Invalidate cache for the current user (who just submitted the quiz)
-    current_user_cache_key = f"twins:{current_user.id}"
-    await redis_client.delete(current_user_cache_key)
-
-    # Invalidate cache for all users who have this user as a twin
-    # So their twin lists will be refreshed on next request
-    for twin in twins:
-        twin_cache_key = f"twins:{twin['twin_id']}"
-        await redis_client.delete(twin_cache_key)
+    taste_profile_index.upsert(str(current_user.id), taste_dna)
+
+    # A retake that barely changed the profile keeps its current twins
+    if not twin_matching_service.should_refresh(taste_dna):
+        twins = await twin_matching_service.get_user_twins(db, current_user.id)
+        return TasteDNACalculationResult(
+            taste_dna=TasteDNAResponse.model_validate(taste_dna),
+            twin_count=len(twins),
+            top_twin_similarity=twins[0]["similarity_score"] if twins else None,
+        )
+
+    # Answer from the local LSH index; the exact vector match runs after
+    # the response is sent and replaces these twins
+    twins = None
+    if settings.twin_lsh_enabled:
+        twins = await twin_matching_service.find_approximate_twins(
+            db, current_user.id, taste_dna
+        )
+    if twins is not None:
+        await twin_matching_service.update_twin_relationships(
+            db, current_user.id, twins
+        )
+        await redis_client.invalidate_twin_list(str(current_user.id))
+        background_tasks.add_task(_refresh_exact_twins, str(current_user.id))
+    else:
+        twins = await _match_exact_twins(db, current_user.id, taste_dna)
 
     # Get top twin similarity
     top_similarity = twins[0]["similarity_score"] if twins else None
@@ -91,12 +132,13 @@ async def get_taste_dna_profile(
 @router.post("/regenerate", response_model=TasteDNACalculationResult)
 async def regenerate_taste_dna(
     submission: QuizSubmission,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Retake quiz and regenerate Taste DNA."""
     # Same as submit, but explicitly for retaking
-    return await submit_quiz(submission, current_user, db)
+    return await submit_quiz(submission, background_tasks, current_user, db)
 
 
 @router.get("/card", response_model=TasteDNACard)
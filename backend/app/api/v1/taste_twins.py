@@ -1,14 +1,15 @@
 """Taste Twins API endpoints."""
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.db.session import get_db
 from app.services.twin_matching_service import twin_matching_service
+from app.services.twin_refresh_scheduler import twin_refresh_scheduler
 from app.services.taste_dna_service import taste_dna_service
 from app.dependencies import get_current_user
 from app.models.user import User
@@ -33,6 +34,8 @@ class TwinsListResponse(BaseModel):
     """Response for twins list."""
     twins: List[TwinResponse]
     total_count: int
+    next_cursor: Optional[str] = None
+    extending: bool = False  # Deeper twins are being fetched in the background; retry an empty page shortly
 
 
 class TwinCountResponse(BaseModel):
@@ -42,14 +45,31 @@ class TwinCountResponse(BaseModel):
 
 @router.get("", response_model=TwinsListResponse)
 async def get_taste_twins(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(twin_matching_service.DEFAULT_PAGE_SIZE, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get user's Taste Twins."""
-    twins = await twin_matching_service.get_user_twins(db, current_user.id)
+    """Get user's Taste Twins, one page at a time."""
+    page = await twin_matching_service.get_twins_page(db, current_user.id, cursor, limit)
+
+    # New users with few stored twins get the minimum-twins backfill
+    if cursor is None and page["total_count"] < twin_matching_service.MIN_TWINS:
+        twins = await twin_matching_service.get_user_twins(db, current_user.id)
+        return TwinsListResponse(
+            twins=[TwinResponse(**t) for t in twins[:limit]],
+            total_count=len(twins),
+        )
+
+    # Deeper matches are fetched in the background, not in this request
+    if page["extend_to"] is not None:
+        twin_refresh_scheduler.request_extend(current_user.id, page["extend_to"])
+
     return TwinsListResponse(
-        twins=[TwinResponse(**t) for t in twins],
-        total_count=len(twins),
+        twins=[TwinResponse(**t) for t in page["twins"]],
+        total_count=page["total_count"],
+        next_cursor=page["next_cursor"],
+        extending=page["extend_to"] is not None,
     )
 
 
@@ -84,15 +104,20 @@ async def get_twin_profile(
 
 @router.post("/refresh", response_model=TwinsListResponse)
 async def refresh_twins(
+    force: bool = Query(False, description="Rematch even if the profile barely changed"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Refresh twin matching."""
+    """Queue a twin refresh and return the currently stored twins.
+
+    Matching runs in the background scheduler, not in the request.
+    """
     taste_dna = await taste_dna_service.get_user_taste_dna(db, current_user.id)
     if not taste_dna:
         raise TasteDNANotFoundException()
 
-    twins = await twin_matching_service.refresh_twins(db, current_user.id)
+    twin_refresh_scheduler.request_refresh(current_user.id, force=force)
+    twins = await twin_matching_service.get_user_twins(db, current_user.id)
     return TwinsListResponse(
         twins=[TwinResponse(**t) for t in twins],
         total_count=len(twins),
@@ -31,8 +31,64 @@ class Settings(BaseSettings):
     pinecone_environment: str = ""
     pinecone_index_name: str = "tastesync-embeddings"
 
+    # Vector store backend: "pinecone" or "local" (in-process index)
+    vector_backend: str = "pinecone"
+    local_vector_index_path: str = ""  # Optional .npz snapshot for the local index
+    local_vector_storage: str = "float32"  # float32, float16 or int8; lowering EMBEDDING_DIM saves far more memory
+    local_vector_rescore: bool = False  # Re-rank quantized candidates at float32 (keeps the float32 rows too)
+    local_vector_rescore_factor: int = 4  # Candidates rescored = top_k * factor
+    local_vector_save_interval: int = 300  # Seconds between snapshot saves (0 = only at shutdown)
+    vector_store_timeout: float = 5.0  # Seconds per vector store call
+    vector_store_max_concurrency: int = 8  # Concurrent vector store calls per worker
+
+    # Taste encoder weights (.npz exported from the torch TasteEncoder)
+    taste_encoder_weights_path: str = "./taste_encoder.npz"
+    embedding_dim: int = 512  # Encoder output / vector index dimension
+    embedding_cache_size: int = 10000  # In-process LRU entries (0 disables)
+    embedding_cache_ttl: int = 86400  # Seconds embeddings stay in the Redis tier
+
+    # Taste Twins
+    twin_default_top_k: int = 50  # Twins matched and stored per quiz / refresh
+    twin_max_top_k: int = 10000  # Deepest a client can page (Pinecone's top_k cap)
+    twin_reverse_candidates: int = 200  # Neighbours checked for reverse-edge admission on a profile change
+    twin_profile_index_ttl: int = 3600  # Seconds before the in-memory MIN_TWINS backfill index is reloaded
+    twin_lsh_enabled: bool = True  # Answer quiz submissions from the LSH index, exact match in background
+    twin_lsh_seed: int = 1729  # Hyperplane seed for the LSH index
+    twin_lsh_reload_interval: int = 3600  # Seconds between LSH index reloads (picks up other workers' users)
+    twin_refresh_min_distance: float = 0.0005  # Embedding cosine distance below which a twin refresh is skipped
+    twin_refresh_scheduler_enabled: bool = True  # Refresh stale twin lists in a background loop
+    twin_refresh_interval: int = 300  # Seconds between stale-twin scans
+    twin_refresh_stale_after: int = 86400  # Twin lists older than this are refreshed
+    twin_refresh_active_window: int = 604800  # Interactions within this window put a user first
+    twin_refresh_batch_size: int = 200  # Stale users picked per scan
+    twin_refresh_concurrency: int = 4  # Refreshes running at once
+    twin_refresh_per_minute: int = 120  # Max refreshes started per minute
+
     # Yelp API
     yelp_api_key: str = ""
+    yelp_quota_enabled: bool = True  # Rate-limit Yelp calls through the shared token bucket
+    yelp_quota_per_second: float = 10.0  # Tokens added per second, across all workers
+    yelp_quota_burst: int = 20  # Bucket size
+    yelp_coalesce_enabled: bool = True  # Share one upstream call between identical concurrent requests
+    yelp_coalesce_wait: float = 5.0  # Seconds to wait for another worker's in-flight result
+    yelp_coalesce_cross_worker: bool = True  # Also coalesce across workers via Redis (2 round trips per upstream call)
+    yelp_bulk_concurrency: int = 8  # Concurrent Yelp calls per bulk business fetch
+    yelp_cache_size: int = 5000  # In-process LRU entries (0 disables)
+    yelp_cache_business_ttl: int = 3600  # Seconds business details are fresh
+    yelp_cache_reviews_ttl: int = 3600  # Seconds reviews are fresh
+    yelp_cache_search_ttl: int = 600  # Seconds search / phone results are fresh
+    yelp_cache_autocomplete_ttl: int = 86400  # Seconds autocomplete suggestions are fresh
+    yelp_cache_max_stale: int = 86400  # Seconds past TTL an entry is served while it refreshes
+    yelp_cache_volatile_ttl: int = 300  # Seconds hours / is_closed data is fresh
+    yelp_cache_volatile_max_age: int = 900  # Oldest hours / is_closed data ever served
+
+    # Shared outbound HTTP client (Yelp Fusion and Yelp AI)
+    http_max_connections: int = 100  # Open connections across all hosts
+    http_max_keepalive_connections: int = 20  # Idle connections kept for reuse
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    http_connect_timeout: float = 5.0  # Seconds to connect / wait for a pooled connection
+    http_read_timeout: float = 30.0  # Seconds to wait for response data
+    http_http2: bool = False  # Negotiate HTTP/2 (needs the 'h2' package)
 
     # OpenAI
     openai_api_key: str = ""
@@ -56,6 +56,16 @@ class QuizNotCompletedException(TasteSyncException):
         )
 
 
+class InvalidCursorException(TasteSyncException):
+    """Malformed pagination cursor exception."""
+
+    def __init__(self):
+        super().__init__(
+            detail="Invalid pagination cursor",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
 class YelpAPIException(TasteSyncException):
     """Yelp API error exception."""
 
@@ -63,6 +73,15 @@ class YelpAPIException(TasteSyncException):
         super().__init__(detail=detail, status_code=status.HTTP_502_BAD_GATEWAY)
 
 
+class YelpQuotaExceededException(YelpAPIException):
+    """Yelp call could not get a rate-limit token in time."""
+
+    def __init__(self, endpoint: str = None):
+        detail = f"Yelp API quota exhausted for {endpoint}" if endpoint else "Yelp API quota exhausted"
+        super().__init__(detail=f"{detail}; try again shortly")
+        self.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
 class PineconeException(TasteSyncException):
     """Pinecone vector database exception."""
 
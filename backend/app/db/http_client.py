@@ -0,0 +1,79 @@
+"""Shared pooled HTTP client for outbound API calls."""
+
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class HTTPClient:
+    """Application-scoped httpx.AsyncClient wrapper.
+
+    One client (and so one connection pool) is shared by every outbound
+    caller, so repeated requests to the same host reuse kept-alive
+    connections instead of paying a TCP and TLS handshake each time.
+    Opened in the app lifespan; code running outside it (scripts) gets a
+    client created on first use.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build(self) -> httpx.AsyncClient:
+        http2 = settings.http_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠ Warning: HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.http_connect_timeout,
+                read=settings.http_read_timeout,
+                write=settings.http_read_timeout,
+                pool=settings.http_connect_timeout,
+            ),
+        )
+
+    async def connect(self):
+        """Create the shared client."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+
+    async def disconnect(self):
+        """Close the shared client and its pooled connections."""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it if the lifespan has not."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the shared client is open."""
+        return self._client is not None and not self._client.is_closed
+
+
+# Global HTTP client instance
+http_client = HTTPClient()
+
+
+async def get_http_client() -> HTTPClient:
+    """Dependency to get the shared HTTP client."""
+    return http_client
@@ -0,0 +1,597 @@
+"""In-process vector index for Taste Twin matching without Pinecone."""
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Set
+
+import numpy as np
+
+from app.config import get_settings
+from app.core.exceptions import PineconeException
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process may write the snapshot
+    fcntl = None
+
+settings = get_settings()
+
+
+class _Namespace:
+    """Contiguous storage for one namespace.
+
+    Float32 storage scans the raw vectors directly. Quantized storage
+    (float16 or int8) scans unit-normalized codes instead, keeping the
+    float32 vectors only when they are needed for rescoring.
+
+    Metadata fields used in filters get an integer code column, built on
+    the first query that filters on them and kept current on upsert and
+    delete, so a filter is one array comparison per field.
+    """
+
+    INITIAL_CAPACITY = 1024
+    SCAN_BLOCK_ROWS = 16384
+    INT8_MAX = 127.0
+
+    def __init__(self, dim: int, storage: str = "float32", keep_full: bool = True):
+        self.dim = dim
+        self.storage = np.dtype(storage)
+        self.quantized = self.storage != np.float32
+        self.keep_full = keep_full or not self.quantized
+
+        capacity = self.INITIAL_CAPACITY
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32) if self.keep_full else None
+        self.codes = np.zeros((capacity, dim), dtype=self.storage) if self.quantized else None
+        self.inv_norms = np.zeros(capacity, dtype=np.float32)
+        self.scales = np.zeros(capacity, dtype=np.float32) if self.quantized else None
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+        self.field_codes: Dict[str, np.ndarray] = {}
+        self.field_values: Dict[str, Dict[Any, int]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by vector storage (excluding ids and metadata)."""
+        arrays = (self.vectors, self.codes, self.inv_norms, self.scales)
+        return sum(a[:self.size].nbytes for a in arrays if a is not None)
+
+    def _grow(self, needed: int):
+        capacity = len(self.inv_norms)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+
+        def resized(array):
+            if array is None:
+                return None
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            return grown
+
+        self.vectors = resized(self.vectors)
+        self.codes = resized(self.codes)
+        self.inv_norms = resized(self.inv_norms)
+        self.scales = resized(self.scales)
+        self.field_codes = {field: resized(codes) for field, codes in self.field_codes.items()}
+
+    def _quantize(self, unit: np.ndarray):
+        """Return (codes, scale) such that codes * scale ~= unit."""
+        if self.storage == np.int8:
+            peak = float(np.abs(unit).max())
+            scale = peak / self.INT8_MAX if peak > 0 else 1.0
+            return np.rint(unit / scale).astype(np.int8), scale
+        return unit.astype(self.storage), 1.0
+
+    def upsert(self, vector_id: str, values: np.ndarray, metadata: Dict[str, Any]):
+        row = self.positions.get(vector_id)
+        if row is None:
+            self._grow(self.size + 1)
+            row = self.size
+            self.positions[vector_id] = row
+            self.ids.append(vector_id)
+            self.metadata.append(dict(metadata))
+        else:
+            self.metadata[row] = dict(metadata)
+        for field, codes in self.field_codes.items():
+            codes[row] = self._code(field, metadata.get(field))
+
+        norm = float(np.linalg.norm(values))
+        inv_norm = 1.0 / norm if norm > 0 else 0.0
+        self.inv_norms[row] = inv_norm
+        if self.vectors is not None:
+            self.vectors[row] = values
+        if self.quantized:
+            self.codes[row], self.scales[row] = self._quantize(values * inv_norm)
+
+    def delete(self, vector_id: str):
+        row = self.positions.pop(vector_id, None)
+        if row is None:
+            return
+        # Swap-remove keeps the matrix contiguous
+        last = self.size - 1
+        if row != last:
+            last_id = self.ids[last]
+            for array in (self.vectors, self.codes, self.inv_norms, self.scales, *self.field_codes.values()):
+                if array is not None:
+                    array[row] = array[last]
+            self.ids[row] = last_id
+            self.metadata[row] = self.metadata[last]
+            self.positions[last_id] = row
+        self.ids.pop()
+        self.metadata.pop()
+        self.inv_norms[last] = 0.0
+
+    def values(self, rows) -> np.ndarray:
+        """Stored vectors for ``rows`` (dequantized when float32 was dropped)."""
+        if self.vectors is not None:
+            return self.vectors[rows]
+        scale = self.scales[rows] / np.maximum(self.inv_norms[rows], 1e-12)
+        return self.codes[rows].astype(np.float32) * np.asarray(scale)[..., None]
+
+    def scan_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine scores of every row against a unit-norm query."""
+        n = self.size
+        if not self.quantized:
+            return (self.vectors[:n] @ query) * self.inv_norms[:n]
+
+        # BLAS has no float16/int8 GEMV; upcast one cache-sized block at a time
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, self.SCAN_BLOCK_ROWS):
+            end = min(start + self.SCAN_BLOCK_ROWS, n)
+            scores[start:end] = self.codes[start:end].astype(np.float32) @ query
+        scores *= self.scales[:n]
+        return scores
+
+    def exact_scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Full-precision cosine scores for ``rows``."""
+        return (self.vectors[rows] @ query) * self.inv_norms[rows]
+
+    @staticmethod
+    def _value_key(value: Any) -> Any:
+        """Dict key for a metadata value; lists and dicts are keyed by their JSON."""
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return ("json", json.dumps(value, sort_keys=True, default=str))
+
+    def _code(self, field: str, value: Any) -> int:
+        values = self.field_values[field]
+        return values.setdefault(self._value_key(value), len(values))
+
+    def _field_column(self, field: str) -> np.ndarray:
+        codes = self.field_codes.get(field)
+        if codes is None:
+            self.field_values[field] = {}
+            codes = np.zeros(len(self.inv_norms), dtype=np.int32)
+            for row, meta in enumerate(self.metadata):
+                codes[row] = self._code(field, meta.get(field))
+            self.field_codes[field] = codes
+        return codes[:self.size]
+
+    def filter_mask(self, filter_dict: Dict) -> np.ndarray:
+        """Boolean row mask for Pinecone-style equality filters."""
+        conditions = []
+        for field, condition in filter_dict.items():
+            if isinstance(condition, dict):
+                if set(condition) != {"$eq"}:
+                    raise PineconeException(f"Unsupported filter operator for '{field}': {condition}")
+                conditions.append((field, condition["$eq"]))
+            else:
+                conditions.append((field, condition))
+
+        mask = np.ones(self.size, dtype=bool)
+        for field, value in conditions:
+            column = self._field_column(field)
+            code = self.field_values[field].get(self._value_key(value))
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= column == code
+        return mask
+
+
+class LocalVectorIndex:
+    """In-memory vector index with the PineconeClient interface.
+
+    Vectors live in a contiguous matrix per namespace; queries are a single
+    matrix-vector product followed by ``argpartition`` for top-k. Scores are
+    cosine similarities, matching the Pinecone index metric.
+
+    With ``storage="float16"`` or ``"int8"`` the scan runs over quantized
+    codes; when ``rescore`` is on, the top ``top_k * rescore_factor``
+    candidates are re-ranked against the float32 vectors. Rescoring keeps
+    those vectors in memory as well, so quantized storage only saves
+    memory with it off, and quantized scans are slower than float32 ones
+    (no BLAS kernel for float16/int8). Lowering EMBEDDING_DIM cuts memory
+    and scan time far more (see benchmark_vector_index.py).
+
+    Index work runs on a small thread pool, like the Pinecone SDK calls, so
+    scans never block the event loop. With a snapshot path, start_loading()
+    loads the snapshot (or rebuilds from TasteDNA when there is none) and
+    saves it every save_interval seconds. Only the worker holding
+    ``<snapshot>.lock`` writes the snapshot, and it writes a temporary file
+    and renames it, so readers never see a partial file.
+    """
+
+    EMBEDDING_DIM = settings.embedding_dim
+    DEFAULT_NAMESPACE = "taste_embeddings"
+    STORAGE_TYPES = ("float32", "float16", "int8")
+    REBUILD_CHUNK_ROWS = 5000
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        storage: str = "float32",
+        rescore: bool = False,
+        rescore_factor: int = 4,
+        save_interval: int = 0,
+    ):
+        if storage not in self.STORAGE_TYPES:
+            raise ValueError(f"Unsupported vector storage '{storage}', expected one of {self.STORAGE_TYPES}")
+        self.snapshot_path = self.snapshot_file(snapshot_path) if snapshot_path else None
+        self.storage = storage
+        self.rescore = rescore
+        self.rescore_factor = max(1, rescore_factor)
+        self.save_interval = save_interval
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.vector_store_max_concurrency,
+            thread_name_prefix="local-vectors",
+        )
+        self._initialized = False
+        self._owner_lock = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._touched: Optional[Set[str]] = None  # Ids written while a rebuild runs
+        self._version = 0  # Bumped on every write
+        self._saved_version = 0
+
+    @staticmethod
+    def snapshot_file(path: str) -> str:
+        """Snapshot path with the .npz suffix numpy adds on save."""
+        return path if path.endswith(".npz") else f"{path}.npz"
+
+    @property
+    def owns_snapshot(self) -> bool:
+        return self._owner_lock is not None or (fcntl is None and bool(self.snapshot_path))
+
+    def initialize(self):
+        """Claim the snapshot if no other worker has; loading is start_loading()'s job."""
+        if self._initialized:
+            return
+        self._claim_snapshot()
+        self._initialized = True
+
+    def _claim_snapshot(self) -> bool:
+        """Take the snapshot writer lock without blocking; held until shutdown."""
+        if not self.snapshot_path or fcntl is None or self._owner_lock is not None:
+            return self.owns_snapshot
+        try:
+            handle = open(f"{self.snapshot_path}.lock", "a")
+        except OSError as e:
+            print(f"⚠ Warning: Local vector index lock file unavailable: {e}")
+            return False
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()  # Another worker writes the snapshot
+            return False
+        self._owner_lock = handle
+        return True
+
+    async def _run(self, func, *args):
+        """Run index work on the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _namespace(self, namespace: Optional[str], create: bool = False) -> Optional[_Namespace]:
+        namespace = namespace or self.DEFAULT_NAMESPACE
+        ns = self._namespaces.get(namespace)
+        if ns is None and create:
+            ns = self._namespaces[namespace] = self._new_namespace()
+        return ns
+
+    def _new_namespace(self) -> _Namespace:
+        return _Namespace(self.EMBEDDING_DIM, storage=self.storage, keep_full=self.rescore)
+
+    def _as_vector(self, values) -> np.ndarray:
+        vector = np.asarray(values, dtype=np.float32)
+        if vector.shape != (self.EMBEDDING_DIM,):
+            raise PineconeException(
+                f"Vector dimension {vector.shape} does not match index dimension {self.EMBEDDING_DIM}"
+            )
+        return vector
+
+    def _upsert(self, namespace: Optional[str], items: List, skip: Optional[Set[str]] = None):
+        with self._lock:
+            ns = self._namespace(namespace, create=True)
+            for vector_id, values, metadata in items:
+                if skip and vector_id in skip:
+                    continue
+                ns.upsert(vector_id, values, metadata)
+                if skip is None and self._touched is not None:
+                    self._touched.add(vector_id)
+            self._version += 1
+
+    async def upsert_user_embedding(
+        self,
+        user_id: str,
+        embedding: List[float],
+        metadata: Dict[str, Any],
+        namespace: str = None,
+    ):
+        """Store or update user taste embedding."""
+        vector = self._as_vector(embedding)
+        await self._run(self._upsert, namespace, [(user_id, vector, metadata)])
+
+    def _search(
+        self,
+        user_id: str,
+        query: np.ndarray,
+        top_k: int,
+        namespace: Optional[str],
+        filter_dict: Optional[Dict],
+    ) -> List[Dict]:
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None or ns.size == 0:
+                return []
+
+            scores = ns.scan_scores(query)
+
+            candidates = np.arange(ns.size)
+            if filter_dict:
+                candidates = candidates[ns.filter_mask(filter_dict)]
+
+            self_row = ns.positions.get(user_id)
+            if self_row is not None:
+                candidates = candidates[candidates != self_row]
+
+            rescoring = ns.quantized and ns.keep_full
+            shortlist = top_k * self.rescore_factor if rescoring else top_k
+            if len(candidates) > shortlist:
+                top = np.argpartition(-scores[candidates], shortlist - 1)[:shortlist]
+                candidates = candidates[top]
+
+            if rescoring:
+                scores[candidates] = ns.exact_scores(candidates, query)
+                if len(candidates) > top_k:
+                    top = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+                    candidates = candidates[top]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            return [
+                {
+                    "user_id": ns.ids[row],
+                    "similarity_score": float(scores[row]),
+                    "metadata": dict(ns.metadata[row]),
+                }
+                for row in candidates
+            ]
+
+    async def find_taste_twins(
+        self,
+        user_id: str,
+        embedding: List[float],
+        top_k: int = 10,
+        namespace: str = None,
+        filter_dict: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """Find users with similar taste profiles (Taste Twins)."""
+        query = self._as_vector(embedding)
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0 or top_k <= 0:
+            return []
+        return await self._run(self._search, user_id, query / query_norm, top_k, namespace, filter_dict)
+
+    def _get(self, user_id: str, namespace: Optional[str]) -> Optional[Dict]:
+        with self._lock:
+            ns = self._namespace(namespace)
+            row = ns.positions.get(user_id) if ns else None
+            if row is None:
+                return None
+            return {
+                "embedding": ns.values(row).tolist(),
+                "metadata": dict(ns.metadata[row]),
+            }
+
+    async def get_user_embedding(
+        self,
+        user_id: str,
+        namespace: str = None,
+    ) -> Optional[Dict]:
+        """Retrieve user's stored embedding."""
+        return await self._run(self._get, user_id, namespace)
+
+    def _delete(self, user_id: str, namespace: Optional[str]):
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns:
+                ns.delete(user_id)
+            if self._touched is not None:
+                self._touched.add(user_id)
+            self._version += 1
+
+    async def delete_user_embedding(
+        self,
+        user_id: str,
+        namespace: str = None,
+    ):
+        """Delete user's embedding."""
+        await self._run(self._delete, user_id, namespace)
+
+    async def batch_upsert(
+        self,
+        vectors: List[Dict],
+        namespace: str = None,
+        batch_size: int = 100,
+    ):
+        """Batch upsert multiple vectors."""
+        prepared = [
+            (v["id"], self._as_vector(v["values"]), v.get("metadata") or {})
+            for v in vectors
+        ]
+        await self._run(self._upsert, namespace, prepared)
+
+    async def get_index_stats(self) -> Dict:
+        """Get index statistics.
+
+        Reads sizes without the lock (which executor scans hold), so a
+        concurrent write may or may not be counted yet.
+        """
+        namespaces = {
+            name: {"vector_count": ns.size, "storage_bytes": ns.nbytes}
+            for name, ns in list(self._namespaces.items())
+        }
+        return {
+            "dimension": self.EMBEDDING_DIM,
+            "storage": self.storage,
+            "namespaces": namespaces,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+        }
+
+    async def get_total_user_count(self, namespace: str = None) -> int:
+        """Get total count of users in the index (lock-free, like get_index_stats)."""
+        ns = self._namespace(namespace)
+        return ns.size if ns else 0
+
+    async def rebuild(self, session_factory):
+        """Embed every TasteDNA row into the default namespace, a chunk at a time.
+
+        Users upserted or deleted through the API while this runs keep
+        that newer state.
+        """
+        from sqlalchemy import select
+
+        from app.models.taste_dna import TasteDNA
+        from app.services.twin_matching_service import twin_matching_service
+
+        embed = twin_matching_service.embedding_service.generate_embeddings
+        async with session_factory() as db:
+            result = await db.stream(select(TasteDNA))
+            async for rows in result.scalars().partitions(self.REBUILD_CHUNK_ROWS):
+                embeddings = await self._run(embed, [dna.to_dict() for dna in rows])
+                items = [
+                    (
+                        dna.user_id,
+                        embedding,
+                        twin_matching_service.build_embedding_metadata(dna.user_id, dna),
+                    )
+                    for dna, embedding in zip(rows, embeddings)
+                ]
+                await self._run(self._upsert, None, items, self._touched)
+
+    def start_loading(self, session_factory):
+        """Load the snapshot, or rebuild from the database, then save periodically.
+
+        Runs as a background task (from app startup); queries see an empty
+        index until the load finishes.
+        """
+        async def run():
+            with self._lock:
+                self._touched = set()
+            try:
+                if self.snapshot_path and os.path.exists(self.snapshot_path):
+                    await self._run(self.load, self.snapshot_path)
+                    source = "snapshot"
+                else:
+                    await self.rebuild(session_factory)
+                    source = "database"
+                print(f"✓ Local vector index loaded from {source} ({await self.get_total_user_count()} users)")
+            except Exception as e:
+                print(f"⚠ Warning: Local vector index load failed: {e}")
+            finally:
+                with self._lock:
+                    self._touched = None
+
+            while self.snapshot_path and self.save_interval > 0:
+                await asyncio.sleep(self.save_interval)
+                try:
+                    await self._run(self.save)
+                except Exception as e:
+                    print(f"⚠ Warning: Local vector index snapshot save failed: {e}")
+
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(run())
+
+    def shutdown(self):
+        """Stop the background task, release executor threads and the snapshot lock."""
+        if self._load_task is not None:
+            self._load_task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._owner_lock is not None:
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """Write all namespaces to an .npz snapshot; returns True if written.
+
+        Without ``path`` this writes the configured snapshot, and only from
+        the worker that owns it and only when something changed since the
+        last save.
+        """
+        if path is None:
+            if not self.snapshot_path or not self._claim_snapshot():
+                return False
+            if self._version == self._saved_version:
+                return False
+            path = self.snapshot_path
+        path = self.snapshot_file(path)
+
+        arrays = {}
+        manifest = {}
+        with self._lock:
+            version = self._version
+            for i, (name, ns) in enumerate(self._namespaces.items()):
+                arrays[f"vectors_{i}"] = ns.values(np.arange(ns.size))
+                manifest[name] = {"slot": i, "ids": list(ns.ids), "metadata": list(ns.metadata)}
+        arrays["manifest"] = np.array(json.dumps(manifest))
+
+        # Saving to a file object keeps numpy from appending another suffix
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if path == self.snapshot_path:
+            self._saved_version = version
+        return True
+
+    def load(self, path: str):
+        """Replace index contents with an .npz snapshot."""
+        with np.load(self.snapshot_file(path)) as data:
+            manifest = json.loads(str(data["manifest"]))
+            namespaces = {}
+            for name, entry in manifest.items():
+                ns = self._new_namespace()
+                vectors = data[f"vectors_{entry['slot']}"]
+                for vector_id, values, metadata in zip(entry["ids"], vectors, entry["metadata"]):
+                    ns.upsert(vector_id, values, metadata)
+                namespaces[name] = ns
+        with self._lock:
+            if self._touched:
+                # Writes made while the snapshot was read are newer than it
+                for name in set(namespaces) | set(self._namespaces):
+                    ns = namespaces.setdefault(name, self._new_namespace())
+                    current = self._namespaces.get(name)
+                    for vector_id in self._touched:
+                        row = current.positions.get(vector_id) if current else None
+                        if row is None:
+                            ns.delete(vector_id)
+                        else:
+                            ns.upsert(vector_id, current.values(row), current.metadata[row])
+            else:
+                self._saved_version = self._version
+            self._namespaces = namespaces
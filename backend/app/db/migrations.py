@@ -0,0 +1,145 @@
+"""In-place schema upgrades for columns added after tables were created.
+
+``Base.metadata.create_all`` creates missing tables but never alters
+existing ones, so columns added to a model later are listed here and added
+on startup when the table lacks them, and model indexes missing from the
+live tables are created. Every step is guarded by inspecting the live
+table, so running it again (or from several workers at once) is harmless. Columns derived from other columns are backfilled afterwards.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import Column, bindparam, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.cuisines import cuisine_mask
+
+BACKFILL_BATCH_ROWS = 5000
+
+# (table, column) pairs added to existing models, in the order they shipped
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    ("users", "twin_threshold"),
+    ("users", "twin_count"),
+    ("users", "twins_refreshed_at"),
+    ("taste_dna", "cuisine_mask"),
+    ("taste_dna", "indexed_profile"),
+    ("users", "twins_exhausted"),
+]
+
+
+def _existing_columns(sync_conn, table: str) -> set:
+    inspector = inspect(sync_conn)
+    if not inspector.has_table(table):
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _add_column_sql(column: Column, dialect) -> str:
+    """ALTER TABLE statement adding a model column to its table."""
+    sql = f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}"
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        sql += f" DEFAULT {default!r}" if not isinstance(default, bool) else f" DEFAULT {str(default).upper()}"
+    if not column.nullable:
+        sql += " NOT NULL"
+    return sql
+
+
+async def upgrade_schema(engine: AsyncEngine):
+    """Add any ADDED_COLUMNS missing from existing tables, create missing indexes, then backfill."""
+    from app.db.session import Base
+
+    for table_name, column_name in ADDED_COLUMNS:
+        table = Base.metadata.tables[table_name]
+        column = table.columns[column_name]
+        async with engine.connect() as conn:
+            existing = await conn.run_sync(_existing_columns, table_name)
+        if not existing or column_name in existing:
+            continue  # Table just created with the column, or already upgraded
+
+        try:
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql(_add_column_sql(column, conn.dialect))
+            print(f"✓ Added column {table_name}.{column_name}")
+        except Exception as e:
+            # Another worker may have added it first
+            async with engine.connect() as conn:
+                existing = await conn.run_sync(_existing_columns, table_name)
+            if column_name not in existing:
+                print(f"⚠ Warning: Could not add column {table_name}.{column_name}: {e}")
+
+    await create_missing_indexes(engine)
+    await backfill_cuisine_masks(engine)
+
+
+def _missing_indexes(sync_conn, metadata) -> List:
+    inspector = inspect(sync_conn)
+    missing = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+async def create_missing_indexes(engine: AsyncEngine):
+    """Create model indexes that existing tables lack.
+
+    Covers indexes declared after a table was created, whether or not
+    they came with a new column. create(checkfirst=True) makes a race
+    with another worker harmless.
+    """
+    from app.db.session import Base
+
+    async with engine.connect() as conn:
+        missing = await conn.run_sync(_missing_indexes, Base.metadata)
+    for index in missing:
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+            print(f"✓ Created index {index.name} on {index.table.name}")
+        except Exception as e:
+            print(f"⚠ Warning: Could not create index {index.name}: {e}")
+
+
+async def backfill_cuisine_masks(engine: AsyncEngine) -> int:
+    """Set taste_dna.cuisine_mask on rows that list cuisines but have mask 0.
+
+    Covers rows from before the column existed and rows inserted with raw
+    SQL, which bypasses the TasteDNA validator. Rows with no known
+    cuisines keep mask 0. Returns the number of rows updated.
+    """
+    from app.models.taste_dna import TasteDNA
+
+    table = TasteDNA.__table__
+    updated = 0
+    last_id = ""
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(
+                select(table.c.id, table.c.preferred_cuisines)
+                .where(or_(table.c.cuisine_mask == 0, table.c.cuisine_mask.is_(None)))
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BACKFILL_BATCH_ROWS)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            masks = [
+                {"row_id": row.id, "mask": mask}
+                for row in rows
+                if (mask := cuisine_mask(row.preferred_cuisines))
+            ]
+            if masks:
+                await conn.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("row_id"))
+                    .values(cuisine_mask=bindparam("mask")),
+                    masks,
+                )
+                updated += len(masks)
+    if updated:
+        print(f"✓ Backfilled cuisine_mask for {updated} TasteDNA rows")
+    return updated
@@ -1,8 +1,11 @@
 """Pinecone vector database client for Taste Twin matching."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 
 from app.config import get_settings
+from app.core.exceptions import PineconeException
 
 settings = get_settings()
 
@@ -10,13 +13,20 @@ settings = get_settings()
 class PineconeClient:
     """Pinecone vector database client wrapper."""
 
-    EMBEDDING_DIM = 512
+    EMBEDDING_DIM = settings.embedding_dim
     DEFAULT_NAMESPACE = "taste_embeddings"
 
     def __init__(self):
         self._index = None
         self._initialized = False
         self._pc = None
+        # The Pinecone SDK is synchronous; run its calls on a bounded pool so
+        # they never block the event loop.
+        self.timeout = settings.vector_store_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.vector_store_max_concurrency,
+            thread_name_prefix="pinecone",
+        )
 
     def initialize(self):
         """Initialize Pinecone connection and index."""
@@ -57,6 +67,28 @@ class PineconeClient:
             self.initialize()
         return self._index
 
+    def _invoke(self, method: str, **kwargs):
+        """Call an index method (runs on a worker thread)."""
+        index = self.index
+        if index is None:
+            raise PineconeException("Vector database not configured")
+        return getattr(index, method)(**kwargs)
+
+    async def _call(self, method: str, **kwargs):
+        """Run an index method on the executor with a per-call timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, lambda: self._invoke(method, **kwargs)
+        )
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PineconeException(f"Vector database {method} timed out after {self.timeout}s")
+
+    def shutdown(self):
+        """Release executor threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     async def upsert_user_embedding(
         self,
         user_id: str,
@@ -66,7 +98,8 @@ class PineconeClient:
     ):
         """Store or update user taste embedding."""
         namespace = namespace or self.DEFAULT_NAMESPACE
-        self.index.upsert(
+        await self._call(
+            "upsert",
             vectors=[
                 {
                     "id": user_id,
@@ -89,7 +122,8 @@ class PineconeClient:
         namespace = namespace or self.DEFAULT_NAMESPACE
 
         # Query for similar vectors
-        results = self.index.query(
+        results = await self._call(
+            "query",
             vector=embedding,
             top_k=top_k + 1,  # +1 to exclude self
             include_metadata=True,
@@ -116,7 +150,7 @@ class PineconeClient:
     ) -> Optional[Dict]:
         """Retrieve user's stored embedding."""
         namespace = namespace or self.DEFAULT_NAMESPACE
-        result = self.index.fetch(ids=[user_id], namespace=namespace)
+        result = await self._call("fetch", ids=[user_id], namespace=namespace)
 
         if user_id in result.vectors:
             vector_data = result.vectors[user_id]
@@ -133,7 +167,7 @@ class PineconeClient:
     ):
         """Delete user's embedding."""
         namespace = namespace or self.DEFAULT_NAMESPACE
-        self.index.delete(ids=[user_id], namespace=namespace)
+        await self._call("delete", ids=[user_id], namespace=namespace)
 
     async def batch_upsert(
         self,
@@ -146,16 +180,16 @@ class PineconeClient:
 
         for i in range(0, len(vectors), batch_size):
             batch = vectors[i:i + batch_size]
-            self.index.upsert(vectors=batch, namespace=namespace)
+            await self._call("upsert", vectors=batch, namespace=namespace)
 
-    def get_index_stats(self) -> Dict:
+    async def get_index_stats(self) -> Dict:
         """Get index statistics."""
-        return self.index.describe_index_stats()
+        return await self._call("describe_index_stats")
 
-    def get_total_user_count(self, namespace: str = None) -> int:
+    async def get_total_user_count(self, namespace: str = None) -> int:
         """Get total count of users in the index."""
         namespace = namespace or self.DEFAULT_NAMESPACE
-        stats = self.index.describe_index_stats()
+        stats = await self._call("describe_index_stats")
 
         # Get count from specific namespace if it exists
         if hasattr(stats, 'namespaces') and stats.namespaces:
@@ -172,10 +206,24 @@ class PineconeClient:
         return 0
 
 
-# Global Pinecone client instance
-pinecone_client = PineconeClient()
+def create_vector_client():
+    """Build the vector store client selected by settings.vector_backend."""
+    if settings.vector_backend == "local":
+        from app.db.local_vector_index import LocalVectorIndex
+        return LocalVectorIndex(
+            snapshot_path=settings.local_vector_index_path or None,
+            storage=settings.local_vector_storage,
+            rescore=settings.local_vector_rescore,
+            rescore_factor=settings.local_vector_rescore_factor,
+            save_interval=settings.local_vector_save_interval,
+        )
+    return PineconeClient()
+
+
+# Global vector store client instance (Pinecone or local index)
+pinecone_client = create_vector_client()
 
 
-def get_pinecone() -> PineconeClient:
+def get_pinecone():
     """Dependency to get Pinecone client."""
     return pinecone_client
@@ -1,19 +1,41 @@
 """Redis client for caching and real-time features."""
 
 import json
-from typing import Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import redis.asyncio as redis
 
 from app.config import get_settings
 
 settings = get_settings()
 
+# Patch one entry of a cached twin list (KEYS: rank zset, info hash). Runs
+# only while both keys exist, so an entry never recreates an expired list
+# as a fragment without a TTL. Returns 1 if the list was patched.
+_UPDATE_TWIN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+return 1
+"""
+
+_REMOVE_TWIN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return 1
+"""
+
 
 class RedisClient:
     """Async Redis client wrapper."""
 
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self._scripts: Dict[str, Any] = {}
 
     async def connect(self):
         """Initialize Redis connection."""
@@ -38,6 +60,14 @@ class RedisClient:
         """Check if Redis is connected."""
         return self._client is not None
 
+    def _script(self, source: str):
+        """Lua script registered on the current connection (EVALSHA, falls back to EVAL)."""
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not self._client:
+            script = self._client.register_script(source)
+            self._scripts[source] = script
+        return script
+
     # User Session Cache
     async def cache_user_session(self, user_id: str, data: dict, ttl: int = 86400):
         """Cache user session data (24 hours default)."""
@@ -79,6 +109,71 @@ class RedisClient:
         data = await self.client.get(key)
         return json.loads(data) if data else None
 
+    # Twin Lists: sorted set of twin ids by similarity + hash of display fields
+    def _twin_keys(self, user_id: str) -> Tuple[str, str]:
+        return f"twins:rank:{user_id}", f"twins:info:{user_id}"
+
+    async def cache_twin_list(self, user_id: str, twins: List[Dict], ttl: int = 900):
+        """Replace a user's cached twin list (15 minutes default)."""
+        if not self.is_connected or not twins:
+            return
+        rank_key, info_key = self._twin_keys(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(rank_key, info_key)
+            pipe.zadd(rank_key, {t["twin_id"]: t["similarity_score"] for t in twins})
+            pipe.hset(info_key, mapping={t["twin_id"]: json.dumps(t) for t in twins})
+            pipe.expire(rank_key, ttl)
+            pipe.expire(info_key, ttl)
+            await pipe.execute()
+
+    async def get_twin_range(
+        self,
+        user_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Optional[Tuple[List[Dict], int]]:
+        """Get cached twins ranked [offset, offset + limit) and the list size.
+
+        Returns None when the list is not cached.
+        """
+        if not self.is_connected:
+            return None
+        rank_key, info_key = self._twin_keys(user_id)
+        stop = -1 if limit is None else offset + limit - 1
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrevrange(rank_key, offset, stop)
+            pipe.zcard(rank_key)
+            twin_ids, total = await pipe.execute()
+        if not total:
+            return None
+        if not twin_ids:
+            return [], total
+        infos = await self.client.hmget(info_key, twin_ids)
+        if any(info is None for info in infos):
+            return None  # Hash expired or partially written; treat as a miss
+        return [json.loads(info) for info in infos], total
+
+    async def update_twin_entry(self, user_id: str, twin: Dict):
+        """Add or rescore one twin in a cached list (no-op if not cached)."""
+        if not self.is_connected:
+            return
+        await self._script(_UPDATE_TWIN_SCRIPT)(
+            keys=list(self._twin_keys(user_id)),
+            args=[twin["twin_id"], twin["similarity_score"], json.dumps(twin)],
+        )
+
+    async def remove_twin_entry(self, user_id: str, twin_id: str):
+        """Remove one twin from a cached list (no-op if not cached)."""
+        if not self.is_connected:
+            return
+        await self._script(_REMOVE_TWIN_SCRIPT)(keys=list(self._twin_keys(user_id)), args=[twin_id])
+
+    async def invalidate_twin_list(self, user_id: str):
+        """Drop a user's cached twin list."""
+        if not self.is_connected:
+            return
+        await self.client.delete(*self._twin_keys(user_id))
+
     # Leaderboard
     async def update_leaderboard(self, user_id: str, score: float, board: str = "adventure"):
         """Update user score on leaderboard."""
@@ -110,6 +205,18 @@ class RedisClient:
         await self.client.incr(key)
         return True
 
+    # Locks
+    async def acquire_lock(self, key: str, ttl: int, token: str = "1") -> bool:
+        """Take a lock key for ttl seconds (SET NX EX); lets one worker do periodic jobs.
+
+        Holders that release early store a unique token, so they can
+        compare-and-delete and never drop a lock that expired and was
+        taken by someone else.
+        """
+        if not self.is_connected:
+            return True  # Single process without Redis: nothing to coordinate
+        return bool(await self.client.set(key, token, nx=True, ex=ttl))
+
     # Generic operations
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set a key-value pair."""
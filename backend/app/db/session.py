@@ -36,6 +36,10 @@ async def init_db():
         )
         await conn.run_sync(Base.metadata.create_all)
 
+    # create_all never alters existing tables; add columns introduced since
+    from app.db.migrations import upgrade_schema
+    await upgrade_schema(engine)
+
 
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
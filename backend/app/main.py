@@ -7,7 +7,14 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
 from app.config import get_settings
-from app.db.session import init_db
+from app.db.session import init_db, async_session_maker
+from app.ai.embeddings.embedding_cache import embedding_cache
+from app.services.yelp_cache import yelp_cache
+from app.services.yelp_coalescer import yelp_coalescer
+from app.services.yelp_quota import yelp_quota_governor
+from app.services.taste_profile_index import taste_profile_index
+from app.services.twin_matching_service import twin_matching_service
+from app.services.twin_refresh_scheduler import twin_refresh_scheduler
 
 settings = get_settings()
 
@@ -26,14 +33,38 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠ Warning: Redis connection failed: {e}")
 
-    # Initialize Pinecone
+    # Shared pooled HTTP client for Yelp calls
+    from app.db.http_client import http_client
+    await http_client.connect()
+
+    # Initialize vector store (Pinecone or local index)
     from app.db.pinecone_client import pinecone_client
     pinecone_client.initialize()
-    print("✓ Pinecone initialized")
+    print(f"✓ Vector store initialized ({settings.vector_backend})")
+    if settings.vector_backend == "local":
+        pinecone_client.start_loading(async_session_maker)
+
+    # Build the cold-start twin LSH index in the background
+    if settings.twin_lsh_enabled:
+        from app.services.twin_lsh_index import twin_lsh_index
+        twin_lsh_index.start_loading(async_session_maker)
+
+    # Load the MIN_TWINS backfill index in the background
+    taste_profile_index.start_loading(async_session_maker)
+
+    # Refresh stale twin lists in the background
+    if settings.twin_refresh_scheduler_enabled:
+        twin_refresh_scheduler.start()
 
     yield
 
     # Shutdown
+    await twin_refresh_scheduler.stop()
+    if settings.vector_backend == "local":
+        pinecone_client.save()
+    pinecone_client.shutdown()
+
+    await http_client.disconnect()
     await redis_client.disconnect()
     print("✓ Redis disconnected")
 
@@ -90,4 +121,13 @@ async def get_config():
         "debug": settings.debug,
         "cors_origins": settings.cors_origins,
         "database_configured": bool(settings.database_url),
+        "embedding_cache": embedding_cache.stats(),
+        "yelp_cache": yelp_cache.stats(),
+        "yelp_coalescing": yelp_coalescer.stats(),
+        "yelp_quota": {
+            **yelp_quota_governor.stats(),
+            "cluster_consumed": await yelp_quota_governor.cluster_consumed(),
+        },
+        "twin_refresh": twin_matching_service.refresh_stats(),
+        "twin_refresh_scheduler": twin_refresh_scheduler.stats(),
     }
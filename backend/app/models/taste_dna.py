@@ -3,10 +3,12 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship, validates, reconstructor
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.session import Base
+from app.utils.cuisines import cuisine_mask
 
 
 class TasteDNA(Base):
@@ -28,8 +30,10 @@ class TasteDNA(Base):
 
     # JSON fields for complex preferences
     preferred_cuisines = Column(JSON, nullable=True, default=list)  # ["Italian", "Japanese", ...]
+    cuisine_mask = Column(Integer, nullable=False, default=0)  # Bit i = CUISINE_TYPES[i]; derived from preferred_cuisines
     dietary_restrictions = Column(JSON, nullable=True, default=list)  # ["vegetarian", "gluten-free", ...]
     quiz_answers = Column(JSON, nullable=True)  # Raw quiz responses
+    indexed_profile = Column(JSON, nullable=True)  # to_dict() + model version when twins were last matched
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -37,6 +41,22 @@ class TasteDNA(Base):
     # Relationship
     user = relationship("User", back_populates="taste_dna")
 
+    @validates("preferred_cuisines")
+    def _sync_cuisine_mask(self, key, cuisines):
+        """Keep cuisine_mask in step whenever preferred_cuisines is assigned."""
+        self.cuisine_mask = cuisine_mask(cuisines)
+        return cuisines
+
+    @reconstructor
+    def _fill_cuisine_mask(self):
+        """Derive a missing mask on load (rows written with raw SQL skip the validator).
+
+        Set as the loaded value, so reading a row never schedules an UPDATE;
+        init_db's backfill persists it.
+        """
+        if not self.cuisine_mask and self.preferred_cuisines:
+            set_committed_value(self, "cuisine_mask", cuisine_mask(self.preferred_cuisines))
+
     def to_vector(self) -> list:
         """Convert TasteDNA to a feature vector for embedding."""
         return [
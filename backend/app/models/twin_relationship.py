@@ -24,6 +24,7 @@ class TwinRelationship(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "twin_user_id", name="unique_twin_pair"),
         Index("idx_twin_user", "user_id"),
+        Index("idx_twin_reverse", "twin_user_id"),  # Who has this user as a twin
         Index("idx_twin_score", "similarity_score"),
     )
 
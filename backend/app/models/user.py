@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Float, Integer
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -21,6 +21,10 @@ class User(Base):
     avatar_url = Column(String(500), nullable=True)
     embedding_vector_id = Column(String(100), nullable=True)  # Pinecone reference
     quiz_completed = Column(Boolean, default=False)
+    twin_count = Column(Integer, nullable=True)  # Stored TwinRelationship rows; NULL until first written
+    twin_threshold = Column(Float, nullable=True)  # Lowest stored twin score once the list is full
+    twins_refreshed_at = Column(DateTime, nullable=True, index=True)  # Last full rebuild of this user's twin list
+    twins_exhausted = Column(Boolean, nullable=False, default=False)  # Vector store had no twins past the stored list
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -43,7 +43,7 @@ class RestaurantBase(BaseModel):
     phone: Optional[str] = None
     display_phone: Optional[str] = None
     distance: Optional[float] = None
-    is_closed: bool = False
+    is_closed: Optional[bool] = None  # None when unknown (cached open/closed state too old to show)
     categories: List[RestaurantCategory] = Field(default_factory=list)
     location: Optional[RestaurantLocation] = None
     coordinates: Optional[RestaurantCoordinates] = None
@@ -147,17 +147,18 @@ class DiscoveryService:
         )[:limit]
 
         # Fetch restaurant details
+        restaurants, _ = await yelp_service.get_businesses(
+            [restaurant_id for restaurant_id, _ in sorted_restaurants]
+        )
         trending = []
-        for restaurant_id, count in sorted_restaurants:
-            try:
-                restaurant = await yelp_service.get_business(restaurant_id)
-                trending.append({
-                    "restaurant": restaurant,
-                    "twin_visits": count,
-                    "trend_score": min(1.0, count / 10),
-                })
-            except Exception:
+        for restaurant, (restaurant_id, count) in zip(restaurants, sorted_restaurants):
+            if restaurant is None:
                 continue
+            trending.append({
+                "restaurant": restaurant,
+                "twin_visits": count,
+                "trend_score": min(1.0, count / 10),
+            })
 
         return trending
 
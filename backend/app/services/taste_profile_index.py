@@ -0,0 +1,208 @@
+"""In-memory nearest-profile index over TasteDNA scores and cuisine masks."""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.taste_dna import TasteDNA
+from app.utils.cuisines import popcount
+
+settings = get_settings()
+
+CORE_SCORES = ("adventure_score", "spice_tolerance", "price_sensitivity", "cuisine_diversity")
+
+
+class TasteProfileIndex:
+    """Compact matrix of every user's core TasteDNA scores and cuisine mask.
+
+    Used to backfill Taste Twins from the database alone, so it works when
+    the vector store is unavailable. Scores are stored column-major (one
+    contiguous array per score) so a query is a handful of sequential passes;
+    each user costs 21 bytes of numeric data plus the id, about 57 MB per
+    million users. Similarity is a blend of Euclidean closeness on the four
+    core scores and Jaccard overlap of the cuisine masks, both in [0, 1].
+
+    The matrix is loaded in a background task and reloaded every ttl
+    seconds; each load builds new arrays and swaps them in at once, so
+    requests never scan the table. Until the first load finishes the index
+    is empty. Rows are found by id through a dict and arrays grow by
+    doubling, so upsert is O(1).
+    """
+
+    CORE_WEIGHT = 0.7
+    CUISINE_WEIGHT = 0.3
+    # Max distance between two points of the unit 4-cube
+    MAX_DISTANCE = 2.0
+    LOAD_CHUNK_ROWS = 50000
+    MIN_CAPACITY = 1024
+
+    def __init__(self, ttl: int = settings.twin_profile_index_ttl):
+        self.ttl = ttl
+        self._set_rows(*self._empty_rows())
+        self.loaded_at: Optional[float] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._pending: Optional[Dict[bytes, Tuple[np.ndarray, np.uint32]]] = None  # Upserts during a load
+
+    @property
+    def is_ready(self) -> bool:
+        return self.loaded_at is not None
+
+    @staticmethod
+    def _empty_rows():
+        return np.empty(0, dtype="S36"), np.empty((len(CORE_SCORES), 0), dtype=np.float32), np.empty(0, dtype=np.uint32)
+
+    def _set_rows(self, ids: np.ndarray, scores: np.ndarray, masks: np.ndarray):
+        """Swap in a complete set of rows; never awaits, so queries see old or new rows."""
+        self.ids = ids
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32)
+        self.masks = masks
+        self.cuisine_counts = popcount(masks).astype(np.uint8)
+        self.positions: Dict[bytes, int] = {key: row for row, key in enumerate(ids.tolist())}
+        self.size = len(ids)
+
+    def _grow(self):
+        """Double capacity so appends are amortized O(1)."""
+        capacity = max(self.MIN_CAPACITY, 2 * len(self.ids))
+        n = self.size
+        ids = np.zeros(capacity, dtype="S36")
+        scores = np.zeros((len(CORE_SCORES), capacity), dtype=np.float32)
+        masks = np.zeros(capacity, dtype=np.uint32)
+        counts = np.zeros(capacity, dtype=np.uint8)
+        ids[:n], scores[:, :n], masks[:n], counts[:n] = self.ids[:n], self.scores[:, :n], self.masks[:n], self.cuisine_counts[:n]
+        self.ids, self.scores, self.masks, self.cuisine_counts = ids, scores, masks, counts
+
+    async def load(self, db: AsyncSession):
+        """Rebuild the matrix from every TasteDNA row, then swap it in."""
+        ids, scores, masks = [], [], []
+        self._pending = {}
+        try:
+            result = await db.stream(
+                select(TasteDNA.user_id, *(getattr(TasteDNA, name) for name in CORE_SCORES), TasteDNA.cuisine_mask)
+            )
+            async for rows in result.partitions(self.LOAD_CHUNK_ROWS):
+                ids.append(np.array([row[0] for row in rows], dtype="S36"))
+                scores.append(np.array([row[1:5] for row in rows], dtype=np.float32).T)
+                masks.append(np.array([row[5] or 0 for row in rows], dtype=np.uint32))
+
+            if ids:
+                self._set_rows(np.concatenate(ids), np.concatenate(scores, axis=1), np.concatenate(masks))
+            else:
+                self._set_rows(*self._empty_rows())
+            self.loaded_at = time.monotonic()
+
+            # Quiz submissions that arrived while rows were streaming are newer
+            for key, (column, mask) in self._pending.items():
+                self._write_row(key, column, mask)
+        finally:
+            self._pending = None
+
+    def start_loading(self, session_factory):
+        """Load in a background task, and reload every ttl seconds (from app startup)."""
+        async def run():
+            while True:
+                try:
+                    async with session_factory() as db:
+                        await self.load(db)
+                except Exception as e:
+                    print(f"⚠ Warning: Taste profile index load failed: {e}")
+                await asyncio.sleep(self.ttl)
+
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(run())
+
+    def _write_row(self, key: bytes, column: np.ndarray, mask: np.uint32):
+        row = self.positions.get(key)
+        if row is None:
+            if self.size == len(self.ids):
+                self._grow()
+            row = self.size
+            self.ids[row] = key
+            self.positions[key] = row
+            self.size += 1
+        self.scores[:, row] = column
+        self.masks[row] = mask
+        self.cuisine_counts[row] = popcount([mask])[0]
+
+    def upsert(self, user_id: str, taste_dna: TasteDNA):
+        """Add or replace one user's row (after a quiz submission)."""
+        key = str(user_id).encode()
+        column = np.array([getattr(taste_dna, name) for name in CORE_SCORES], dtype=np.float32)
+        mask = np.uint32(taste_dna.cuisine_mask or 0)
+        if self._pending is not None:
+            self._pending[key] = (column, mask)
+        if self.is_ready:
+            self._write_row(key, column, mask)
+
+    def rows(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Views of the live (ids, scores, masks, cuisine_counts) rows.
+
+        Loads and upserts swap or grow the arrays on the event loop, so a
+        query run in a thread takes these views on the loop first.
+        """
+        n = self.size
+        return self.ids[:n], self.scores[:, :n], self.masks[:n], self.cuisine_counts[:n]
+
+    def nearest(
+        self,
+        taste_dna: TasteDNA,
+        k: int,
+        exclude: Iterable[str] = (),
+        rows: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return up to k (user_id, similarity) pairs, best first.
+
+        The profile's own user and any ids in `exclude` are skipped.
+        Scans `rows` (from rows()) when given, else the current rows.
+        """
+        skip = {str(taste_dna.user_id).encode()} | {str(user_id).encode() for user_id in exclude}
+        ids, scores, masks, cuisine_counts = rows if rows is not None else self.rows()
+        n = len(ids)
+        if k <= 0 or n == 0:
+            return []
+
+        # Squared distance accumulated one score column at a time
+        distance = np.zeros(n, dtype=np.float32)
+        for column, name in zip(scores, CORE_SCORES):
+            delta = column - np.float32(getattr(taste_dna, name))
+            delta *= delta
+            distance += delta
+        np.sqrt(distance, out=distance)
+
+        own_mask = np.uint32(taste_dna.cuisine_mask or 0)
+        common = popcount(masks & own_mask)
+        union = cuisine_counts + popcount([own_mask])[0] - common
+        jaccard = common.astype(np.float32) / np.maximum(union, 1)  # 0 when neither has cuisines
+
+        similarity = np.float32(self.CORE_WEIGHT) * (1 - distance / np.float32(self.MAX_DISTANCE))
+        similarity += np.float32(self.CUISINE_WEIGHT) * jaccard
+
+        # Over-fetch by the number of skipped ids, then drop them
+        fetch = min(n, k + len(skip))
+        if fetch < n:
+            candidates = np.argpartition(-similarity, fetch - 1)[:fetch]
+        else:
+            candidates = np.arange(n)
+        candidates = candidates[np.argsort(-similarity[candidates], kind="stable")]
+
+        matches = []
+        for i in candidates.tolist():
+            if ids[i] in skip:
+                continue
+            matches.append((ids[i].decode(), float(similarity[i])))
+            if len(matches) == k:
+                break
+        return matches
+
+
+# Global index instance
+taste_profile_index = TasteProfileIndex()
+
+
+def get_taste_profile_index() -> TasteProfileIndex:
+    """Dependency to get taste profile index."""
+    return taste_profile_index
@@ -0,0 +1,257 @@
+"""Incremental maintenance of the reverse Taste Twin graph."""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import bindparam, select, update, delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.user import User
+from app.models.taste_dna import TasteDNA
+from app.models.twin_relationship import TwinRelationship
+from app.db.pinecone_client import pinecone_client
+from app.db.redis_client import redis_client
+from app.ai.embeddings.taste_encoder import taste_embedding_service
+from app.ai.embeddings.embedding_cache import embedding_cache
+from app.utils.cuisines import cuisine_mask, shared_cuisines
+
+settings = get_settings()
+
+
+async def refresh_twin_stats(db: AsyncSession, user_ids: Iterable[str], refreshed: bool = False):
+    """Recompute User.twin_count and User.twin_threshold for the given users.
+
+    Called by every writer of TwinRelationship rows, in the same
+    transaction. The threshold is the lowest stored twin score once a user
+    holds at least TWIN_DEFAULT_TOP_K twins, and NULL while their list has
+    room. Writers that rebuilt the users' whole lists pass refreshed=True
+    to also stamp User.twins_refreshed_at and clear User.twins_exhausted.
+    """
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return
+
+    result = await db.execute(
+        select(
+            TwinRelationship.user_id,
+            func.count(),
+            func.min(TwinRelationship.similarity_score),
+        )
+        .where(TwinRelationship.user_id.in_(user_ids))
+        .group_by(TwinRelationship.user_id)
+    )
+    stats = {user_id: {"id": user_id, "twin_count": 0, "twin_threshold": None} for user_id in user_ids}
+    if refreshed:
+        now = datetime.utcnow()
+        for row in stats.values():
+            row["twins_refreshed_at"] = now
+            row["twins_exhausted"] = False
+    for user_id, count, lowest in result.all():
+        stats[user_id]["twin_count"] = count
+        if count >= settings.twin_default_top_k:
+            stats[user_id]["twin_threshold"] = lowest
+
+    await db.execute(update(User), list(stats.values()))
+
+
+class TwinGraphService:
+    """Keep other users' twin lists in step with one user's profile change.
+
+    When a user's TasteDNA changes, only edges touching that user are
+    rescored. Users who already list them as a twin get the new score, or
+    drop them if it fell below their stored K-th-best threshold. Users
+    among their new matches admit them if the score beats that threshold,
+    evicting their current lowest twin when the list is full. Candidates
+    are the user's nearest TWIN_REVERSE_CANDIDATES neighbours, so work is
+    proportional to the affected users, not to the total user count.
+    Cached twin lists of affected users are patched entry by entry.
+    """
+
+    def __init__(self):
+        self.embedding_service = taste_embedding_service
+        self.embedding_cache = embedding_cache
+        self.pinecone = pinecone_client
+
+    async def apply_profile_change(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        taste_dna: TasteDNA,
+        twins: List[Dict],
+    ) -> Dict[str, int]:
+        """Update reverse edges after a user's profile changed.
+
+        Args:
+            db: Database session
+            user_id: User whose TasteDNA changed
+            taste_dna: Their new TasteDNA
+            twins: Their fresh matches from find_twins
+
+        Returns:
+            Counts of rescored, inserted, evicted and removed edges
+        """
+        user_id = str(user_id)
+        stats = {"rescored": 0, "inserted": 0, "evicted": 0, "removed": 0}
+
+        result = await db.execute(
+            select(TwinRelationship.user_id).where(TwinRelationship.twin_user_id == user_id)
+        )
+        reverse_ids = set(result.scalars().all())
+
+        embedding = await self.embedding_cache.get_embedding(taste_dna.to_dict())
+        own_cuisines = taste_dna.preferred_cuisines or []
+
+        # Forward matches already carry the (symmetric) cosine score
+        scores = {str(t["twin_id"]): t["similarity_score"] for t in twins}
+        shared = {str(t["twin_id"]): t["shared_cuisines"] for t in twins}
+
+        # Twin lists are not symmetric: users outside this user's own top-K
+        # may still rank them highly, so check a wider (bounded) neighbourhood
+        candidates = await self.pinecone.find_taste_twins(
+            user_id=user_id,
+            embedding=embedding,
+            top_k=settings.twin_reverse_candidates,
+        )
+        for match in candidates:
+            other = str(match["user_id"])
+            if other not in scores:
+                scores[other] = match["similarity_score"]
+                metadata = match["metadata"]
+                other_mask = metadata.get("cuisine_mask")
+                if other_mask is None:
+                    other_mask = cuisine_mask(metadata.get("preferred_cuisines", []))
+                shared[other] = shared_cuisines(own_cuisines, int(other_mask))
+
+        # Rescore the remaining reverse edges against the new embedding
+        missing = [other for other in reverse_ids if other not in scores]
+        if missing:
+            result = await db.execute(select(TasteDNA).where(TasteDNA.user_id.in_(missing)))
+            others = result.scalars().all()
+            if others:
+                sims = (
+                    self.embedding_service.generate_embeddings([d.to_dict() for d in others])
+                    @ np.asarray(embedding, dtype=np.float32)
+                )
+                for other, sim in zip(others, sims.tolist()):
+                    scores[other.user_id] = sim
+                    shared[other.user_id] = shared_cuisines(own_cuisines, other.cuisine_mask)
+
+        affected = (reverse_ids | set(scores)) - {user_id}
+        if not affected:
+            return stats
+
+        result = await db.execute(
+            select(User.id, User.twin_threshold).where(User.id.in_(affected))
+        )
+        thresholds = dict(result.all())
+        result = await db.execute(
+            select(User.name, User.email, User.avatar_url).where(User.id == user_id)
+        )
+        profile = result.one_or_none()
+
+        def twin_entry(other: str) -> Dict:
+            """This user as a cached twin-list entry of `other`."""
+            return {
+                "twin_id": user_id,
+                "name": profile.name if profile else "",
+                "email": profile.email if profile else "",
+                "avatar_url": profile.avatar_url if profile else None,
+                "similarity_score": scores[other],
+                "shared_cuisines": shared[other],
+                "adventure_score": taste_dna.adventure_score,
+                "spice_tolerance": taste_dna.spice_tolerance,
+            }
+
+        removed, rescored, admitted = [], [], []
+        for other in affected:
+            threshold = thresholds.get(other)
+            if other in reverse_ids:
+                if other not in scores or (threshold is not None and scores[other] < threshold):
+                    # No TasteDNA any more, or fell below the K-th best twin;
+                    # the freed slot is refilled on the user's next refresh
+                    removed.append(other)
+                else:
+                    rescored.append(other)
+            elif other in thresholds and (threshold is None or scores[other] > threshold):
+                admitted.append(other)  # Skips stale vector store entries (no user)
+
+        cache_updates: List[Tuple[str, Dict]] = []  # (list owner, entry) to upsert
+        cache_removals: List[Tuple[str, str]] = [(other, user_id) for other in removed]
+        edges = TwinRelationship.__table__
+        if removed:
+            await db.execute(
+                delete(edges).where(
+                    edges.c.user_id.in_(removed),
+                    edges.c.twin_user_id == user_id,
+                )
+            )
+        if rescored:
+            await db.execute(
+                update(edges)
+                .where(edges.c.user_id == bindparam("owner"), edges.c.twin_user_id == user_id)
+                .values(
+                    similarity_score=bindparam("score"),
+                    common_cuisines=bindparam("shared"),
+                ),
+                [
+                    {"owner": other, "score": scores[other], "shared": shared[other]}
+                    for other in rescored
+                ],
+            )
+
+        # Full lists evict their current lowest twin to make room
+        full = [other for other in admitted if thresholds[other] is not None]
+        if full:
+            rank = func.row_number().over(
+                partition_by=edges.c.user_id,
+                order_by=edges.c.similarity_score,
+            ).label("rank")
+            ranked = (
+                select(edges.c.id, edges.c.user_id, edges.c.twin_user_id, rank)
+                .where(edges.c.user_id.in_(full))
+                .subquery()
+            )
+            result = await db.execute(
+                select(ranked.c.id, ranked.c.user_id, ranked.c.twin_user_id).where(ranked.c.rank == 1)
+            )
+            lowest = result.all()
+            if lowest:
+                await db.execute(delete(edges).where(edges.c.id.in_([row.id for row in lowest])))
+                cache_removals.extend((row.user_id, row.twin_user_id) for row in lowest)
+                stats["evicted"] = len(lowest)
+        if admitted:
+            await db.execute(insert(TwinRelationship), [
+                {
+                    "user_id": other,
+                    "twin_user_id": user_id,
+                    "similarity_score": scores[other],
+                    "common_cuisines": shared[other],
+                }
+                for other in admitted
+            ])
+
+        cache_updates.extend((other, twin_entry(other)) for other in rescored + admitted)
+        stats["removed"], stats["rescored"], stats["inserted"] = len(removed), len(rescored), len(admitted)
+        touched = set(removed) | set(rescored) | set(admitted)
+
+        await refresh_twin_stats(db, touched)
+        await db.commit()
+
+        # Patch cached twin lists in place instead of dropping them
+        for other, twin_id in cache_removals:
+            await redis_client.remove_twin_entry(other, twin_id)
+        for other, entry in cache_updates:
+            await redis_client.update_twin_entry(other, entry)
+        return stats
+
+
+# Global service instance
+twin_graph_service = TwinGraphService()
+
+
+def get_twin_graph_service() -> TwinGraphService:
+    """Dependency to get twin graph service."""
+    return twin_graph_service
@@ -0,0 +1,330 @@
+"""Random-hyperplane LSH index for approximate cold-start Taste Twins."""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.taste_dna import TasteDNA
+from app.ai.embeddings.taste_encoder import taste_embedding_service
+
+settings = get_settings()
+
+# Set bits of every byte value
+_POPCOUNT8 = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _hamming(signatures: np.ndarray, signature: np.ndarray) -> np.ndarray:
+    """Bit differences between each row of `signatures` and `signature`."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        diff = signatures.view(np.uint64) ^ signature.view(np.uint64)
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT8[signatures ^ signature].sum(axis=1, dtype=np.int32)
+
+
+class TwinLSHIndex:
+    """In-memory LSH over TasteDNA embeddings.
+
+    Each user is stored as a 256-bit signature: the signs of the embedding
+    projected onto fixed random hyperplanes (32 bytes per user). Encoder
+    outputs all sit in a narrow cone, so embeddings are centered on the
+    mean of the first loaded chunk before hashing; otherwise most users
+    share every bucket. The center differs between processes, so
+    signatures are only comparable within the index that made them. The
+    signature is split into 16 bands of 16 bits; users sharing any band
+    value with the query are candidates, and candidates are ranked by
+    Hamming distance, which estimates the angle between the centered
+    embeddings (cos(pi * hamming / 256)). That estimate is not on the
+    scale of the exact cosine, so callers rescore before storing scores.
+
+    Each band is stored CSR-style: row indices sorted by band value plus an
+    offsets table over all 2**16 values, so a lookup is two array reads.
+    Users added since the last build sit in a small unsorted tail that is
+    scanned directly and merged by a background rebuild once it grows past
+    REBUILD_TAIL rows. Loading and rebuilding run on a worker thread; the
+    rebuilt arrays are swapped in on the event loop. Live rows are found by
+    id through a dict, so add() is O(1).
+
+    The index is reloaded from the database every reload_interval seconds
+    so users added through other workers become candidates. Each load
+    builds a fresh index and swaps it in; adds made meanwhile are replayed
+    onto it.
+    """
+
+    SIGNATURE_BITS = 256
+    BAND_BITS = 16
+    NUM_BANDS = SIGNATURE_BITS // BAND_BITS
+    REBUILD_TAIL = 4096
+    LOAD_CHUNK_ROWS = 20000
+    INITIAL_CAPACITY = 1024
+
+    def __init__(
+        self,
+        dim: int = settings.embedding_dim,
+        seed: int = settings.twin_lsh_seed,
+        reload_interval: int = settings.twin_lsh_reload_interval,
+    ):
+        self.embedding_service = taste_embedding_service
+        self.dim = dim
+        self.seed = seed
+        self.reload_interval = reload_interval
+        rng = np.random.default_rng(seed)
+        self.hyperplanes = rng.standard_normal((dim, self.SIGNATURE_BITS)).astype(np.float32)
+        self.center = np.zeros(dim, dtype=np.float32)
+        self.signatures = np.zeros((self.INITIAL_CAPACITY, self.SIGNATURE_BITS // 8), dtype=np.uint8)
+        self.ids = np.empty(self.INITIAL_CAPACITY, dtype="S36")
+        self.live = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        self.positions: Dict[bytes, int] = {}  # Live row of each id
+        self.size = 0
+        self.built_size = 0
+        self.band_order = np.empty((self.NUM_BANDS, 0), dtype=np.int32)
+        self.band_offsets = np.zeros((self.NUM_BANDS, 2 ** self.BAND_BITS + 1), dtype=np.int32)
+        self.loaded_at: Optional[float] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._generation = 0  # Bumped when a reload swaps in new arrays
+        self._pending: Optional[Dict[str, np.ndarray]] = None  # Adds during a load
+
+    @property
+    def is_ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def signature(self, embeddings: np.ndarray) -> np.ndarray:
+        """Signatures (n, 32) uint8 for a batch of embeddings."""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        return np.packbits((embeddings - self.center) @ self.hyperplanes > 0, axis=1)
+
+    def _bands(self, signatures: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(signatures).view(np.uint16)
+
+    def _grow(self, needed: int):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        signatures = np.zeros((capacity, self.signatures.shape[1]), dtype=np.uint8)
+        signatures[:self.size] = self.signatures[:self.size]
+        ids = np.empty(capacity, dtype="S36")
+        ids[:self.size] = self.ids[:self.size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self.size] = self.live[:self.size]
+        self.signatures, self.ids, self.live = signatures, ids, live
+
+    def _append(self, user_ids: List[str], signatures: np.ndarray):
+        self._grow(self.size + len(user_ids))
+        end = self.size + len(user_ids)
+        keys = [str(user_id).encode() for user_id in user_ids]
+        self.signatures[self.size:end] = signatures
+        self.ids[self.size:end] = keys
+        self.live[self.size:end] = True
+        self.positions.update(zip(keys, range(self.size, end)))
+        self.size = end
+
+    def _sorted_bands(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR band tables (order, offsets) for a block of signatures."""
+        bands = self._bands(signatures).T
+        order = np.argsort(bands, axis=1, kind="stable").astype(np.int32)
+        offsets = np.zeros((self.NUM_BANDS, 2 ** self.BAND_BITS + 1), dtype=np.int32)
+        for band, keys in enumerate(bands):
+            offsets[band, 1:] = np.cumsum(np.bincount(keys, minlength=2 ** self.BAND_BITS))
+        return order, offsets
+
+    def rebuild(self):
+        """Drop replaced rows and re-sort every band."""
+        keep = np.flatnonzero(self.live[:self.size])
+        count = len(keep)
+        self.signatures[:count] = self.signatures[keep]
+        self.ids[:count] = self.ids[keep]
+        self.live[:count] = True
+        self.live[count:self.size] = False
+        self.size = self.built_size = count
+        self.positions = {key: row for row, key in enumerate(self.ids[:count].tolist())}
+        self.band_order, self.band_offsets = self._sorted_bands(self.signatures[:count])
+
+    async def _rebuild_in_background(self):
+        """Rebuild from a snapshot on a worker thread, then swap it in.
+
+        Rows below the snapshot size are never overwritten, so the thread
+        reads them safely while queries and adds continue. Rows added or
+        replaced meanwhile are carried over at the swap. The result is
+        dropped if a reload swapped in a new index first.
+        """
+        size, generation = self.size, self._generation
+        signatures, ids = self.signatures, self.ids
+        keep = np.flatnonzero(self.live[:size])
+
+        def build():
+            kept = signatures[keep]
+            kept_ids = ids[keep]
+            positions = {key: row for row, key in enumerate(kept_ids.tolist())}
+            return kept, kept_ids, positions, self._sorted_bands(kept)
+
+        loop = asyncio.get_running_loop()
+        kept, kept_ids, positions, (order, offsets) = await loop.run_in_executor(None, build)
+        if generation != self._generation:
+            return
+
+        # Swap (no awaits below): kept rows, then everything appended since
+        count = len(keep)
+        tail = np.arange(size, self.size)
+        live = np.concatenate((self.live[keep], self.live[tail]))
+        tail_signatures = self.signatures[tail]
+        tail_ids = self.ids[tail]
+        capacity = max(self.INITIAL_CAPACITY, 2 * len(live))
+        self.signatures = np.zeros((capacity, kept.shape[1]), dtype=np.uint8)
+        self.ids = np.empty(capacity, dtype="S36")
+        self.live = np.zeros(capacity, dtype=bool)
+        self.signatures[:count], self.signatures[count:len(live)] = kept, tail_signatures
+        self.ids[:count], self.ids[count:len(live)] = kept_ids, tail_ids
+        self.live[:len(live)] = live
+        for row in np.flatnonzero(live[count:]).tolist():
+            positions[tail_ids[row]] = count + row  # Newer than any kept row
+        self.positions = positions
+        self.size, self.built_size = len(live), count
+        self.band_order, self.band_offsets = order, offsets
+
+    def _add_chunk(self, user_ids: List[str], embeddings: np.ndarray, first: bool):
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        if first:
+            # The first chunk's mean is a close enough estimate of the center
+            self.center = embeddings.mean(axis=0).astype(np.float32)
+        self._append(user_ids, self.signature(embeddings))
+
+    def build(self, user_ids: List[str], embeddings: np.ndarray):
+        """Replace the index contents with precomputed embeddings."""
+        self.size = self.built_size = 0
+        for start in range(0, len(user_ids), self.LOAD_CHUNK_ROWS):
+            end = start + self.LOAD_CHUNK_ROWS
+            self._add_chunk(user_ids[start:end], embeddings[start:end], first=start == 0)
+        self.rebuild()
+        self.loaded_at = time.monotonic()
+
+    def _load_chunk(self, user_ids: List[str], profiles: List[dict], first: bool):
+        self._add_chunk(user_ids, self.embedding_service.generate_embeddings(profiles), first)
+
+    def _swap(self, fresh: "TwinLSHIndex"):
+        """Take over a freshly loaded index's rows (no awaits)."""
+        self.center = fresh.center
+        self.signatures, self.ids, self.live = fresh.signatures, fresh.ids, fresh.live
+        self.positions = fresh.positions
+        self.size, self.built_size = fresh.size, fresh.built_size
+        self.band_order, self.band_offsets = fresh.band_order, fresh.band_offsets
+        self._generation += 1
+
+    async def load(self, db: AsyncSession):
+        """Build a new index from every TasteDNA row, then swap it in.
+
+        Encoding, hashing and the band sort run on a worker thread into a
+        separate index, so the current one keeps serving queries and adds.
+        Adds made during the load are replayed after the swap.
+        """
+        loop = asyncio.get_running_loop()
+        fresh = TwinLSHIndex(dim=self.dim, seed=self.seed, reload_interval=self.reload_interval)
+        fresh.embedding_service = self.embedding_service
+        self._pending = {}
+        try:
+            first = True
+            result = await db.stream(select(TasteDNA))
+            async for rows in result.scalars().partitions(self.LOAD_CHUNK_ROWS):
+                await loop.run_in_executor(
+                    None, fresh._load_chunk, [dna.user_id for dna in rows], [dna.to_dict() for dna in rows], first
+                )
+                first = False
+            await loop.run_in_executor(None, fresh.rebuild)
+
+            self._swap(fresh)
+            self.loaded_at = time.monotonic()
+            pending, self._pending = self._pending, None
+            for user_id, embedding in pending.items():
+                self.add(user_id, embedding)
+        finally:
+            self._pending = None
+
+    def start_loading(self, session_factory):
+        """Load in a background task, and reload every reload_interval seconds (from app startup)."""
+        async def run():
+            while True:
+                try:
+                    async with session_factory() as db:
+                        await self.load(db)
+                    print(f"✓ Twin LSH index loaded ({self.built_size} users)")
+                except Exception as e:
+                    print(f"⚠ Warning: Twin LSH index load failed: {e}")
+                await asyncio.sleep(self.reload_interval)
+
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(run())
+
+    def add(self, user_id: str, embedding: np.ndarray):
+        """Add or replace a user's signature (kept for replay while a load runs)."""
+        if self._pending is not None:
+            self._pending[str(user_id)] = embedding
+        if not self.is_ready:
+            return
+        previous = self.positions.get(str(user_id).encode())
+        if previous is not None:
+            self.live[previous] = False
+        self._append([user_id], self.signature(embedding))
+        if self.size - self.built_size > self.REBUILD_TAIL and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = asyncio.create_task(self._rebuild_in_background())
+
+    def _candidates(self, bands: np.ndarray) -> np.ndarray:
+        rows = np.arange(self.NUM_BANDS)
+        starts = self.band_offsets[rows, bands].tolist()
+        ends = self.band_offsets[rows, bands.astype(np.int32) + 1].tolist()
+        found = [
+            self.band_order[band, lo:hi]
+            for band, (lo, hi) in enumerate(zip(starts, ends))
+            if hi > lo
+        ]
+        if self.size > self.built_size:
+            tail = self._bands(self.signatures[self.built_size:self.size])
+            matches = np.flatnonzero((tail == bands).any(axis=1)).astype(np.int32)
+            if len(matches):
+                found.append(matches + self.built_size)
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        candidates = np.sort(np.concatenate(found))
+        candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+        return candidates[self.live[candidates]]
+
+    def query(
+        self,
+        embedding: np.ndarray,
+        k: int,
+        exclude_id: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """Approximate top-k (user_id, cosine estimate), best first."""
+        signature = self.signature(embedding)
+        candidates = self._candidates(self._bands(signature)[0])
+        if exclude_id is not None:
+            candidates = candidates[self.ids[candidates] != str(exclude_id).encode()]
+        if k <= 0 or len(candidates) == 0:
+            return []
+
+        hamming = _hamming(self.signatures[candidates], signature)
+        if len(candidates) > k:
+            top = np.argpartition(hamming, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(hamming[top], kind="stable")]
+
+        scores = np.cos(np.pi * hamming[top] / self.SIGNATURE_BITS)
+        return [
+            (self.ids[i].decode(), float(score))
+            for i, score in zip(candidates[top].tolist(), scores.tolist())
+        ]
+
+
+# Global index instance
+twin_lsh_index = TwinLSHIndex()
+
+
+def get_twin_lsh_index() -> TwinLSHIndex:
+    """Dependency to get twin LSH index."""
+    return twin_lsh_index
@@ -1,10 +1,16 @@
 """Taste Twin matching service."""
 
-from typing import List, Dict, Optional
+import asyncio
+import base64
+import json
+from typing import List, Dict, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.models.user import User
 from app.models.taste_dna import TasteDNA
@@ -12,14 +18,88 @@ from app.models.twin_relationship import TwinRelationship
 from app.db.pinecone_client import pinecone_client
 from app.db.redis_client import redis_client
 from app.ai.embeddings.taste_encoder import taste_embedding_service
+from app.ai.embeddings.embedding_cache import embedding_cache
+from app.services.twin_graph_service import refresh_twin_stats
+from app.services.taste_profile_index import taste_profile_index
+from app.services.twin_lsh_index import twin_lsh_index
+from app.config import get_settings
+from app.core.exceptions import InvalidCursorException, PineconeException
+from app.utils.cuisines import cuisine_mask, shared_cuisines
+
+settings = get_settings()
+
+
+def encode_twin_cursor(offset: int) -> str:
+    """Opaque cursor for the twin list position `offset`."""
+    raw = json.dumps({"offset": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_twin_cursor(cursor: str) -> int:
+    """Inverse of encode_twin_cursor; raises InvalidCursorException."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset = int(json.loads(raw)["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorException()
+    if offset < 0:
+        raise InvalidCursorException()
+    return offset
 
 
 class TwinMatchingService:
     """Service for finding and managing Taste Twins."""
 
+    MIN_TWINS = 5
+    DEFAULT_PAGE_SIZE = 20
+    # Ids per IN (...) lookup; stays under SQLite's bound-parameter limit
+    ENRICH_CHUNK_SIZE = 900
+    # LSH candidates rescored with exact cosine per approximate twin returned
+    LSH_RESCORE_FACTOR = 4
+
     def __init__(self):
         self.embedding_service = taste_embedding_service
+        self.embedding_cache = embedding_cache
         self.pinecone = pinecone_client
+        self.profile_index = taste_profile_index
+        self.lsh_index = twin_lsh_index
+        self._refresh_counts = {"refreshed": 0, "skipped": 0}
+
+    def profile_moved(self, taste_dna: TasteDNA) -> bool:
+        """Whether the profile drifted since its twins were last matched.
+
+        Compares the embeddings of the current profile and of the snapshot
+        stored by mark_indexed; a missing snapshot or a different encoder
+        version counts as moved.
+        """
+        snapshot = taste_dna.indexed_profile
+        if not snapshot or snapshot.get("model_version") != self.embedding_service.model_version:
+            return True
+        old, new = self.embedding_service.generate_embeddings([snapshot["profile"], taste_dna.to_dict()])
+        cosine = float(old @ new) / max(float(np.linalg.norm(old) * np.linalg.norm(new)), 1e-12)
+        return 1.0 - cosine > settings.twin_refresh_min_distance
+
+    def should_refresh(self, taste_dna: TasteDNA, force: bool = False) -> bool:
+        """Decide whether to rerun twin matching, counting refreshes and skips."""
+        refresh = force or self.profile_moved(taste_dna)
+        self._refresh_counts["refreshed" if refresh else "skipped"] += 1
+        return refresh
+
+    def mark_indexed(self, taste_dna: TasteDNA):
+        """Snapshot the profile its twins are being matched for (saved on commit)."""
+        taste_dna.indexed_profile = {
+            "model_version": self.embedding_service.model_version,
+            "profile": taste_dna.to_dict(),
+        }
+
+    def refresh_stats(self) -> Dict:
+        """Twin refresh counters for this process."""
+        total = sum(self._refresh_counts.values())
+        return {
+            **self._refresh_counts,
+            "skip_rate": round(self._refresh_counts["skipped"] / total, 4) if total else 0.0,
+            "min_distance": settings.twin_refresh_min_distance,
+        }
 
     async def store_user_embedding(
         self,
@@ -31,10 +111,25 @@ class TwinMatchingService:
         # Convert TasteDNA to dict
         dna_dict = taste_dna.to_dict()
 
-        # Generate embedding
-        embedding = self.embedding_service.generate_embedding(dna_dict)
+        # Generate embedding (cached by profile fingerprint)
+        embedding = await self.embedding_cache.get_embedding(dna_dict)
+
+        # Store in Pinecone
+        await self.pinecone.upsert_user_embedding(
+            user_id=str(user_id),
+            embedding=embedding,
+            metadata=self.build_embedding_metadata(user_id, taste_dna, city),
+        )
+
+        return embedding
 
-        # Prepare metadata for Pinecone
+    def build_embedding_metadata(
+        self,
+        user_id: UUID,
+        taste_dna: TasteDNA,
+        city: Optional[str] = None,
+    ) -> Dict:
+        """Build the vector store metadata stored alongside an embedding."""
         metadata = {
             "user_id": str(user_id),
             "adventure_score": taste_dna.adventure_score,
@@ -43,18 +138,11 @@ class TwinMatchingService:
             "cuisine_diversity": taste_dna.cuisine_diversity,
             "ambiance_preference": taste_dna.ambiance_preference or "casual",
             "preferred_cuisines": taste_dna.preferred_cuisines or [],
+            "cuisine_mask": cuisine_mask(taste_dna.preferred_cuisines),
         }
         if city:
             metadata["city"] = city
-
-        # Store in Pinecone
-        await self.pinecone.upsert_user_embedding(
-            user_id=str(user_id),
-            embedding=embedding,
-            metadata=metadata,
-        )
-
-        return embedding
+        return metadata
 
     async def find_twins(
         self,
@@ -67,18 +155,17 @@ class TwinMatchingService:
         """Find Taste Twins for a user."""
         # Generate embedding for query
         dna_dict = taste_dna.to_dict()
-        embedding = self.embedding_service.generate_embedding(dna_dict)
+        embedding = await self.embedding_cache.get_embedding(dna_dict)
 
         # Build filter if city specified
         filter_dict = None
         if city_filter:
             filter_dict = {"city": {"$eq": city_filter}}
 
-        # Get total user count if top_k not specified (to get all users)
+        # Bounded default; deeper twins are fetched page by page on request
         if top_k is None:
-            total_users = self.pinecone.get_total_user_count()
-            # Use total users count, capped at Pinecone's 10000 limit
-            top_k = min(total_users if total_users > 0 else 10000, 10000)
+            top_k = settings.twin_default_top_k
+        top_k = min(top_k, settings.twin_max_top_k)
 
         # Query Pinecone for similar users
         twins_data = await self.pinecone.find_taste_twins(
@@ -88,66 +175,197 @@ class TwinMatchingService:
             filter_dict=filter_dict,
         )
 
-        # Enrich with user data from database
+        return await self._enrich_twins(db, taste_dna, twins_data)
+
+    async def find_approximate_twins(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        taste_dna: TasteDNA,
+        top_k: int = None,
+    ) -> Optional[List[Dict]]:
+        """Approximate Taste Twins from the local LSH index.
+
+        Returns None while the index is still loading. The LSH shortlist
+        (LSH_RESCORE_FACTOR candidates per twin) is rescored with the exact
+        cosine between embeddings, so stored scores and thresholds are on
+        the same scale as find_twins; only recall is approximate until the
+        exact match replaces these twins.
+        """
+        if not self.lsh_index.is_ready:
+            return None
+
+        top_k = top_k or settings.twin_default_top_k
+        embedding = await self.embedding_cache.get_embedding(taste_dna.to_dict())
+        matches = self.lsh_index.query(
+            embedding, top_k * self.LSH_RESCORE_FACTOR, exclude_id=str(user_id)
+        )
+        self.lsh_index.add(str(user_id), embedding)
+
+        profiles = await self._load_twin_profiles(db, [match_id for match_id, _ in matches])
+        candidates = [
+            (match_id, profiles[match_id][1]) for match_id, _ in matches
+            if match_id in profiles and profiles[match_id][1] is not None
+        ]
+        if not candidates:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        vectors = self.embedding_service.generate_embeddings([dna.to_dict() for _, dna in candidates])
+        scores = (vectors @ query) / np.maximum(
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(query), 1e-12
+        )
+        best = np.argsort(-scores, kind="stable")[:top_k]
+
+        twins_data = [
+            {"user_id": candidates[i][0], "similarity_score": float(scores[i]), "metadata": {}}
+            for i in best.tolist()
+        ]
+        return await self._enrich_twins(db, taste_dna, twins_data, profiles)
+
+    async def _enrich_twins(
+        self,
+        db: AsyncSession,
+        taste_dna: TasteDNA,
+        twins_data: List[Dict],
+        profiles: Optional[Dict[str, Tuple[User, Optional[TasteDNA]]]] = None,
+    ) -> List[Dict]:
+        """Turn vector matches into twin dicts with user and TasteDNA fields."""
+        # Enrich with user data from database (bulk lookup, joined in memory)
+        if profiles is None:
+            profiles = await self._load_twin_profiles(db, [t["user_id"] for t in twins_data])
+        user_cuisines = taste_dna.preferred_cuisines or []
+
         twins = []
         for twin_data in twins_data:
-            twin_user_id = twin_data["user_id"]
-            result = await db.execute(
-                select(User).where(User.id == twin_user_id)
-            )
-            twin_user = result.scalar_one_or_none()
+            twin_user_id = str(twin_data["user_id"])
+            profile = profiles.get(twin_user_id)
+
+            if profile:
+                twin_user, twin_dna = profile
+                metadata = twin_data["metadata"]
 
-            if twin_user:
-                # Find common cuisines
-                twin_cuisines = set(twin_data["metadata"].get("preferred_cuisines", []))
-                user_cuisines = set(taste_dna.preferred_cuisines or [])
-                common = list(twin_cuisines & user_cuisines)
+                # Find common cuisines (bitwise AND of cuisine masks)
+                twin_mask = (
+                    twin_dna.cuisine_mask if twin_dna
+                    else cuisine_mask(metadata.get("preferred_cuisines", []))
+                )
+                common = shared_cuisines(user_cuisines, twin_mask)
 
                 twins.append({
-                    "twin_id": str(twin_user_id),  # Ensure it's a string
+                    "twin_id": twin_user_id,  # Ensure it's a string
                     "name": twin_user.name,
                     "email": twin_user.email,
                     "avatar_url": twin_user.avatar_url,
                     "similarity_score": twin_data["similarity_score"],
                     "shared_cuisines": common,
-                    "adventure_score": twin_data["metadata"].get("adventure_score", 0.0),
-                    "spice_tolerance": twin_data["metadata"].get("spice_tolerance", 0.0),
+                    "adventure_score": twin_dna.adventure_score if twin_dna else metadata.get("adventure_score", 0.0),
+                    "spice_tolerance": twin_dna.spice_tolerance if twin_dna else metadata.get("spice_tolerance", 0.0),
                 })
 
         return twins
 
+    async def _load_twin_profiles(
+        self,
+        db: AsyncSession,
+        user_ids: List[str],
+    ) -> Dict[str, Tuple[User, Optional[TasteDNA]]]:
+        """Load users and their TasteDNA for many ids with chunked IN queries."""
+        profiles = {}
+        user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        for start in range(0, len(user_ids), self.ENRICH_CHUNK_SIZE):
+            chunk = user_ids[start:start + self.ENRICH_CHUNK_SIZE]
+            result = await db.execute(
+                select(User, TasteDNA)
+                .outerjoin(TasteDNA, TasteDNA.user_id == User.id)
+                .where(User.id.in_(chunk))
+            )
+            for twin_user, twin_dna in result.all():
+                profiles[str(twin_user.id)] = (twin_user, twin_dna)
+        return profiles
+
     async def update_twin_relationships(
         self,
         db: AsyncSession,
         user_id: UUID,
         twins: List[Dict],
+        replace: bool = True,
     ):
-        """Store or update twin relationships in database."""
+        """Store or update twin relationships in database.
+
+        Diffs the new twins against the stored rows and writes only the
+        difference: one DELETE for dropped twins and one bulk upsert
+        (INSERT ... ON CONFLICT) for new or rescored ones. With
+        replace=False the twins are appended to the stored ones (used when
+        paging deeper than the stored list).
+        """
         # Convert UUID to string for database (using String(36) column type)
         user_id_str = str(user_id)
 
-        # Delete existing relationships for this user
-        await db.execute(
-            delete(TwinRelationship).where(TwinRelationship.user_id == user_id_str)
-        )
-
-        # Create new relationships
+        new_rows = {}
         for twin in twins:
             # Ensure twin_user_id is a string (might be UUID object in some cases)
             twin_user_id = str(twin["twin_id"]) if twin["twin_id"] else None
             if not twin_user_id:
                 continue  # Skip if no valid ID
 
-            relationship = TwinRelationship(
-                user_id=user_id_str,
-                twin_user_id=twin_user_id,
-                similarity_score=twin["similarity_score"],
-                common_cuisines=twin["shared_cuisines"],
-            )
-            db.add(relationship)
+            new_rows[twin_user_id] = {
+                "user_id": user_id_str,
+                "twin_user_id": twin_user_id,
+                "similarity_score": twin["similarity_score"],
+                "common_cuisines": twin["shared_cuisines"],
+            }
+
+        result = await db.execute(
+            select(
+                TwinRelationship.twin_user_id,
+                TwinRelationship.similarity_score,
+                TwinRelationship.common_cuisines,
+            ).where(TwinRelationship.user_id == user_id_str)
+        )
+        stored = {row.twin_user_id: row for row in result.all()}
+
+        # Delete relationships that are no longer twins
+        if replace:
+            dropped = [twin_id for twin_id in stored if twin_id not in new_rows]
+            for start in range(0, len(dropped), self.ENRICH_CHUNK_SIZE):
+                await db.execute(
+                    delete(TwinRelationship).where(
+                        TwinRelationship.user_id == user_id_str,
+                        TwinRelationship.twin_user_id.in_(dropped[start:start + self.ENRICH_CHUNK_SIZE]),
+                    )
+                )
 
+        # Insert new twins and rescore changed ones; unchanged rows are untouched
+        changed = [
+            row for twin_id, row in new_rows.items()
+            if twin_id not in stored
+            or stored[twin_id].similarity_score != row["similarity_score"]
+            or (stored[twin_id].common_cuisines or []) != (row["common_cuisines"] or [])
+        ]
+        if changed:
+            await db.execute(self._twin_upsert_statement(db), changed)
+
+        await refresh_twin_stats(db, [user_id_str], refreshed=replace)
         await db.commit()
 
+    def _twin_upsert_statement(self, db: AsyncSession):
+        """INSERT ... ON CONFLICT (user_id, twin_user_id) DO UPDATE for the bound dialect.
+
+        Executed with a list of rows: SQLite runs it as one prepared
+        executemany, Postgres batches it into multi-row VALUES.
+        """
+        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = dialect_insert(TwinRelationship)
+        return stmt.on_conflict_do_update(
+            index_elements=[TwinRelationship.user_id, TwinRelationship.twin_user_id],
+            set_={
+                "similarity_score": stmt.excluded.similarity_score,
+                "common_cuisines": stmt.excluded.common_cuisines,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
     async def get_user_twins(
         self,
         db: AsyncSession,
@@ -155,104 +373,231 @@ class TwinMatchingService:
     ) -> List[Dict]:
         """Get stored twin relationships for a user."""
         # Check cache first
-        cache_key = f"twins:{user_id}"
-        cached = await redis_client.get(cache_key)
+        cached = await redis_client.get_twin_range(str(user_id))
         if cached:
-            return cached
+            return cached[0]
 
-        # Query database
-        result = await db.execute(
-            select(TwinRelationship)
-            .where(TwinRelationship.user_id == user_id)
-            .order_by(TwinRelationship.similarity_score.desc())
+        # Query database: relationships, users and TasteDNA in one SELECT
+        result = await db.execute(self._twin_listing_query(user_id))
+        twins = [self._twin_listing_row(row) for row in result.all()]
+
+        # MINIMUM TWINS GUARANTEE: Ensure at least 5 twins if possible
+        MIN_TWINS = self.MIN_TWINS
+        if len(twins) < MIN_TWINS:
+            twins.extend(await self._backfill_twins(db, user_id, twins, MIN_TWINS - len(twins)))
+
+        # Cache results as a sorted set, so pages can be read by range
+        if twins:
+            await redis_client.cache_twin_list(str(user_id), twins, ttl=900)  # 15 minutes
+
+        return twins
+
+    async def _backfill_twins(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        twins: List[Dict],
+        count: int,
+    ) -> List[Dict]:
+        """Nearest users by TasteDNA that are not already twins.
+
+        Ranks everyone with the in-memory taste profile index (core scores
+        plus cuisine overlap), so it needs only the database, not the
+        vector store. The O(N) scan runs on the default executor, off the
+        event loop. Returns no one until the index has loaded.
+        """
+        result = await db.execute(select(TasteDNA).where(TasteDNA.user_id == str(user_id)))
+        taste_dna = result.scalar_one_or_none()
+        if not taste_dna:
+            return []
+
+        exclude = [t["twin_id"] for t in twins]
+        matches = await asyncio.get_running_loop().run_in_executor(
+            None, self.profile_index.nearest, taste_dna, count, exclude, self.profile_index.rows()
         )
-        relationships = result.scalars().all()
+        if not matches:
+            return []
 
-        twins = []
-        for rel in relationships:
-            # Get twin user data
-            user_result = await db.execute(
-                select(User).where(User.id == rel.twin_user_id)
+        # Columns we need from User and TasteDNA for the chosen users
+        result = await db.execute(
+            select(
+                User.id,
+                User.name,
+                User.email,
+                User.avatar_url,
+                TasteDNA.adventure_score,
+                TasteDNA.spice_tolerance,
+                TasteDNA.cuisine_mask,
+            )
+            .join(TasteDNA, TasteDNA.user_id == User.id)
+            .where(User.id.in_([match_id for match_id, _ in matches]))
+        )
+        rows = {str(row.id): row for row in result.all()}
+
+        backfill = []
+        for match_id, score in matches:
+            row = rows.get(match_id)
+            if row is None:
+                continue  # Deleted since the index was loaded
+            backfill.append({
+                "twin_id": match_id,
+                "name": row.name,
+                "email": row.email,
+                "avatar_url": row.avatar_url,
+                "similarity_score": score,
+                "shared_cuisines": shared_cuisines(taste_dna.preferred_cuisines, row.cuisine_mask),
+                "adventure_score": row.adventure_score,
+                "spice_tolerance": row.spice_tolerance,
+            })
+        return backfill
+
+    def _twin_listing_query(self, user_id: UUID):
+        """SELECT of the columns a twin listing needs, one row per stored twin.
+
+        Ordered best first, ties by twin id descending (the order of a
+        Redis ZREVRANGE), so cached and database pages line up.
+        """
+        return (
+            select(
+                TwinRelationship.twin_user_id,
+                TwinRelationship.similarity_score,
+                TwinRelationship.common_cuisines,
+                User.name,
+                User.email,
+                User.avatar_url,
+                TasteDNA.adventure_score,
+                TasteDNA.spice_tolerance,
             )
-            twin_user = user_result.scalar_one_or_none()
+            .join(User, User.id == TwinRelationship.twin_user_id)
+            .outerjoin(TasteDNA, TasteDNA.user_id == TwinRelationship.twin_user_id)
+            .where(TwinRelationship.user_id == str(user_id))
+            .order_by(
+                TwinRelationship.similarity_score.desc(),
+                TwinRelationship.twin_user_id.desc(),
+            )
+        )
 
-            if twin_user:
-                # Get twin's TasteDNA for adventure_score and spice_tolerance
-                dna_result = await db.execute(
-                    select(TasteDNA).where(TasteDNA.user_id == rel.twin_user_id)
-                )
-                twin_dna = dna_result.scalar_one_or_none()
+    def _twin_listing_row(self, row) -> Dict:
+        """Twin dict from a _twin_listing_query row."""
+        return {
+            "twin_id": str(row.twin_user_id),
+            "name": row.name,
+            "email": row.email,
+            "avatar_url": row.avatar_url,
+            "similarity_score": row.similarity_score,
+            "shared_cuisines": row.common_cuisines or [],
+            "adventure_score": row.adventure_score if row.adventure_score is not None else 0.0,
+            "spice_tolerance": row.spice_tolerance if row.spice_tolerance is not None else 0.0,
+        }
 
-                twins.append({
-                    "twin_id": str(rel.twin_user_id),
-                    "name": twin_user.name,
-                    "email": twin_user.email,
-                    "avatar_url": twin_user.avatar_url,
-                    "similarity_score": rel.similarity_score,
-                    "shared_cuisines": rel.common_cuisines or [],
-                    "adventure_score": twin_dna.adventure_score if twin_dna else 0.0,
-                    "spice_tolerance": twin_dna.spice_tolerance if twin_dna else 0.0,
-                })
+    async def get_twins_page(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict:
+        """Get one page of stored twins, best match first.
+
+        Pages are range reads of the cached sorted set (or OFFSET/LIMIT reads
+        of TwinRelationship when Redis is unavailable); this never queries
+        the vector store. When a page after the first reaches the end of
+        the stored list and the list can grow, "extend_to" is the depth the
+        caller should queue with TwinRefreshScheduler.request_extend; the
+        next page is served from the stored rows once that has run.
+
+        Returns:
+            Dict with "twins", "next_cursor" (None on the last page),
+            "total_count" and "extend_to" (None when nothing needs fetching)
+        """
+        offset = decode_twin_cursor(cursor) if cursor else 0
+
+        twins, total = await self._read_twins_range(db, user_id, offset, limit + 1)
+        next_cursor = None
+        extend_to = None
+        if len(twins) > limit:
+            twins = twins[:limit]
+            next_cursor = encode_twin_cursor(offset + limit)
+        elif total < settings.twin_max_top_k and not await self._twins_exhausted(db, user_id):
+            # Stored list ends on this page but the vector store may hold more
+            if twins:
+                next_cursor = encode_twin_cursor(offset + len(twins))
+            if cursor is not None:
+                extend_to = offset + limit + 1
+
+        return {"twins": twins, "next_cursor": next_cursor, "total_count": total, "extend_to": extend_to}
+
+    async def _twins_exhausted(self, db: AsyncSession, user_id: UUID) -> bool:
+        result = await db.execute(
+            select(User.twins_exhausted).where(User.id == str(user_id))
+        )
+        return bool(result.scalar_one_or_none())
 
-        # MINIMUM TWINS GUARANTEE: Ensure at least 5 twins if possible
-        MIN_TWINS = 5
-        if len(twins) < MIN_TWINS:
-            # Get user's taste DNA to find similar users
-            user_dna_result = await db.execute(
-                select(TasteDNA).where(TasteDNA.user_id == user_id)
-            )
-            user_dna = user_dna_result.scalar_one_or_none()
-
-            if user_dna:
-                # Get existing twin IDs (already strings from Pinecone)
-                existing_twin_ids = {t["twin_id"] for t in twins}
-
-                # Find additional users who aren't already twins
-                # Convert user_id to string for comparison
-                additional_users_result = await db.execute(
-                    select(User)
-                    .join(TasteDNA, TasteDNA.user_id == User.id)
-                    .where(
-                        User.id != str(user_id),
-                        ~User.id.in_(list(existing_twin_ids))  # Already strings, no need to convert
-                    )
-                    .limit(MIN_TWINS - len(twins))
-                )
-                additional_users = additional_users_result.scalars().all()
+    async def _read_twins_range(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        offset: int,
+        limit: int,
+    ) -> Tuple[List[Dict], int]:
+        """Read twins ranked [offset, offset + limit) and the list size."""
+        cached = await redis_client.get_twin_range(str(user_id), offset, limit)
+        if cached is not None:
+            return cached
 
-                # Add them as twins with a default similarity score
-                for additional_user in additional_users:
-                    additional_dna_result = await db.execute(
-                        select(TasteDNA).where(TasteDNA.user_id == additional_user.id)
-                    )
-                    additional_dna = additional_dna_result.scalar_one_or_none()
-
-                    # Calculate basic similarity based on shared preferences
-                    shared_cuisines = []
-                    if additional_dna and user_dna.preferred_cuisines and additional_dna.preferred_cuisines:
-                        user_cuisines = set(user_dna.preferred_cuisines)
-                        other_cuisines = set(additional_dna.preferred_cuisines)
-                        shared_cuisines = list(user_cuisines & other_cuisines)
-
-                    # Default similarity score (lower than matched twins)
-                    default_score = 0.5
-
-                    twins.append({
-                        "twin_id": str(additional_user.id),
-                        "name": additional_user.name,
-                        "email": additional_user.email,
-                        "avatar_url": additional_user.avatar_url,
-                        "similarity_score": default_score,
-                        "shared_cuisines": shared_cuisines,
-                        "adventure_score": additional_dna.adventure_score if additional_dna else 0.0,
-                        "spice_tolerance": additional_dna.spice_tolerance if additional_dna else 0.0,
-                    })
-
-        # Cache results
-        if twins:
-            await redis_client.set(cache_key, twins, ttl=900)  # 15 minutes
+        if redis_client.is_connected:
+            # Cache miss: build the full list once; later pages are range reads
+            twins = await self.get_user_twins(db, user_id)
+            return twins[offset:offset + limit], len(twins)
 
-        return twins
+        result = await db.execute(
+            self._twin_listing_query(user_id).offset(offset).limit(limit)
+        )
+        twins = [self._twin_listing_row(row) for row in result.all()]
+        return twins, await self.get_twin_count(db, user_id)
+
+    async def extend_twins(self, db: AsyncSession, user_id: UUID, depth: int) -> int:
+        """Fetch twins until `depth` are stored, appending the new ones.
+
+        Run by the refresh scheduler, never in a request. When the vector
+        store has nothing beyond the stored list, the user is marked
+        twins_exhausted so pages stop asking until the next full refresh.
+        A vector store error leaves the stored list as it is.
+
+        Returns the number of twins added.
+        """
+        depth = min(depth, settings.twin_max_top_k)
+        stored_ids = set((await db.execute(
+            select(TwinRelationship.twin_user_id)
+            .where(TwinRelationship.user_id == str(user_id))
+        )).scalars().all())
+        if len(stored_ids) >= depth:
+            return 0
+
+        result = await db.execute(
+            select(TasteDNA).where(TasteDNA.user_id == user_id)
+        )
+        taste_dna = result.scalar_one_or_none()
+        if not taste_dna:
+            return 0
+
+        # The vector store has no offset, so ask for the full depth and keep
+        # only the matches not stored yet
+        try:
+            matches = await self.find_twins(db, user_id, taste_dna, top_k=depth)
+        except PineconeException as e:
+            print(f"⚠ Warning: Twin list extension skipped for {user_id}: {e}")
+            return 0
+        new_twins = [t for t in matches if t["twin_id"] not in stored_ids]
+        if new_twins:
+            await self.update_twin_relationships(db, user_id, new_twins, replace=False)
+            await redis_client.invalidate_twin_list(str(user_id))
+        if not new_twins or len(matches) < depth:
+            await db.execute(
+                update(User).where(User.id == str(user_id)).values(twins_exhausted=True)
+            )
+            await db.commit()
+        return len(new_twins)
 
     async def get_twin_count(
         self,
@@ -260,18 +605,33 @@ class TwinMatchingService:
         user_id: UUID,
     ) -> int:
         """Get count of user's Taste Twins."""
+        # Maintained by refresh_twin_stats on every relationship write
+        result = await db.execute(
+            select(User.twin_count).where(User.id == str(user_id))
+        )
+        count = result.scalar_one_or_none()
+        if count is not None:
+            return count
+
+        # Not maintained yet (rows written before the counter existed)
         result = await db.execute(
-            select(TwinRelationship)
-            .where(TwinRelationship.user_id == user_id)
+            select(func.count())
+            .select_from(TwinRelationship)
+            .where(TwinRelationship.user_id == str(user_id))
         )
-        return len(result.scalars().all())
+        return result.scalar_one()
 
     async def refresh_twins(
         self,
         db: AsyncSession,
         user_id: UUID,
+        force: bool = False,
     ) -> List[Dict]:
-        """Refresh twin matching for a user."""
+        """Refresh twin matching for a user.
+
+        Skipped, returning the stored twins, when the profile has barely
+        moved since the last match (see profile_moved) unless force is set.
+        """
         # Get user's TasteDNA
         result = await db.execute(
             select(TasteDNA).where(TasteDNA.user_id == user_id)
@@ -281,15 +641,18 @@ class TwinMatchingService:
         if not taste_dna:
             return []
 
+        if not self.should_refresh(taste_dna, force):
+            return await self.get_user_twins(db, user_id)
+
         # Find new twins
         twins = await self.find_twins(db, user_id, taste_dna)
 
-        # Update relationships
+        # Update relationships (the commit also saves the indexed snapshot)
+        self.mark_indexed(taste_dna)
         await self.update_twin_relationships(db, user_id, twins)
 
         # Invalidate cache
-        cache_key = f"twins:{user_id}"
-        await redis_client.delete(cache_key)
+        await redis_client.invalidate_twin_list(str(user_id))
 
         return twins
 
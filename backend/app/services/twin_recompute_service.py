@@ -0,0 +1,254 @@
+"""Bulk all-pairs Taste Twin recomputation."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.taste_dna import TasteDNA
+from app.models.twin_relationship import TwinRelationship
+from app.db.pinecone_client import pinecone_client
+from app.db.redis_client import redis_client
+from app.ai.embeddings.taste_encoder import taste_embedding_service
+from app.services.twin_matching_service import twin_matching_service
+from app.services.twin_graph_service import refresh_twin_stats
+from app.utils.cuisines import cuisine_mask, shared_cuisines
+
+
+# Embedding matrix shared with pool workers (set by _init_worker)
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_embeddings: Optional[np.ndarray] = None
+
+
+def _init_worker(shm_name: str, shape: Tuple[int, int]):
+    """Attach a pool worker to the shared embedding matrix."""
+    global _worker_shm, _worker_embeddings
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_embeddings = np.ndarray(shape, dtype=np.float32, buffer=_worker_shm.buf)
+
+
+def _worker_top_k(start: int, end: int, top_k: int):
+    return start, end, *top_k_block(_worker_embeddings, start, end, top_k)
+
+
+def top_k_block(
+    embeddings: np.ndarray,
+    start: int,
+    end: int,
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k cosine neighbours for rows [start, end) of unit-norm embeddings.
+
+    Returns (indices, scores), each (end - start, k), best first, self excluded.
+    """
+    n = len(embeddings)
+    k = min(top_k, n - 1)
+    sims = embeddings[start:end] @ embeddings.T
+    rows = np.arange(end - start)
+    sims[rows, rows + start] = -np.inf
+
+    if k < n - 1:
+        idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(n), sims.shape)
+    scores = np.take_along_axis(sims, idx, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+class TwinRecomputeService:
+    """Recompute every user's Taste Twins in one batch.
+
+    Embeds all TasteDNA rows in batches, finds each user's top-k neighbours
+    with blocked matrix multiplication (optionally across a process pool),
+    and rewrites TwinRelationship rows block by block. Finished blocks are
+    recorded in a checkpoint file so an interrupted run resumes where it
+    stopped.
+    """
+
+    DEFAULT_TOP_K = 50
+    # Similarity block held per worker: rows * users * 4 bytes
+    BLOCK_BYTES = 64 * 2**20
+    MAX_BLOCK_ROWS = 1024
+
+    def __init__(self):
+        self.embedding_service = taste_embedding_service
+        self.pinecone = pinecone_client
+
+    def _block_rows(self, num_users: int) -> int:
+        return max(1, min(self.MAX_BLOCK_ROWS, self.BLOCK_BYTES // (4 * max(num_users, 1))))
+
+    def _run_key(self, user_ids: List[str], top_k: int, block_rows: int) -> str:
+        digest = hashlib.sha1()
+        for user_id in user_ids:
+            digest.update(user_id.encode())
+        digest.update(f"|{top_k}|{block_rows}|{self.embedding_service.EMBEDDING_DIM}".encode())
+        return digest.hexdigest()
+
+    def _load_checkpoint(self, path: Optional[str], run_key: str) -> set:
+        if not path or not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("run_key") != run_key:
+            return set()  # Users or parameters changed; start over
+        return set(checkpoint.get("completed_blocks", []))
+
+    def _save_checkpoint(self, path: Optional[str], run_key: str, completed: set):
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"run_key": run_key, "completed_blocks": sorted(completed)}, f)
+        os.replace(tmp_path, path)
+
+    async def _write_block(
+        self,
+        db: AsyncSession,
+        user_ids: List[str],
+        cuisines: List[List[str]],
+        masks: List[int],
+        start: int,
+        indices: np.ndarray,
+        scores: np.ndarray,
+    ) -> int:
+        """Replace the TwinRelationship rows of one block of users."""
+        block_user_ids = user_ids[start:start + len(indices)]
+        rows = [
+            {
+                "user_id": user_ids[start + offset],
+                "twin_user_id": user_ids[j],
+                "similarity_score": float(score),
+                "common_cuisines": shared_cuisines(cuisines[start + offset], masks[j]),
+            }
+            for offset in range(len(indices))
+            for j, score in zip(indices[offset].tolist(), scores[offset].tolist())
+        ]
+
+        await db.execute(
+            delete(TwinRelationship).where(TwinRelationship.user_id.in_(block_user_ids))
+        )
+        if rows:
+            await db.execute(insert(TwinRelationship), rows)
+        await refresh_twin_stats(db, block_user_ids, refreshed=True)
+        await db.commit()
+
+        if redis_client.is_connected:
+            for user_id in block_user_ids:
+                await redis_client.invalidate_twin_list(user_id)
+        return len(rows)
+
+    async def recompute_all(
+        self,
+        db: AsyncSession,
+        top_k: int = DEFAULT_TOP_K,
+        workers: Optional[int] = None,
+        block_rows: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        upsert_vectors: bool = False,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> Dict:
+        """Recompute twins for every user with a TasteDNA profile.
+
+        Args:
+            db: Database session used for reads and bulk writes
+            top_k: Twins stored per user
+            workers: Process pool size (default: CPU count; 1 runs inline)
+            block_rows: Query rows per similarity block (default: sized to BLOCK_BYTES)
+            checkpoint_path: JSON file tracking finished blocks, for resume
+            upsert_vectors: Also write all embeddings to the vector store
+            progress: Called as progress(blocks_done, blocks_total, rows_written)
+
+        Returns:
+            Run statistics
+        """
+        started = time.perf_counter()
+        result = await db.execute(select(TasteDNA).order_by(TasteDNA.user_id))
+        dnas = result.scalars().all()
+        user_ids = [str(dna.user_id) for dna in dnas]
+        num_users = len(user_ids)
+        if num_users < 2:
+            return {"users": num_users, "blocks": 0, "relationships": 0, "seconds": 0.0}
+
+        embeddings = self.embedding_service.generate_embeddings([dna.to_dict() for dna in dnas])
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        cuisines = [dna.preferred_cuisines or [] for dna in dnas]
+        masks = [cuisine_mask(c) for c in cuisines]
+
+        if upsert_vectors:
+            await self.pinecone.batch_upsert([
+                {
+                    "id": user_id,
+                    "values": embeddings[i].tolist(),
+                    "metadata": twin_matching_service.build_embedding_metadata(user_id, dnas[i]),
+                }
+                for i, user_id in enumerate(user_ids)
+            ])
+
+        block_rows = block_rows or self._block_rows(num_users)
+        blocks = [(start, min(start + block_rows, num_users)) for start in range(0, num_users, block_rows)]
+        run_key = self._run_key(user_ids, top_k, block_rows)
+        completed = self._load_checkpoint(checkpoint_path, run_key)
+        pending = [(start, end) for start, end in blocks if start not in completed]
+        written = 0
+
+        async def finish(start: int, indices: np.ndarray, scores: np.ndarray):
+            nonlocal written
+            written += await self._write_block(db, user_ids, cuisines, masks, start, indices, scores)
+            completed.add(start)
+            self._save_checkpoint(checkpoint_path, run_key, completed)
+            if progress:
+                progress(len(completed), len(blocks), written)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(pending) <= 1:
+            for start, end in pending:
+                await finish(start, *top_k_block(embeddings, start, end, top_k))
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=embeddings.nbytes)
+            try:
+                np.ndarray(embeddings.shape, dtype=np.float32, buffer=shm.buf)[:] = embeddings
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(shm.name, embeddings.shape),
+                ) as pool:
+                    futures = [
+                        loop.run_in_executor(pool, _worker_top_k, start, end, top_k)
+                        for start, end in pending
+                    ]
+                    for future in asyncio.as_completed(futures):
+                        start, _, indices, scores = await future
+                        await finish(start, indices, scores)
+            finally:
+                shm.close()
+                shm.unlink()
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        return {
+            "users": num_users,
+            "blocks": len(blocks),
+            "resumed_blocks": len(blocks) - len(pending),
+            "relationships": written,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+
+
+# Global service instance
+twin_recompute_service = TwinRecomputeService()
+
+
+def get_twin_recompute_service() -> TwinRecomputeService:
+    """Dependency to get twin recompute service."""
+    return twin_recompute_service
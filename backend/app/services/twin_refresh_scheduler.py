@@ -0,0 +1,193 @@
+"""Background scheduler keeping stored Taste Twins fresh."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.session import async_session_maker
+from app.db.redis_client import redis_client
+from app.models.user import User
+from app.models.taste_dna import TasteDNA
+from app.models.interaction_log import InteractionLog
+from app.services.twin_matching_service import twin_matching_service
+
+settings = get_settings()
+
+
+class TwinRefreshScheduler:
+    """Refresh twin lists in the background so requests only read stored twins.
+
+    Every twin_refresh_interval seconds one worker (holding a Redis lock)
+    picks up to twin_refresh_batch_size users whose lists were last rebuilt
+    more than twin_refresh_stale_after seconds ago. Users with the most
+    InteractionLog entries in the active window go first, then the
+    stalest. Users queued with request_refresh() are handled by the worker
+    that queued them, on the next wake-up, as are twin lists queued with
+    request_extend() by clients paging past their stored twins.
+
+    At most twin_refresh_concurrency refreshes run at once, and starts are
+    spaced to stay under twin_refresh_per_minute. Each refresh uses its own
+    database session.
+    """
+
+    LOCK_KEY = "twins:refresh:scan"
+
+    def __init__(self):
+        self.interval = settings.twin_refresh_interval
+        self.stale_after = settings.twin_refresh_stale_after
+        self.active_window = settings.twin_refresh_active_window
+        self.batch_size = settings.twin_refresh_batch_size
+        self.concurrency = settings.twin_refresh_concurrency
+        self.per_minute = settings.twin_refresh_per_minute
+
+        self._requested: Dict[str, bool] = {}  # user_id -> force
+        self._extend: Dict[str, int] = {}  # user_id -> twin list depth wanted
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_scan: Optional[float] = None
+        self._next_start = 0.0
+        self._counts = {"scans": 0, "requested": 0, "refreshed": 0, "extended": 0, "failed": 0}
+
+    def start(self):
+        """Start the background loop (from app startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background loop (from app shutdown)."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request_refresh(self, user_id: str, force: bool = False):
+        """Queue a user's twins for refresh on the next wake-up."""
+        user_id = str(user_id)
+        self._requested[user_id] = self._requested.get(user_id, False) or force
+        self._counts["requested"] += 1
+        self._wake.set()
+
+    def request_extend(self, user_id: str, depth: int):
+        """Queue fetching a user's twins down to `depth` on the next wake-up."""
+        user_id = str(user_id)
+        self._extend[user_id] = max(self._extend.get(user_id, 0), depth)
+        self._wake.set()
+
+    async def select_stale_users(self, db: AsyncSession, limit: int) -> List[str]:
+        """Users with stale twin lists, recently active first, then stalest."""
+        if limit <= 0:
+            return []
+        now = datetime.utcnow()
+        activity = (
+            select(InteractionLog.user_id, func.count().label("actions"))
+            .where(InteractionLog.created_at >= now - timedelta(seconds=self.active_window))
+            .group_by(InteractionLog.user_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(User.id)
+            .join(TasteDNA, TasteDNA.user_id == User.id)
+            .outerjoin(activity, activity.c.user_id == User.id)
+            .where(or_(
+                User.twins_refreshed_at.is_(None),
+                User.twins_refreshed_at < now - timedelta(seconds=self.stale_after),
+            ))
+            .order_by(
+                func.coalesce(activity.c.actions, 0).desc(),
+                User.twins_refreshed_at.asc().nulls_first(),
+            )
+            .limit(limit)
+        )
+        return [str(user_id) for user_id in result.scalars().all()]
+
+    async def _throttle(self):
+        """Space refresh starts to stay under per_minute."""
+        now = time.monotonic()
+        start_at = max(now, self._next_start)
+        self._next_start = start_at + 60.0 / self.per_minute
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def _refresh(self, user_id: str, force: bool, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            await self._throttle()
+            try:
+                async with async_session_maker() as db:
+                    await twin_matching_service.refresh_twins(db, user_id, force=force)
+                self._counts["refreshed"] += 1
+            except Exception as e:
+                self._counts["failed"] += 1
+                print(f"⚠ Warning: Scheduled twin refresh failed for {user_id}: {e}")
+
+    async def _extend_list(self, user_id: str, depth: int, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            await self._throttle()
+            try:
+                async with async_session_maker() as db:
+                    await twin_matching_service.extend_twins(db, user_id, depth)
+                self._counts["extended"] += 1
+            except Exception as e:
+                self._counts["failed"] += 1
+                print(f"⚠ Warning: Twin list extension failed for {user_id}: {e}")
+
+    async def run_cycle(self) -> int:
+        """Refresh queued users, plus stale ones when a scan is due. Returns jobs run."""
+        jobs, self._requested = self._requested, {}
+        extends, self._extend = self._extend, {}
+
+        scan_due = self._last_scan is None or time.monotonic() - self._last_scan >= self.interval
+        if scan_due and await redis_client.acquire_lock(self.LOCK_KEY, self.interval):
+            self._last_scan = time.monotonic()
+            self._counts["scans"] += 1
+            async with async_session_maker() as db:
+                stale = await self.select_stale_users(db, self.batch_size)
+            for user_id in stale:
+                # Stale lists are rebuilt even if the profile itself is unchanged
+                jobs[user_id] = True
+
+        # A full refresh rebuilds the list, so it replaces a queued extension
+        extends = {user_id: depth for user_id, depth in extends.items() if user_id not in jobs}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(self._refresh(user_id, force, semaphore) for user_id, force in jobs.items()),
+            *(self._extend_list(user_id, depth, semaphore) for user_id, depth in extends.items()),
+        )
+        return len(jobs) + len(extends)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                print(f"⚠ Warning: Twin refresh cycle failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        """Scheduler counters for this process."""
+        return {
+            **self._counts,
+            "queued": len(self._requested) + len(self._extend),
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+# Global scheduler instance
+twin_refresh_scheduler = TwinRefreshScheduler()
+
+
+def get_twin_refresh_scheduler() -> TwinRefreshScheduler:
+    """Dependency to get twin refresh scheduler."""
+    return twin_refresh_scheduler
@@ -7,6 +7,8 @@ from uuid import uuid4
 from app.config import get_settings
 from app.core.exceptions import YelpAPIException
 from app.db.redis_client import redis_client
+from app.db.http_client import http_client
+from app.services.yelp_quota import yelp_quota_governor
 
 
 class YelpAIService:
@@ -22,6 +24,8 @@ class YelpAIService:
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
+        self.http = http_client
+        self.quota = yelp_quota_governor
 
     def _transform_response(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -111,20 +115,22 @@ class YelpAIService:
                 "skip_text_generation": True,
             }
 
+        await self.quota.acquire("ai_chat")
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.AI_API_URL,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30.0,
-                )
-                response.raise_for_status()
-                raw_data = response.json()
-
-                # Transform Yelp AI response to expected format
-                return self._transform_response(raw_data)
+            # Shared pooled client: connections are kept alive between calls
+            response = await self.http.client.post(
+                self.AI_API_URL,
+                headers=self.headers,
+                json=payload,
+            )
+            response.raise_for_status()
+            raw_data = response.json()
+
+            # Transform Yelp AI response to expected format
+            return self._transform_response(raw_data)
         except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                await self.quota.throttled()
             error_detail = f"Yelp AI API error: {e.response.status_code}"
             try:
                 error_body = e.response.json()
@@ -0,0 +1,255 @@
+"""Tiered cache for Yelp Fusion responses.
+
+Lookups go in-process LRU, then Redis, then Yelp. Entries keep the time
+they were fetched, so each caller decides freshness at read time:
+
+- younger than the endpoint TTL: served as is
+- older, but within max_stale: served, and one background refresh runs
+- older than that: fetched before returning
+
+The body of a response carrying hours or is_closed still follows the
+endpoint TTL. Only those fields age faster: past yelp_cache_volatile_ttl
+a read starts a background refresh, and past yelp_cache_volatile_max_age
+they are stripped from what is served until the refresh lands (the API
+then reports is_closed as null, i.e. unknown), so open/closed state meets
+a freshness SLA without costing a round trip per call or shortening the
+cache life of the rest of the response.
+"""
+
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.config import get_settings
+from app.db.redis_client import redis_client
+from app.services.yelp_quota import quota_lane
+
+settings = get_settings()
+
+# Fields that change during the day (open now, temporarily closed)
+VOLATILE_FIELDS = ("is_closed", "hours")
+
+
+def has_volatile_fields(data: Any) -> bool:
+    """True for a business, or a search result holding businesses, with volatile fields."""
+    if not isinstance(data, dict):
+        return False
+    if any(field in data for field in VOLATILE_FIELDS):
+        return True
+    return any(
+        isinstance(business, dict) and any(field in business for field in VOLATILE_FIELDS)
+        for business in data.get("businesses") or []
+    )
+
+
+def strip_volatile_fields(data: Dict) -> Dict:
+    """Shallow copy of a business or search result without its volatile fields."""
+    def strip(item):
+        if not isinstance(item, dict):
+            return item
+        return {key: value for key, value in item.items() if key not in VOLATILE_FIELDS}
+
+    stripped = strip(data)
+    if isinstance(stripped.get("businesses"), list):
+        stripped["businesses"] = [strip(business) for business in stripped["businesses"]]
+    return stripped
+
+
+class YelpCache:
+    """LRU + Redis cache with stale-while-revalidate.
+
+    Each entry is {"data", "fetched_at", "volatile"}; fetched_at is wall
+    clock time so entries written by one worker age correctly in another.
+    A key has at most one background refresh per process, and a short
+    Redis lock keeps other workers from refreshing it at the same time.
+    """
+
+    KEY_PREFIX = "yelp"
+    REFRESH_LOCK_TTL = 30  # Seconds one worker owns a key's refresh
+
+    def __init__(
+        self,
+        max_entries: int = settings.yelp_cache_size,
+        max_stale: int = settings.yelp_cache_max_stale,
+        volatile_ttl: int = settings.yelp_cache_volatile_ttl,
+        volatile_max_age: int = settings.yelp_cache_volatile_max_age,
+    ):
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.volatile_ttl = volatile_ttl
+        self.volatile_max_age = volatile_max_age
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(
+            ("hits", "redis_hits", "stale_hits", "misses", "refreshes", "refresh_failures"), 0
+        )
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{key}"
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put_local(self, key: str, entry: Dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _servable_for(self, ttl: int) -> int:
+        """Seconds after fetch an entry may still be served (stale)."""
+        return ttl + self.max_stale
+
+    @staticmethod
+    def _age(entry: Dict) -> float:
+        return time.time() - entry["fetched_at"]
+
+    def _serve(self, entry: Dict) -> Any:
+        """Copy of an entry's data, minus volatile fields older than volatile_max_age."""
+        data = entry["data"]
+        if entry.get("volatile") and self._age(entry) >= self.volatile_max_age:
+            data = strip_volatile_fields(data)
+        return copy.deepcopy(data)
+
+    # The Redis tier is best-effort: an unreachable server just means a miss
+    async def _redis_get(self, key: str) -> Optional[Dict]:
+        try:
+            return await redis_client.get(self._redis_key(key))
+        except Exception:
+            return None
+
+    async def _store(self, key: str, data: Any, ttl: int) -> Dict:
+        entry = {"data": data, "fetched_at": time.time(), "volatile": has_volatile_fields(data)}
+        self._put_local(key, entry)
+        try:
+            await redis_client.set(self._redis_key(key), entry, ttl=self._servable_for(ttl))
+        except Exception:
+            pass
+        return entry
+
+    def _is_fresh(self, entry: Optional[Dict], ttl: int) -> bool:
+        """True when neither the body nor its volatile fields need a refresh."""
+        if entry is None:
+            return False
+        age = self._age(entry)
+        return age < ttl and not (entry.get("volatile") and age >= self.volatile_ttl)
+
+    def _refresh_in_background(self, key: str, ttl: int, fetch: Callable[[], Awaitable[Any]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def run():
+            try:
+                try:
+                    locked = await redis_client.acquire_lock(f"{self._redis_key(key)}:refresh", self.REFRESH_LOCK_TTL)
+                except Exception:
+                    locked = True
+                if not locked:
+                    return  # Another worker is refreshing this key
+                with quota_lane("background"):
+                    data = await fetch()
+                await self._store(key, data, ttl)
+                self._counts["refreshes"] += 1
+            except Exception as e:
+                # Keep serving the stale entry until it ages out
+                self._counts["refresh_failures"] += 1
+                print(f"⚠ Warning: Yelp cache refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get_or_fetch(self, key: str, ttl: int, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return cached data for key, calling fetch() on a miss or in the background when stale.
+
+        Args:
+            key: Cache key, unique per endpoint and parameters
+            ttl: Seconds the response is fresh for this endpoint
+            fetch: Coroutine factory that calls Yelp
+
+        Callers get a copy, so adding fields to a result never changes the cache.
+        """
+        entry = self._get_local(key)
+        if self._is_fresh(entry, ttl):
+            self._counts["hits"] += 1
+            return self._serve(entry)
+
+        # Another worker may have refreshed the key since we cached it
+        shared = await self._redis_get(key)
+        if shared is not None and (entry is None or shared["fetched_at"] > entry["fetched_at"]):
+            entry = shared
+            self._put_local(key, entry)
+            if self._is_fresh(entry, ttl):
+                self._counts["redis_hits"] += 1
+                return self._serve(entry)
+
+        # Stale body or stale hours / is_closed: serve now, refresh behind
+        if entry is not None and self._age(entry) < self._servable_for(ttl):
+            self._counts["stale_hits"] += 1
+            self._refresh_in_background(key, ttl, fetch)
+            return self._serve(entry)
+
+        self._counts["misses"] += 1
+        entry = await self._store(key, await fetch(), ttl)
+        return self._serve(entry)
+
+    def get_fresh(self, key: str, ttl: int) -> Optional[Any]:
+        """Copy of a fresh in-process entry, or None; never fetches or refreshes."""
+        entry = self._get_local(key)
+        if not self._is_fresh(entry, ttl):
+            return None
+        self._counts["hits"] += 1
+        return self._serve(entry)
+
+    async def invalidate(self, key: str):
+        """Drop one entry from both tiers."""
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            await redis_client.delete(self._redis_key(key))
+        except Exception:
+            pass
+
+    def clear(self):
+        """Empty the in-process tier and reset counters."""
+        with self._lock:
+            self._entries.clear()
+        self._counts = dict.fromkeys(self._counts, 0)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        counts = self._counts
+        lookups = counts["hits"] + counts["redis_hits"] + counts["stale_hits"] + counts["misses"]
+        return {
+            **counts,
+            "hit_rate": (lookups - counts["misses"]) / lookups if lookups else 0.0,
+            "refreshing": len(self._refreshing),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Global cache instance
+yelp_cache = YelpCache()
+
+
+def get_yelp_cache() -> YelpCache:
+    """Dependency to get Yelp response cache."""
+    return yelp_cache
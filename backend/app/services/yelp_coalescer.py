@@ -0,0 +1,209 @@
+"""Single-flight coalescing for identical Yelp requests."""
+
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.config import get_settings
+from app.core.exceptions import YelpAPIException, YelpQuotaExceededException
+from app.db.redis_client import redis_client
+from app.services.yelp_quota import LANES, YelpQuotaGovernor, current_lane, quota_lane
+
+settings = get_settings()
+
+# Publish a leader's result (KEYS[2], skipped when ARGV[2] is empty) and
+# drop its lock (KEYS[1]) only if it still holds the token in ARGV[1]; a
+# lock that expired and was retaken by another worker is left alone.
+_PUBLISH_SCRIPT = """
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+class YelpRequestCoalescer:
+    """Share one upstream call between concurrent identical requests.
+
+    Requests are keyed on method, endpoint and sorted params. In a process,
+    the first caller for a key starts the call and later callers await the
+    same task. The shared call takes its quota token in the most important
+    lane among its callers, so a user request joining a background refresh
+    is not queued behind the background reserve.
+
+    With yelp_coalesce_cross_worker on (and Redis connected), the caller
+    that takes a Redis lock makes the call and publishes the result (or
+    its error) to Redis, releasing the lock in the same round trip. The
+    lock holds a per-call token and outlives the longest call, so a slow
+    leader never releases a lock another worker has since taken.
+    Other workers poll for that result for up to yelp_coalesce_wait
+    seconds, then make the call themselves. This costs two Redis round
+    trips per upstream call; turn it off when workers rarely overlap.
+
+    Every caller gets its own copy of the result.
+    """
+
+    KEY_PREFIX = "yelp:inflight"
+    POLL_INTERVAL = 0.05  # Seconds between checks for another worker's result
+    RESULT_TTL = 2  # Seconds a published result stays readable; waiters read it within one poll
+    # Longest a leader's call can take: quota queueing, then connect, write and read
+    LOCK_TTL = math.ceil(
+        max(YelpQuotaGovernor.DEADLINES.values())
+        + settings.http_connect_timeout
+        + 2 * settings.http_read_timeout
+    )
+
+    def __init__(
+        self,
+        wait: float = settings.yelp_coalesce_wait,
+        enabled: bool = settings.yelp_coalesce_enabled,
+        cross_worker: bool = settings.yelp_coalesce_cross_worker,
+    ):
+        self.wait = wait
+        self.enabled = enabled
+        self.cross_worker = cross_worker
+        self._script = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lanes: Dict[str, Set[str]] = {}  # Lanes of the callers of each in-flight key
+        self._counts = dict.fromkeys(
+            ("calls", "upstream", "local_joins", "remote_joins", "remote_timeouts"), 0
+        )
+
+    @staticmethod
+    def request_key(method: str, endpoint: str, params: Optional[Dict] = None) -> str:
+        """Digest of the normalized request."""
+        encoded = json.dumps([method.upper(), endpoint, params or {}], sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return call()'s result, sharing one in-flight call per key."""
+        if not self.enabled:
+            return await call()
+        self._counts["calls"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counts["local_joins"] += 1
+            self._lanes.setdefault(key, set()).add(current_lane())
+        else:
+            self._lanes[key] = {current_lane()}
+            task = asyncio.create_task(self._lead(key, call))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._done(key))
+        # Shielded, so a cancelled caller does not cancel the call for the others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _done(self, key: str):
+        self._inflight.pop(key, None)
+        self._lanes.pop(key, None)
+
+    def _lane(self, key: str) -> str:
+        """Most important lane among the callers waiting on key."""
+        return min(self._lanes.get(key) or ("user",), key=LANES.index)
+
+    async def _lead(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        with quota_lane(lambda: self._lane(key)):
+            if not self.cross_worker or not redis_client.is_connected:
+                self._counts["upstream"] += 1
+                return await call()
+            return await self._lead_across_workers(key, call)
+
+    async def _lead_across_workers(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"{self.KEY_PREFIX}:{key}"
+        result_key = f"{lock_key}:result"
+        token = uuid.uuid4().hex
+        try:
+            owner = await redis_client.acquire_lock(lock_key, self.LOCK_TTL, token)
+        except Exception:
+            owner = True  # Redis unreachable: coalesce in-process only
+
+        if not owner:
+            shared = await self._await_result(lock_key, result_key)
+            if shared is not None:
+                self._counts["remote_joins"] += 1
+                if "error" in shared:
+                    raise self._shared_error(shared)
+                return shared["data"]
+            self._counts["remote_timeouts"] += 1
+
+        self._counts["upstream"] += 1
+        payload = None
+        try:
+            data = await call()
+            payload = {"data": data}
+            return data
+        except YelpAPIException as e:
+            payload = {
+                "error": e.detail,
+                "quota_exceeded": isinstance(e, YelpQuotaExceededException),
+            }
+            raise
+        finally:
+            if owner:
+                await self._publish_and_release(lock_key, result_key, token, payload)
+
+    @staticmethod
+    def _shared_error(shared: Dict) -> YelpAPIException:
+        """Rebuild another worker's error, keeping a quota 503 a 503."""
+        if shared.get("quota_exceeded"):
+            error = YelpQuotaExceededException()
+            error.detail = shared["error"]
+            return error
+        return YelpAPIException(shared["error"])
+
+    async def _await_result(self, lock_key: str, result_key: str) -> Optional[Dict]:
+        """Poll for another worker's result; None if it never arrives."""
+        give_up = time.monotonic() + self.wait
+        try:
+            while time.monotonic() < give_up:
+                shared = await redis_client.get(result_key)
+                if shared is not None:
+                    return shared
+                if not await redis_client.client.exists(lock_key):
+                    # Leader finished; its result may have landed just before the lock went
+                    return await redis_client.get(result_key)
+                await asyncio.sleep(self.POLL_INTERVAL)
+        except Exception:
+            pass
+        return None
+
+    # Publishing is best-effort: waiting workers fall back to their own call
+    async def _publish_and_release(self, lock_key: str, result_key: str, token: str, payload: Optional[Dict]):
+        """Store the result (if any) and drop our lock in one round trip."""
+        # One script, so waiters never see the lock gone without a result
+        try:
+            if self._script is None or self._script.registered_client is not redis_client.client:
+                self._script = redis_client.client.register_script(_PUBLISH_SCRIPT)
+            await self._script(
+                keys=[lock_key, result_key],
+                args=[token, json.dumps(payload) if payload is not None else "", self.RESULT_TTL],
+            )
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        """Coalescing counters for this process."""
+        calls = self._counts["calls"]
+        joins = self._counts["local_joins"] + self._counts["remote_joins"]
+        return {
+            **self._counts,
+            "coalesce_ratio": joins / calls if calls else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+
+# Global coalescer instance
+yelp_coalescer = YelpRequestCoalescer()
+
+
+def get_yelp_coalescer() -> YelpRequestCoalescer:
+    """Dependency to get Yelp request coalescer."""
+    return yelp_coalescer
@@ -0,0 +1,240 @@
+"""Cluster-wide rate limit for outbound Yelp calls."""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Union
+
+from app.config import get_settings
+from app.core.exceptions import YelpQuotaExceededException
+from app.db.redis_client import redis_client
+
+settings = get_settings()
+
+# Lanes from most to least important
+LANES = ("user", "background")
+
+# Lane for Yelp calls made in the current task; see quota_lane()
+_current_lane: ContextVar[Union[str, Callable[[], str]]] = ContextVar("yelp_quota_lane", default="user")
+
+
+def _resolve_lane(lane: Union[str, Callable[[], str]]) -> str:
+    lane = lane() if callable(lane) else lane
+    if lane not in LANES:
+        raise ValueError(f"Unknown Yelp quota lane: {lane}")
+    return lane
+
+
+def current_lane() -> str:
+    """Lane Yelp calls in the current task are made in."""
+    return _resolve_lane(_current_lane.get())
+
+
+@contextmanager
+def quota_lane(lane: Union[str, Callable[[], str]]):
+    """Run the enclosed Yelp calls in a lower-priority lane.
+
+    `lane` may also be a function returning the lane; it is asked again
+    on every retry while a call waits for a token, so a shared call can be
+    promoted when a more important caller starts waiting on it.
+
+    Example:
+        with quota_lane("background"):
+            await yelp_service.get_business(business_id)
+    """
+    if not callable(lane):
+        _resolve_lane(lane)
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+# Refill the shared bucket and take one token if the lane's reserve allows.
+# Returns the seconds to wait before trying again ("0" when taken); a string
+# because Redis truncates Lua numbers to integers.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local floor = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens - 1 >= floor then
+    tokens = tokens - 1
+    redis.call('HINCRBY', KEYS[2], ARGV[4], 1)
+else
+    wait = (floor + 1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class YelpQuotaGovernor:
+    """Token bucket shared by every worker through Redis.
+
+    The bucket refills at yelp_quota_per_second up to yelp_quota_burst
+    tokens, and each Yelp call takes one. Background calls (cache
+    refreshes) leave a reserve for user requests: they only take a token
+    while half of the bucket would remain, so under load they wait first
+    and user requests keep getting through.
+
+    Calls that cannot get a token wait, up to a per-lane deadline, and
+    then fail with YelpQuotaExceededException. Within a process a lane
+    does not try while a higher lane has callers waiting. A 429 from Yelp
+    empties the bucket. Without Redis each process keeps its own bucket.
+    """
+
+    BUCKET_KEY = "yelp:quota:bucket"
+    CONSUMED_KEY = "yelp:quota:consumed"
+    RESERVE = {"user": 0.0, "background": 0.5}  # Fraction of burst kept back
+    DEADLINES = {"user": 2.0, "background": 60.0}  # Seconds a call may queue
+    POLL_INTERVAL = 0.05  # Seconds between checks while a higher lane is waiting
+
+    def __init__(
+        self,
+        rate: float = settings.yelp_quota_per_second,
+        burst: int = settings.yelp_quota_burst,
+        enabled: bool = settings.yelp_quota_enabled,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.enabled = enabled
+        self._script = None
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiting = dict.fromkeys(LANES, 0)
+        self._consumed: Dict[str, int] = {}
+        self._counts = {lane: {"granted": 0, "waited": 0, "rejected": 0} for lane in LANES}
+        self._throttled = 0
+
+    def _take_local(self, floor: float) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens - 1 >= floor:
+            self._tokens -= 1
+            return 0.0
+        return (floor + 1 - self._tokens) / self.rate
+
+    async def _take(self, endpoint: str, floor: float) -> float:
+        """Try to take a token; returns 0 if taken, else seconds to wait."""
+        if redis_client.is_connected:
+            try:
+                if self._script is None:
+                    self._script = redis_client.client.register_script(_TAKE_SCRIPT)
+                wait = await self._script(
+                    keys=[self.BUCKET_KEY, self.CONSUMED_KEY],
+                    args=[self.rate, self.burst, floor, endpoint],
+                )
+                return float(wait)
+            except Exception:
+                pass  # Redis unreachable: fall back to this process's bucket
+        return self._take_local(floor)
+
+    async def acquire(self, endpoint: str, lane: Optional[str] = None, deadline: Optional[float] = None):
+        """Wait for a token for one call to `endpoint`.
+
+        Args:
+            endpoint: Name the call is counted under (e.g. "business")
+            lane: "user" or "background"; defaults to the lane set
+                with quota_lane(), else "user"
+            deadline: Seconds to queue before giving up (lane default;
+                shortened to the new lane's when the lane is promoted)
+
+        Raises:
+            YelpQuotaExceededException: No token within the deadline
+        """
+        if not self.enabled:
+            return
+        lane_of = lane or _current_lane.get()
+        lane = _resolve_lane(lane_of)
+        give_up = time.monotonic() + (self.DEADLINES[lane] if deadline is None else deadline)
+
+        self._waiting[lane] += 1
+        try:
+            waited = False
+            retry_at = time.monotonic()
+            while True:
+                promoted = _resolve_lane(lane_of)
+                if promoted != lane:
+                    self._waiting[lane] -= 1
+                    self._waiting[promoted] += 1
+                    lane = promoted
+                    retry_at = time.monotonic()  # Try again at once in the new lane
+                    if deadline is None:
+                        give_up = min(give_up, retry_at + self.DEADLINES[lane])
+
+                if time.monotonic() >= retry_at:
+                    wait = self.POLL_INTERVAL
+                    if not any(self._waiting[other] for other in LANES[:LANES.index(lane)]):
+                        wait = await self._take(endpoint, self.burst * self.RESERVE[lane])
+                        if wait <= 0:
+                            break
+                    if wait > give_up - time.monotonic():
+                        self._counts[lane]["rejected"] += 1
+                        raise YelpQuotaExceededException(endpoint)
+                    retry_at = time.monotonic() + wait
+                    waited = True
+
+                # A lane given as a function is checked for promotion while waiting
+                sleep = retry_at - time.monotonic()
+                if callable(lane_of):
+                    sleep = min(sleep, self.POLL_INTERVAL)
+                await asyncio.sleep(max(sleep, 0.0))
+        finally:
+            self._waiting[lane] -= 1
+
+        self._consumed[endpoint] = self._consumed.get(endpoint, 0) + 1
+        self._counts[lane]["granted"] += 1
+        if waited:
+            self._counts[lane]["waited"] += 1
+
+    async def throttled(self):
+        """Empty the bucket after Yelp answered 429."""
+        self._throttled += 1
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        if redis_client.is_connected:
+            try:
+                await redis_client.client.hset(self.BUCKET_KEY, "tokens", 0)
+            except Exception:
+                pass
+
+    async def cluster_consumed(self) -> Dict[str, int]:
+        """Tokens taken per endpoint by every worker (empty without Redis)."""
+        if not redis_client.is_connected:
+            return {}
+        try:
+            counts = await redis_client.client.hgetall(self.CONSUMED_KEY)
+        except Exception:
+            return {}
+        return {endpoint: int(count) for endpoint, count in counts.items()}
+
+    def stats(self) -> Dict:
+        """Tokens taken per endpoint and per-lane counters for this process."""
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "consumed": dict(self._consumed),
+            "lanes": {lane: {**counts, "waiting": self._waiting[lane]} for lane, counts in self._counts.items()},
+            "throttled": self._throttled,
+        }
+
+
+# Global governor instance
+yelp_quota_governor = YelpQuotaGovernor()
+
+
+def get_yelp_quota_governor() -> YelpQuotaGovernor:
+    """Dependency to get Yelp quota governor."""
+    return yelp_quota_governor
@@ -1,11 +1,17 @@
 """Yelp Fusion API service wrapper."""
 
-from typing import Optional, List, Dict, Any
+import asyncio
+import hashlib
+import json
+from typing import Optional, List, Dict, Any, Tuple
 import httpx
 
 from app.config import get_settings
 from app.core.exceptions import YelpAPIException
-from app.db.redis_client import redis_client
+from app.db.http_client import http_client
+from app.services.yelp_cache import yelp_cache
+from app.services.yelp_coalescer import yelp_coalescer
+from app.services.yelp_quota import yelp_quota_governor
 
 
 class YelpService:
@@ -20,6 +26,11 @@ class YelpService:
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
+        self.http = http_client
+        self.cache = yelp_cache
+        self.coalescer = yelp_coalescer
+        self.quota = yelp_quota_governor
+        self.settings = settings
 
     async def _make_request(
         self,
@@ -29,30 +40,60 @@ class YelpService:
         cache_key: Optional[str] = None,
         cache_ttl: int = 3600,
     ) -> Dict:
-        """Make HTTP request to Yelp API - always fetch fresh data, no caching."""
-        # DISABLED CACHING: Always fetch fresh data from Yelp API
-        # This ensures all restaurant data is real-time and up-to-date
+        """Make HTTP request to Yelp API, through the response cache when cache_key is set.
 
+        Identical GETs in flight at the same time share one upstream call.
+        """
+        def fetch():
+            if method.upper() != "GET":
+                return self._fetch(method, endpoint, params)
+            return self.coalescer.run(
+                self.coalescer.request_key(method, endpoint, params),
+                lambda: self._fetch(method, endpoint, params),
+            )
+
+        if cache_key is None:
+            return await fetch()
+        return await self.cache.get_or_fetch(cache_key, cache_ttl, fetch)
+
+    async def _fetch(self, method: str, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """Call the Yelp API once a quota token is available."""
+        await self.quota.acquire(self._endpoint_name(endpoint))
         url = f"{self.BASE_URL}{endpoint}"
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=30.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # No caching - always return fresh data from Yelp
-                return data
-            except httpx.HTTPStatusError as e:
-                raise YelpAPIException(f"Yelp API error: {e.response.status_code}")
-            except httpx.RequestError as e:
-                raise YelpAPIException(f"Yelp API request failed: {str(e)}")
+        # Shared pooled client: connections are kept alive between calls
+        client = self.http.client
+        try:
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=self.headers,
+                params=params,
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                await self.quota.throttled()
+            raise YelpAPIException(f"Yelp API error: {e.response.status_code}")
+        except httpx.RequestError as e:
+            raise YelpAPIException(f"Yelp API request failed: {str(e)}")
+
+    @staticmethod
+    def _endpoint_name(endpoint: str) -> str:
+        """Quota metrics name for an endpoint path, without business IDs."""
+        parts = endpoint.strip("/").split("/")
+        if parts[0] != "businesses":
+            return parts[0]
+        if parts[1] == "search":
+            return "phone" if parts[-1] == "phone" else "search"
+        return parts[2] if len(parts) > 2 else "business"
+
+    @staticmethod
+    def _params_key(params: Dict) -> str:
+        """Short stable digest of request params, for cache keys."""
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()[:16]
 
     async def search_businesses(
         self,
@@ -93,16 +134,22 @@ class YelpService:
         if open_now:
             params["open_now"] = True
 
-        return await self._make_request("GET", "/businesses/search", params=params)
+        return await self._make_request(
+            "GET",
+            "/businesses/search",
+            params=params,
+            cache_key=f"search:{self._params_key(params)}",
+            cache_ttl=self.settings.yelp_cache_search_ttl,
+        )
 
     async def get_business(self, business_id: str) -> Dict:
         """Get detailed business information."""
-        cache_key = f"yelp:business:{business_id}"
+        cache_key = f"business:{business_id}"
         return await self._make_request(
             "GET",
             f"/businesses/{business_id}",
             cache_key=cache_key,
-            cache_ttl=3600,
+            cache_ttl=self.settings.yelp_cache_business_ttl,
         )
 
     async def get_business_reviews(
@@ -118,19 +165,25 @@ class YelpService:
             "limit": limit,
             "sort_by": sort_by,
         }
-        cache_key = f"yelp:reviews:{business_id}"
+        cache_key = f"reviews:{business_id}:{self._params_key(params)}"
         return await self._make_request(
             "GET",
             f"/businesses/{business_id}/reviews",
             params=params,
             cache_key=cache_key,
-            cache_ttl=1800,  # 30 minutes
+            cache_ttl=self.settings.yelp_cache_reviews_ttl,
         )
 
     async def search_by_phone(self, phone: str) -> Dict:
         """Search for business by phone number."""
         params = {"phone": phone}
-        return await self._make_request("GET", "/businesses/search/phone", params=params)
+        return await self._make_request(
+            "GET",
+            "/businesses/search/phone",
+            params=params,
+            cache_key=f"phone:{phone}",
+            cache_ttl=self.settings.yelp_cache_search_ttl,
+        )
 
     async def get_autocomplete(
         self,
@@ -144,7 +197,13 @@ class YelpService:
         if latitude and longitude:
             params["latitude"] = latitude
             params["longitude"] = longitude
-        return await self._make_request("GET", "/autocomplete", params=params)
+        return await self._make_request(
+            "GET",
+            "/autocomplete",
+            params=params,
+            cache_key=f"autocomplete:{self._params_key(params)}",
+            cache_ttl=self.settings.yelp_cache_autocomplete_ttl,
+        )
 
     async def search_restaurants_for_taste(
         self,
@@ -183,16 +242,47 @@ class YelpService:
 
         return results.get("businesses", [])
 
-    async def get_restaurants_by_ids(self, business_ids: List[str]) -> List[Dict]:
-        """Get multiple restaurants by their IDs."""
-        restaurants = []
+    async def get_businesses(
+        self,
+        business_ids: List[str],
+        concurrency: Optional[int] = None,
+    ) -> Tuple[List[Optional[Dict]], Dict[str, str]]:
+        """Fetch many businesses concurrently.
+
+        Fresh cached entries are read first; the rest are fetched at most
+        `concurrency` at a time (yelp_bulk_concurrency by default), each
+        distinct ID once.
+
+        Returns:
+            Businesses in input order (None where the fetch failed), and
+            the error message for each failed ID
+        """
+        ttl = self.settings.yelp_cache_business_ttl
+        found: Dict[str, Dict] = {}
         for business_id in business_ids:
-            try:
-                restaurant = await self.get_business(business_id)
-                restaurants.append(restaurant)
-            except YelpAPIException:
-                continue  # Skip failed requests
-        return restaurants
+            if business_id not in found:
+                cached = self.cache.get_fresh(f"business:{business_id}", ttl)
+                if cached is not None:
+                    found[business_id] = cached
+
+        missing = list(dict.fromkeys(i for i in business_ids if i not in found))
+        errors: Dict[str, str] = {}
+        semaphore = asyncio.Semaphore(concurrency or self.settings.yelp_bulk_concurrency)
+
+        async def fetch(business_id: str):
+            async with semaphore:
+                try:
+                    found[business_id] = await self.get_business(business_id)
+                except YelpAPIException as e:
+                    errors[business_id] = e.detail
+
+        await asyncio.gather(*(fetch(business_id) for business_id in missing))
+        return [found.get(business_id) for business_id in business_ids], errors
+
+    async def get_restaurants_by_ids(self, business_ids: List[str]) -> List[Dict]:
+        """Get multiple restaurants by their IDs (failed lookups are skipped)."""
+        restaurants, _ = await self.get_businesses(business_ids)
+        return [restaurant for restaurant in restaurants if restaurant is not None]
 
 
 # Global service instance
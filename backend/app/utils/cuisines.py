@@ -0,0 +1,54 @@
+"""Known cuisine types and their bitmask encoding."""
+
+from typing import Iterable, List
+
+import numpy as np
+
+# Cuisine vocabulary shared by the encoder one-hot and the bitmask
+CUISINE_TYPES = [
+    "italian", "japanese", "mexican", "chinese", "indian", "thai",
+    "french", "mediterranean", "korean", "vietnamese", "american",
+    "middle_eastern", "greek", "spanish", "ethiopian", "brazilian",
+]
+
+CUISINE_INDEX = {cuisine: i for i, cuisine in enumerate(CUISINE_TYPES)}
+
+
+def normalize_cuisine(cuisine: str) -> str:
+    """Map display names like "Middle Eastern" to CUISINE_TYPES keys."""
+    return cuisine.lower().replace(" ", "_")
+
+
+def cuisine_mask(cuisines: Iterable[str]) -> int:
+    """Bitmask of the known cuisines in a list (bit i = CUISINE_TYPES[i])."""
+    mask = 0
+    for cuisine in cuisines or []:
+        idx = CUISINE_INDEX.get(normalize_cuisine(cuisine))
+        if idx is not None:
+            mask |= 1 << idx
+    return mask
+
+
+def cuisines_from_mask(mask: int) -> List[str]:
+    """CUISINE_TYPES keys set in a bitmask."""
+    return [cuisine for i, cuisine in enumerate(CUISINE_TYPES) if mask >> i & 1]
+
+
+def shared_cuisines(cuisines: Iterable[str], other_mask: int) -> List[str]:
+    """Entries of `cuisines` (original spelling kept) also set in other_mask."""
+    return [cuisine for cuisine in cuisines or [] if cuisine_mask([cuisine]) & other_mask]
+
+
+# Set bits of every 16-bit value, for vectorized popcounts
+_POPCOUNT16 = np.unpackbits(np.arange(2**16, dtype=np.uint16).view(np.uint8).reshape(-1, 2), axis=1).sum(axis=1).astype(np.uint8)
+
+
+def popcount(masks: np.ndarray) -> np.ndarray:
+    """Number of cuisines set in each entry of `masks`."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return _POPCOUNT16[masks & 0xFFFF] + _POPCOUNT16[masks >> 16]
+
+
+def overlap_counts(mask: int, masks: np.ndarray) -> np.ndarray:
+    """Number of cuisines shared between `mask` and each entry of `masks`."""
+    return popcount(np.bitwise_and(np.asarray(masks, dtype=np.uint32), np.uint32(mask)))
@@ -0,0 +1,74 @@
+"""
+TasteSync Embedding Throughput Benchmark
+Compares per-profile generate_embedding against batched generate_embeddings
+
+Usage:
+    python benchmark_embeddings.py [--sizes 1000 10000 100000] [--batch-size 1024]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from app.ai.embeddings.taste_encoder import (
+    AMBIANCE_TYPES,
+    CUISINE_TYPES,
+    taste_embedding_service,
+)
+
+# The per-profile path is slow; cap it so large runs finish in reasonable time
+SINGLE_SAMPLE_LIMIT = 10000
+
+
+def generate_profiles(count: int, seed: int = 42) -> List[Dict]:
+    """Generate random TasteDNA dicts."""
+    rng = random.Random(seed)
+    return [
+        {
+            "adventure_score": rng.random(),
+            "spice_tolerance": rng.random(),
+            "price_sensitivity": rng.random(),
+            "cuisine_diversity": rng.random(),
+            "preferred_cuisines": rng.sample(CUISINE_TYPES, rng.randint(1, 5)),
+            "ambiance_preference": rng.choice(AMBIANCE_TYPES),
+        }
+        for _ in range(count)
+    ]
+
+
+def bench_single(profiles: List[Dict]) -> float:
+    """Return users/sec encoding one profile at a time."""
+    sample = profiles[:SINGLE_SAMPLE_LIMIT]
+    start = time.perf_counter()
+    for dna in sample:
+        taste_embedding_service.generate_embedding(dna)
+    return len(sample) / (time.perf_counter() - start)
+
+
+def bench_batched(profiles: List[Dict], batch_size: int) -> float:
+    """Return users/sec encoding all profiles in batches."""
+    start = time.perf_counter()
+    taste_embedding_service.generate_embeddings(profiles, batch_size=batch_size)
+    return len(profiles) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=taste_embedding_service.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    engine = "numpy weights" if taste_embedding_service.model is not None else "fallback"
+    print(f"encoder: {engine}, batch size: {args.batch_size}")
+    print(f"{'profiles':>10} {'single users/s':>16} {'batched users/s':>16} {'speedup':>8}")
+
+    for size in args.sizes:
+        profiles = generate_profiles(size)
+        single = bench_single(profiles)
+        batched = bench_batched(profiles, args.batch_size)
+        print(f"{size:>10} {single:>16,.0f} {batched:>16,.0f} {batched / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+TasteSync Encoder Cold-Start Benchmark
+Measures import time and peak RSS of a fresh process building the embedding
+service: torch model (old startup path) vs NumPy engine on exported weights
+
+Usage:
+    python benchmark_encoder_startup.py [--weights ./taste_encoder.npz] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each snippet prints "<seconds> <max_rss_kb>" from inside the child process
+PROBE = """
+import resource, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+TORCH_STARTUP = """
+from app.ai.embeddings.torch_encoder import TasteEncoder
+model = TasteEncoder(input_dim=64, embedding_dim=512)
+model.eval()
+"""
+
+NUMPY_STARTUP = """
+from app.ai.embeddings.taste_encoder import TasteEmbeddingService
+service = TasteEmbeddingService(weights_path={weights!r})
+assert service.model is not None
+"""
+
+
+def measure(body: str, runs: int):
+    times, rss = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(body=body)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[-2]))
+        rss.append(int(out[-1]))
+    return statistics.median(times), statistics.median(rss) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--weights", default=os.path.join(BACKEND_DIR, "taste_encoder.npz"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.ai.embeddings.taste_encoder import TORCH_AVAILABLE
+    if not TORCH_AVAILABLE:
+        sys.exit("torch is required to measure the torch startup path and export weights")
+
+    if not os.path.exists(args.weights):
+        from app.ai.embeddings.torch_encoder import ensure_initialized_weights
+        from app.config import get_settings
+        ensure_initialized_weights(args.weights, embedding_dim=get_settings().embedding_dim)
+
+    print(f"{'startup path':>14} {'seconds':>10} {'max RSS MB':>12}")
+    for label, body in (
+        ("torch", TORCH_STARTUP),
+        ("numpy", NUMPY_STARTUP.format(weights=args.weights)),
+    ):
+        seconds, rss_mb = measure(body, args.runs)
+        print(f"{label:>14} {seconds:>10.3f} {rss_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
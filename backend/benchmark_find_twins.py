@@ -0,0 +1,132 @@
+"""
+TasteSync find_twins Enrichment Benchmark
+Counts SQL queries and wall time spent enriching vector matches in find_twins,
+comparing the old per-match lookups with the bulk IN enrichment
+
+Usage:
+    python benchmark_find_twins.py [--sizes 100 1000 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+# Point the app at a scratch SQLite database before settings are loaded
+DB_PATH = os.path.join(tempfile.gettempdir(), "find_twins_bench.db")
+os.environ["DATABASE_URL_ENV"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import event, insert, select
+
+from app.ai.embeddings.taste_encoder import CUISINE_TYPES
+from app.db.session import async_session_maker, engine, init_db
+from app.models.taste_dna import TasteDNA
+from app.models.user import User
+from app.utils.cuisines import cuisine_mask
+from app.services.twin_matching_service import TwinMatchingService
+
+
+class SimulatedVectorStore:
+    """Returns the first top_k seeded users as matches, without a vector search."""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    async def find_taste_twins(self, user_id, embedding, top_k=10, filter_dict=None):
+        return self.matches[:top_k]
+
+
+class LegacyTwinMatchingService(TwinMatchingService):
+    """find_twins enrichment as it was: one SELECT per match."""
+
+    async def _load_twin_profiles(self, db, user_ids):
+        profiles = {}
+        for user_id in user_ids:
+            result = await db.execute(select(User).where(User.id == user_id))
+            twin_user = result.scalar_one_or_none()
+            if twin_user:
+                profiles[str(user_id)] = (twin_user, None)
+        return profiles
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+async def seed(num_users: int):
+    rng = random.Random(42)
+    user_rows, dna_rows, matches = [], [], []
+    for i in range(num_users):
+        user_id = f"00000000-0000-0000-0000-{i:012d}"
+        cuisines = rng.sample(CUISINE_TYPES, 3)
+        user_rows.append({"id": user_id, "email": f"bench{i}@example.com", "password_hash": "x", "name": f"Bench {i}"})
+        dna_rows.append({
+            "user_id": user_id,
+            "adventure_score": rng.random(),
+            "spice_tolerance": rng.random(),
+            "price_sensitivity": rng.random(),
+            "cuisine_diversity": rng.random(),
+            "preferred_cuisines": cuisines,
+            "cuisine_mask": cuisine_mask(cuisines),
+        })
+        matches.append({
+            "user_id": user_id,
+            "similarity_score": 1.0 - i / num_users,
+            "metadata": {"preferred_cuisines": cuisines},
+        })
+
+    async with async_session_maker() as db:
+        await db.execute(insert(User), user_rows)
+        await db.execute(insert(TasteDNA), dna_rows)
+        await db.commit()
+    return matches
+
+
+async def measure(service: TwinMatchingService, counter: QueryCounter, top_k: int, query_dna: TasteDNA):
+    async with async_session_maker() as db:
+        before = counter.count
+        start = time.perf_counter()
+        twins = await service.find_twins(db, "bench-user", query_dna, top_k=top_k)
+        elapsed = time.perf_counter() - start
+    return len(twins), counter.count - before, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    await init_db()
+    matches = await seed(max(args.sizes))
+    counter = QueryCounter()
+
+    query_dna = TasteDNA(
+        adventure_score=0.5, spice_tolerance=0.5, price_sensitivity=0.5,
+        cuisine_diversity=0.5, preferred_cuisines=CUISINE_TYPES[:4],
+    )
+    services = {"per-match": LegacyTwinMatchingService(), "bulk IN": TwinMatchingService()}
+    for service in services.values():
+        service.pinecone = SimulatedVectorStore(matches)
+
+    print(f"{'matches':>8} {'mode':>10} {'queries':>8} {'wall ms':>10}")
+    for size in args.sizes:
+        for label, service in services.items():
+            found, queries, elapsed = await measure(service, counter, size, query_dna)
+            print(f"{size:>8} {label:>10} {queries:>8} {elapsed * 1000:>10.1f}")
+
+    await engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
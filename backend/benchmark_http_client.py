@@ -0,0 +1,130 @@
+"""
+TasteSync Yelp HTTP Client Benchmark
+Requests/sec against a local stub server with a new httpx client per call
+(old behaviour) vs the shared pooled client
+
+Usage:
+    python benchmark_http_client.py [--requests 2000] [--concurrency 20] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.exceptions import YelpAPIException
+from app.db.http_client import HTTPClient
+from app.services.yelp_service import YelpService
+
+BODY = json.dumps({"id": "stub-business", "name": "Stub Bistro", "rating": 4.5}).encode()
+
+
+class StubServer:
+    """Minimal HTTP/1.1 keep-alive server answering every request with BODY."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                self.requests += 1
+                if self.latency_s:
+                    await asyncio.sleep(self.latency_s)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class PerRequestClientYelpService(YelpService):
+    """Opens a new httpx.AsyncClient for every call, as before the shared client."""
+
+    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, **kwargs) -> Dict:
+        async with httpx.AsyncClient() as client:
+            try:
+                response = await client.request(
+                    method=method,
+                    url=f"{self.BASE_URL}{endpoint}",
+                    headers=self.headers,
+                    params=params,
+                    timeout=30.0,
+                )
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                raise YelpAPIException(f"Yelp API request failed: {str(e)}")
+
+
+def make_service(cls, base_url: str) -> YelpService:
+    service = cls()
+    service.BASE_URL = base_url
+    service.headers["Authorization"] = "Bearer stub-key"
+    service.quota.enabled = False  # Measure the client, not the rate limit
+    return service
+
+
+async def run(service: YelpService, total: int, concurrency: int) -> float:
+    """Return requests/sec for `total` get_business calls."""
+    remaining = iter(range(total))
+
+    async def worker():
+        for i in remaining:
+            await service.get_business(f"biz-{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stub server think time")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency_ms / 1000)
+    base_url = await server.start()
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency_ms:.0f}ms server latency")
+    print(f"{'client':>12} {'req/s':>10} {'connections':>12}")
+
+    per_request = make_service(PerRequestClientYelpService, base_url)
+    shared = make_service(YelpService, base_url)
+    shared.http = HTTPClient()
+
+    for label, service in (("per-request", per_request), ("shared", shared)):
+        before = server.connections
+        rate = await run(service, args.requests, args.concurrency)
+        print(f"{label:>12} {rate:>10,.0f} {server.connections - before:>12}")
+
+    await shared.http.disconnect()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+TasteSync MIN_TWINS Backfill Benchmark
+Measures TasteProfileIndex.nearest latency and checks it against an exact full sort
+
+Usage:
+    python benchmark_twin_backfill.py [--sizes 10000 100000 1000000] [--queries 50] [--k 5]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.taste_profile_index import TasteProfileIndex
+from app.utils.cuisines import CUISINE_TYPES, cuisine_mask
+
+
+def build_index(size: int, seed: int = 42) -> TasteProfileIndex:
+    """Fill an index with random profiles, as a load from the database would."""
+    rng = np.random.default_rng(seed)
+    index = TasteProfileIndex()
+    index._set_rows(
+        np.array([f"user-{i:08d}".encode() for i in range(size)], dtype="S36"),
+        rng.random((4, size), dtype=np.float32),
+        rng.integers(0, 2 ** len(CUISINE_TYPES), size, dtype=np.uint32),
+    )
+    index.loaded_at = time.monotonic()
+    return index
+
+
+def random_profile(rng: random.Random) -> SimpleNamespace:
+    return SimpleNamespace(
+        user_id="query",
+        adventure_score=rng.random(),
+        spice_tolerance=rng.random(),
+        price_sensitivity=rng.random(),
+        cuisine_diversity=rng.random(),
+        cuisine_mask=cuisine_mask(rng.sample(CUISINE_TYPES, rng.randint(1, 5))),
+    )
+
+
+def exact_scores(index: TasteProfileIndex, profile, k: int) -> list:
+    """Top-k scores by sorting every user, for checking nearest()."""
+    full = index.nearest(profile, index.size)
+    return [score for _, score in full[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'MB':>8} {'p50 ms':>8} {'p99 ms':>8} {'exact':>6}")
+    for size in args.sizes:
+        index = build_index(size)
+        nbytes = sum(a.nbytes for a in (index.ids, index.scores, index.masks, index.cuisine_counts))
+        rng = random.Random(size)
+        profiles = [random_profile(rng) for _ in range(args.queries)]
+
+        timings = []
+        for profile in profiles:
+            start = time.perf_counter()
+            index.nearest(profile, args.k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        exact = all(
+            np.allclose([s for _, s in index.nearest(p, args.k)], exact_scores(index, p, args.k))
+            for p in profiles[:5]
+        )
+        p99 = sorted(timings)[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{size:>10} {nbytes / 2**20:>8.1f} {statistics.median(timings):>8.1f} {p99:>8.1f} {str(exact):>6}")
+
+
+if __name__ == "__main__":
+    main()
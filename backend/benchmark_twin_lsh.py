@@ -0,0 +1,79 @@
+"""
+TasteSync Twin LSH Benchmark
+Measures TwinLSHIndex query latency and recall against exact cosine search
+
+Usage:
+    python benchmark_twin_lsh.py [--sizes 10000 100000] [--queries 200] [--k 10 50]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.ai.embeddings.taste_encoder import taste_embedding_service
+from app.services.twin_lsh_index import TwinLSHIndex
+from benchmark_embeddings import generate_profiles
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench(size: int, queries: int, ks) -> None:
+    embeddings = taste_embedding_service.generate_embeddings(generate_profiles(size))
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    user_ids = [str(i) for i in range(size)]
+
+    index = TwinLSHIndex(dim=embeddings.shape[1])
+    start = time.perf_counter()
+    index.build(user_ids, embeddings)
+    build_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(size)
+    sample = rng.choice(size, min(queries, size), replace=False)
+
+    for k in ks:
+        # Time the LSH queries on their own, so exact scans don't evict caches
+        results, latencies = [], []
+        for i in sample.tolist():
+            start = time.perf_counter()
+            results.append(index.query(embeddings[i], k, exclude_id=user_ids[i]))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        recalls, candidates, exact_sim, approx_sim = [], [], [], []
+        for i, matches in zip(sample.tolist(), results):
+            sims = embeddings @ embeddings[i]
+            sims[i] = -np.inf
+            exact = np.argpartition(-sims, k - 1)[:k]
+
+            found = [int(user_id) for user_id, _ in matches]
+            recalls.append(len(set(found) & set(exact.tolist())) / k)
+            candidates.append(len(index._candidates(index._bands(index.signature(embeddings[i]))[0])))
+            exact_sim.append(float(sims[exact].mean()))
+            approx_sim.append(float(sims[found].mean()) if found else 0.0)
+
+        print(
+            f"{size:>8} {k:>4} {build_s:>8.2f} {statistics.median(candidates):>8.0f} "
+            f"{statistics.median(latencies):>8.3f} {percentile(latencies, 99):>8.3f} "
+            f"{statistics.mean(recalls):>7.3f} {statistics.mean(exact_sim):>8.4f} {statistics.mean(approx_sim):>8.4f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50])
+    args = parser.parse_args()
+
+    print("exact/approx = mean true cosine of the exact and of the returned twins")
+    print(f"{'users':>8} {'k':>4} {'build s':>8} {'cands':>8} {'p50 ms':>8} {'p99 ms':>8} {'recall':>7} {'exact':>8} {'approx':>8}")
+    for size in args.sizes:
+        bench(size, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
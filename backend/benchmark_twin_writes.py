@@ -0,0 +1,143 @@
+"""
+TasteSync Twin Relationship Write Benchmark
+Rewrites one user's twin list with the old delete-all + per-row INSERT writer
+and with the diff-based bulk upsert, and reports statements and wall time
+
+Usage:
+    python benchmark_twin_writes.py [--edges 10000] [--changed 0.1] [--replaced 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+# Point the app at a scratch SQLite database before settings are loaded
+DB_PATH = os.path.join(tempfile.gettempdir(), "twin_writes_bench.db")
+os.environ["DATABASE_URL_ENV"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import delete, event, insert, select
+
+from app.db.session import async_session_maker, engine, init_db
+from app.models.twin_relationship import TwinRelationship
+from app.models.user import User
+from app.services.twin_matching_service import TwinMatchingService
+
+OWNER_ID = "00000000-0000-0000-0000-ffffffffffff"
+
+
+class LegacyTwinMatchingService(TwinMatchingService):
+    """update_twin_relationships as it was: delete all, then db.add per row."""
+
+    async def update_twin_relationships(self, db, user_id, twins, replace=True):
+        await db.execute(delete(TwinRelationship).where(TwinRelationship.user_id == str(user_id)))
+        for twin in twins:
+            db.add(TwinRelationship(
+                user_id=str(user_id),
+                twin_user_id=twin["twin_id"],
+                similarity_score=twin["similarity_score"],
+                common_cuisines=twin["shared_cuisines"],
+            ))
+        await db.commit()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def user_id(i: int) -> str:
+    return f"00000000-0000-0000-0000-{i:012d}"
+
+
+def make_twins(ids, rng: random.Random):
+    return [
+        {"twin_id": twin_id, "similarity_score": rng.random(), "shared_cuisines": ["thai"]}
+        for twin_id in ids
+    ]
+
+
+def next_generation(twins, changed: float, replaced: float, spare_ids, rng: random.Random):
+    """Rescore a fraction of twins and swap another fraction for new users."""
+    result = []
+    for twin in twins:
+        roll = rng.random()
+        if roll < replaced and spare_ids:
+            twin = {**twin, "twin_id": spare_ids.pop(), "similarity_score": rng.random()}
+        elif roll < replaced + changed:
+            twin = {**twin, "similarity_score": rng.random()}
+        result.append(twin)
+    return result
+
+
+async def rewrite(service, counter, twins) -> tuple:
+    async with async_session_maker() as db:
+        before = counter.count
+        start = time.perf_counter()
+        await service.update_twin_relationships(db, OWNER_ID, twins)
+        return counter.count - before, time.perf_counter() - start
+
+
+async def check_stored(twins):
+    """Fail loudly if the stored rows differ from the list just written."""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(TwinRelationship.twin_user_id, TwinRelationship.similarity_score)
+            .where(TwinRelationship.user_id == OWNER_ID)
+        )
+        stored = dict(result.all())
+    expected = {t["twin_id"]: t["similarity_score"] for t in twins}
+    if stored != expected:
+        raise SystemExit("stored twin rows do not match the rewritten list")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=10000)
+    parser.add_argument("--changed", type=float, default=0.1, help="fraction of twins rescored")
+    parser.add_argument("--replaced", type=float, default=0.1, help="fraction of twins replaced")
+    args = parser.parse_args()
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    await init_db()
+
+    num_users = args.edges * 2
+    async with async_session_maker() as db:
+        await db.execute(insert(User), [
+            {"id": uid, "email": f"{uid}@example.com", "password_hash": "x", "name": uid}
+            for uid in [OWNER_ID] + [user_id(i) for i in range(num_users)]
+        ])
+        await db.commit()
+
+    counter = StatementCounter()
+    print(f"{args.edges} edges, {args.changed:.0%} rescored, {args.replaced:.0%} replaced per rewrite")
+    print(f"{'writer':>10} {'rewrite':>8} {'statements':>11} {'wall ms':>10}")
+    for label, service in (("legacy", LegacyTwinMatchingService()), ("diff", TwinMatchingService())):
+        async with async_session_maker() as db:
+            await db.execute(delete(TwinRelationship))
+            await db.commit()
+
+        rng = random.Random(7)
+        twins = make_twins([user_id(i) for i in range(args.edges)], rng)
+        spare_ids = [user_id(i) for i in range(args.edges, num_users)]
+        statements, elapsed = await rewrite(service, counter, twins)
+        print(f"{label:>10} {'initial':>8} {statements:>11} {elapsed * 1000:>10.1f}")
+        twins = next_generation(twins, args.changed, args.replaced, spare_ids, rng)
+        statements, elapsed = await rewrite(service, counter, twins)
+        print(f"{label:>10} {'update':>8} {statements:>11} {elapsed * 1000:>10.1f}")
+        await check_stored(twins)
+
+    await engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+TasteSync Vector Index Recall/Memory Benchmark
+Compares embedding dimension and storage precision in the local vector index.
+"recall" is against exact float32 search at the same dimension (quantization
+loss); "vs 512" is overlap with exact float32 search at the production
+dimension (dimension-reduction effect).
+
+Usage:
+    python benchmark_vector_index.py [--users 100000] [--queries 200] [--top-k 10]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.ai.embeddings.taste_encoder import TasteEmbeddingService
+from app.db.local_vector_index import LocalVectorIndex
+from benchmark_embeddings import generate_profiles
+
+BASELINE_DIM = 512
+
+# (dimension, storage, rescore)
+CONFIGS = [
+    (512, "float32", False),
+    (512, "float16", False),
+    (512, "int8", False),
+    (512, "int8", True),
+    (64, "float32", False),
+    (64, "float16", True),
+    (64, "int8", False),
+    (64, "int8", True),
+    (32, "float32", False),
+    (32, "int8", True),
+]
+
+
+def encode(profiles, dim: int) -> np.ndarray:
+    """Encode with the fallback projection at the given output dimension."""
+    service_cls = type(f"EmbeddingService{dim}", (TasteEmbeddingService,), {"EMBEDDING_DIM": dim})
+    return service_cls(weights_path="").generate_embeddings(profiles)
+
+
+async def build_index(embeddings: np.ndarray, storage: str, rescore: bool) -> LocalVectorIndex:
+    index_cls = type(
+        f"LocalVectorIndex{embeddings.shape[1]}",
+        (LocalVectorIndex,),
+        {"EMBEDDING_DIM": embeddings.shape[1]},
+    )
+    index = index_cls(storage=storage, rescore=rescore)
+    await index.batch_upsert(
+        [{"id": str(i), "values": vector, "metadata": {}} for i, vector in enumerate(embeddings)]
+    )
+    return index
+
+
+async def query_all(index, embeddings, query_ids, top_k):
+    results, latencies = [], []
+    for qid in query_ids:
+        start = time.perf_counter()
+        matches = await index.find_taste_twins(str(qid), embeddings[qid], top_k=top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({m["user_id"] for m in matches})
+    return results, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = generate_profiles(args.users)
+    query_ids = np.random.default_rng(0).choice(args.users, args.queries, replace=False)
+    encoded = {dim: encode(profiles, dim) for dim in sorted({c[0] for c in CONFIGS})}
+
+    truth = {}
+    for dim, embeddings in encoded.items():
+        exact = await build_index(embeddings, "float32", False)
+        truth[dim], _ = await query_all(exact, embeddings, query_ids, args.top_k)
+
+    def overlap(found, expected):
+        return np.mean([len(f & t) / len(t) for f, t in zip(found, expected)])
+
+    print(f"{args.users} users, {args.queries} queries, recall@{args.top_k}")
+    print(f"{'dim':>5} {'storage':>8} {'rescore':>8} {'MB':>9} {'recall':>8} {'vs 512':>8} {'mean ms':>9} {'p99 ms':>8}")
+    for dim, storage, rescore in CONFIGS:
+        index = await build_index(encoded[dim], storage, rescore)
+        found, latencies = await query_all(index, encoded[dim], query_ids, args.top_k)
+        recall = overlap(found, truth[dim])
+        baseline_overlap = overlap(found, truth[BASELINE_DIM])
+        stats = await index.get_index_stats()
+        mb = stats["namespaces"][index.DEFAULT_NAMESPACE]["storage_bytes"] / 2**20
+        print(
+            f"{dim:>5} {storage:>8} {str(rescore):>8} {mb:>9.1f} {recall:>8.3f} {baseline_overlap:>8.3f} "
+            f"{np.mean(latencies):>9.2f} {np.percentile(latencies, 99):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+TasteSync Vector Store Event-Loop Benchmark
+Measures latency of an unrelated endpoint while twin queries are in flight,
+with Pinecone SDK calls run inline (old behaviour) vs on the bounded executor
+
+Usage:
+    python benchmark_vector_store.py [--query-latency-ms 50] [--twin-requests 16]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.db.pinecone_client import PineconeClient
+
+
+class SimulatedIndex:
+    """Stand-in for the synchronous Pinecone SDK index with fixed latency."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def query(self, **kwargs):
+        time.sleep(self.latency_s)
+        return type("QueryResponse", (), {"matches": []})()
+
+
+class InlinePineconeClient(PineconeClient):
+    """Calls the SDK directly on the event loop, as before the executor."""
+
+    async def _call(self, method: str, **kwargs):
+        return self._invoke(method, **kwargs)
+
+
+def build_app(client: PineconeClient) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/twins")
+    async def twins():
+        return await client.find_taste_twins("bench", [0.0] * client.EMBEDDING_DIM, top_k=10)
+
+    return app
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(client: PineconeClient, twin_workers: int, duration_s: float, interval_s: float) -> dict:
+    transport = httpx.ASGITransport(app=build_app(client))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        latencies = []
+        done = asyncio.Event()
+
+        async def twin_worker():
+            while not done.is_set():
+                await http.get("/twins")
+                await asyncio.sleep(0)  # ASGITransport may not yield on its own
+
+        async def timed_health(intended: float):
+            await http.get("/health")
+            latencies.append((time.perf_counter() - intended) * 1000)
+
+        # Open-loop probes: latency is measured from the intended send time,
+        # so time spent waiting on a blocked event loop is counted.
+        workers = [asyncio.create_task(twin_worker()) for _ in range(twin_workers)]
+        await asyncio.sleep(interval_s)
+        start = time.perf_counter()
+        probe_tasks = []
+        sent = 0
+        while time.perf_counter() - start < duration_s:
+            # Issue every probe that is due, including ones delayed by a blocked loop
+            now = time.perf_counter()
+            while start + sent * interval_s <= now:
+                probe_tasks.append(asyncio.create_task(timed_health(start + sent * interval_s)))
+                sent += 1
+            await asyncio.sleep(max(0.0, start + sent * interval_s - time.perf_counter()))
+        await asyncio.gather(*probe_tasks)
+        done.set()
+        await asyncio.gather(*workers)
+
+    return {
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+    }
+
+
+def make_client(cls, latency_s: float) -> PineconeClient:
+    client = cls()
+    client._index = SimulatedIndex(latency_s)
+    client._initialized = True
+    return client
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--query-latency-ms", type=float, default=50.0)
+    parser.add_argument("--twin-requests", type=int, default=16, help="concurrent twin query workers")
+    parser.add_argument("--duration-s", type=float, default=2.0)
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    latency_s = args.query_latency_ms / 1000
+
+    print(f"{args.twin_requests} twin queries in flight, {args.query_latency_ms:.0f}ms each")
+    print(f"{'mode':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for label, cls in (("inline", InlinePineconeClient), ("executor", PineconeClient)):
+        client = make_client(cls, latency_s)
+        stats = await run(client, args.twin_requests, args.duration_s, args.probe_interval_ms / 1000)
+        client.shutdown()
+        print(f"{label:>10} {stats['p50']:>10.1f} {stats['p99']:>10.1f} {stats['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+TasteSync Yelp Response Cache Benchmark
+get_business latency and upstream calls against a local stub server, uncached
+vs the tiered cache, for a skewed (Zipf) mix of business ids
+
+Usage:
+    python benchmark_yelp_cache.py [--requests 5000] [--businesses 1000] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from app.db.http_client import HTTPClient
+from app.services.yelp_cache import YelpCache
+from app.services.yelp_service import YelpService
+from benchmark_http_client import StubServer, make_service
+
+
+class UncachedYelpService(YelpService):
+    """Every call goes to the network, as before the cache."""
+
+    async def _make_request(self, method, endpoint, params=None, cache_key=None, cache_ttl=3600):
+        return await self._fetch(method, endpoint, params)
+
+
+async def run(service: YelpService, business_ids: list, concurrency: int) -> list:
+    """Per-call latencies in ms."""
+    remaining = iter(business_ids)
+    timings = []
+
+    async def worker():
+        for business_id in remaining:
+            start = time.perf_counter()
+            await service.get_business(business_id)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--businesses", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub server think time")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    ranks = np.minimum(rng.zipf(1.3, args.requests), args.businesses)
+    business_ids = [f"biz-{rank}" for rank in ranks.tolist()]
+
+    server = StubServer(args.latency_ms / 1000)
+    base_url = await server.start()
+    http = HTTPClient()
+    print(f"{args.requests} calls over {args.businesses} businesses, {args.latency_ms:.0f}ms server latency")
+    print(f"{'service':>10} {'upstream':>9} {'p50 ms':>8} {'p99 ms':>8} {'total s':>8}")
+
+    uncached = make_service(UncachedYelpService, base_url)
+    cached = make_service(YelpService, base_url)
+    cached.cache = YelpCache()
+    for label, service in (("uncached", uncached), ("cached", cached)):
+        service.http = http
+        before = server.requests
+        start = time.perf_counter()
+        timings = sorted(await run(service, business_ids, args.concurrency))
+        elapsed = time.perf_counter() - start
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(
+            f"{label:>10} {server.requests - before:>9} {statistics.median(timings):>8.2f} "
+            f"{p99:>8.2f} {elapsed:>8.2f}"
+        )
+
+    await http.disconnect()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+TasteSync Yelp Request Coalescing Benchmark
+Upstream calls and latency for bursts of identical search_businesses calls
+against a local stub server, with and without single-flight coalescing
+
+Usage:
+    python benchmark_yelp_coalesce.py [--requests 2000] [--cities 10] [--concurrency 100] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.db.http_client import HTTPClient
+from app.services.yelp_coalescer import YelpRequestCoalescer
+from app.services.yelp_service import YelpService
+from benchmark_http_client import StubServer, make_service
+
+
+class UncachedYelpService(YelpService):
+    """Skips the response cache, so every call reaches the coalescer."""
+
+    async def _make_request(self, method, endpoint, params=None, cache_key=None, cache_ttl=3600):
+        return await super()._make_request(method, endpoint, params)
+
+
+async def run(service: YelpService, cities: list, concurrency: int) -> list:
+    """Per-call latencies in ms."""
+    remaining = iter(cities)
+    timings = []
+
+    async def worker():
+        for city in remaining:
+            start = time.perf_counter()
+            await service.search_businesses(location=city, sort_by="rating")
+            timings.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cities", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stub server think time")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    cities = [f"City {rng.randrange(args.cities)}" for _ in range(args.requests)]
+
+    server = StubServer(args.latency_ms / 1000)
+    base_url = await server.start()
+    http = HTTPClient()
+    print(f"{args.requests} searches over {args.cities} cities, {args.concurrency} concurrent, "
+          f"{args.latency_ms:.0f}ms server latency")
+    print(f"{'mode':>12} {'upstream':>9} {'ratio':>6} {'p50 ms':>8} {'total s':>8}")
+
+    for label, enabled in (("separate", False), ("coalesced", True)):
+        service = make_service(UncachedYelpService, base_url)
+        service.http = http
+        service.quota.enabled = False
+        service.coalescer = YelpRequestCoalescer(enabled=enabled)
+        before = server.requests
+        start = time.perf_counter()
+        timings = await run(service, cities, args.concurrency)
+        elapsed = time.perf_counter() - start
+        ratio = service.coalescer.stats()["coalesce_ratio"]
+        print(f"{label:>12} {server.requests - before:>9} {ratio:>6.2f} "
+              f"{statistics.median(timings):>8.1f} {elapsed:>8.2f}")
+
+    await http.disconnect()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
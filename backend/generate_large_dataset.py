@@ -21,6 +21,7 @@ from app.models.twin_relationship import TwinRelationship
 from app.models.interaction_log import InteractionLog
 from app.models.saved_restaurant import SavedRestaurant
 from app.core.security import get_password_hash
+from app.services.twin_recompute_service import twin_recompute_service
 
 # Configuration
 NUM_USERS = 1000
@@ -253,57 +254,11 @@ async def create_twin_relationships(db, users: List[User]):
     """Create twin relationships based on taste similarity"""
     print("\n🤝 Creating twin relationships...")
 
-    # Get all taste DNAs
-    result = await db.execute(select(TasteDNA))
-    taste_dnas = {td.user_id: td for td in result.scalars().all()}
-
-    relationships_created = 0
-
-    for user in users[:500]:  # Create relationships for first 500 users to save time
-        user_taste = taste_dnas[user.id]
-
-        # Find similar users
-        similarities = []
-        for other_user in users:
-            if other_user.id == user.id:
-                continue
-
-            other_taste = taste_dnas[other_user.id]
-
-            # Calculate simple similarity score
-            score = 1.0
-            score -= abs(user_taste.adventure_score - other_taste.adventure_score) * 0.3
-            score -= abs(user_taste.spice_tolerance - other_taste.spice_tolerance) * 0.2
-            score -= abs(user_taste.price_sensitivity - other_taste.price_sensitivity) * 0.2
-            score -= abs(user_taste.cuisine_diversity - other_taste.cuisine_diversity) * 0.3
+    def progress(done: int, total: int, rows: int):
+        print(f"  ✓ {done}/{total} blocks, {rows} relationships...")
 
-            # Cuisine overlap bonus
-            common_cuisines = set(user_taste.preferred_cuisines) & set(other_taste.preferred_cuisines)
-            score += len(common_cuisines) * 0.05
-
-            similarities.append((other_user.id, max(0, min(1, score))))
-
-        # Get top 20 twins
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        top_twins = similarities[:20]
-
-        for twin_id, similarity in top_twins:
-            if similarity > 0.5:  # Only create if reasonably similar
-                relationship = TwinRelationship(
-                    user_id=user.id,
-                    twin_user_id=twin_id,
-                    similarity_score=round(similarity, 3),
-                    common_cuisines=list(set(user_taste.preferred_cuisines) & set(taste_dnas[twin_id].preferred_cuisines))
-                )
-                db.add(relationship)
-                relationships_created += 1
-
-        if relationships_created % 500 == 0 and relationships_created > 0:
-            await db.commit()
-            print(f"  ✓ Created {relationships_created} relationships...")
-
-    await db.commit()
-    print(f"✅ Created {relationships_created} twin relationships")
+    stats = await twin_recompute_service.recompute_all(db, top_k=20, progress=progress)
+    print(f"✅ Created {stats['relationships']} twin relationships")
 
 
 async def create_interactions_and_saved_restaurants(db, users: List[User]):
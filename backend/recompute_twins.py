@@ -0,0 +1,52 @@
+"""
+TasteSync Twin Recompute Job
+Recomputes every user's Taste Twins with blocked all-pairs similarity
+
+Usage:
+    python recompute_twins.py [--top-k 50] [--workers 8] [--checkpoint twins.ckpt.json] [--upsert-vectors]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.db.session import async_session_maker, init_db
+from app.services.twin_recompute_service import twin_recompute_service
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=twin_recompute_service.DEFAULT_TOP_K)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--block-rows", type=int, default=None)
+    parser.add_argument("--checkpoint", default="twin_recompute.ckpt.json", help="resume file ('' to disable)")
+    parser.add_argument("--upsert-vectors", action="store_true", help="also write embeddings to the vector store")
+    args = parser.parse_args()
+
+    await init_db()
+    started = time.perf_counter()
+
+    def progress(done: int, total: int, rows: int):
+        elapsed = time.perf_counter() - started
+        print(f"  ✓ {done}/{total} blocks, {rows:,} relationships written ({elapsed:.1f}s)")
+
+    print("🤝 Recomputing Taste Twins...")
+    async with async_session_maker() as db:
+        stats = await twin_recompute_service.recompute_all(
+            db,
+            top_k=args.top_k,
+            workers=args.workers,
+            block_rows=args.block_rows,
+            checkpoint_path=args.checkpoint or None,
+            upsert_vectors=args.upsert_vectors,
+            progress=progress,
+        )
+
+    print(
+        f"✅ {stats['users']:,} users, {stats['relationships']:,} relationships "
+        f"in {stats['seconds']}s ({stats.get('resumed_blocks', 0)} blocks resumed from checkpoint)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
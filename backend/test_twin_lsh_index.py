@@ -0,0 +1,97 @@
+"""
+TasteSync Twin LSH Index Tests
+Checks candidate lookup over the sorted bands and the unbuilt tail, and
+that adds made while the index loads survive the swap
+
+Run with: pytest test_twin_lsh_index.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.twin_lsh_index import TwinLSHIndex
+
+
+def built_index(size: int = 1000, dim: int = 64) -> TwinLSHIndex:
+    rng = np.random.default_rng(3)
+    embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+    index = TwinLSHIndex(dim=dim)
+    index.build([str(i) for i in range(size)], embeddings)
+    return index
+
+
+def test_query_with_tail_but_no_band_hits_returns_nothing():
+    index = built_index()
+    added = np.ones(64, dtype=np.float32)
+    index.add("new", added)
+    assert index.size > index.built_size
+
+    # No sorted band matches, and every band differs from the tail row
+    index.band_offsets[:] = 0
+    bands = index._bands(index.signature(added))[0] ^ np.uint16(0xFFFF)
+    assert len(index._candidates(bands)) == 0
+
+
+def test_random_queries_after_add_do_not_fail():
+    index = built_index()
+    rng = np.random.default_rng(5)
+    index.add("new", rng.standard_normal(64).astype(np.float32))
+    for query in rng.standard_normal((500, 64)).astype(np.float32):
+        for user_id, score in index.query(query, 10):
+            assert -1.0 <= score <= 1.0
+
+
+def test_added_user_is_found_from_the_tail():
+    index = built_index()
+    added = np.random.default_rng(7).standard_normal(64).astype(np.float32)
+    index.add("new", added)
+    assert index.query(added, 1)[0][0] == "new"
+
+
+def test_add_replaces_the_previous_row():
+    index = built_index()
+    vector = np.random.default_rng(9).standard_normal(64).astype(np.float32)
+    index.add("5", vector)
+    index.add("5", -vector)
+    assert index.live[:index.size].sum() == 1000
+    assert index.ids[index.positions[b"5"]] == b"5"
+    assert index.query(-vector, 1)[0][0] == "5"
+
+
+class FakeStream:
+    """db.stream() result yielding TasteDNA-like rows, running a hook between chunks."""
+
+    def __init__(self, chunks, between):
+        self.chunks, self.between = chunks, between
+
+    def scalars(self):
+        return self
+
+    async def partitions(self, size):
+        for chunk in self.chunks:
+            yield chunk
+            self.between()
+
+
+def test_adds_during_a_reload_are_replayed():
+    rng = np.random.default_rng(11)
+    embeddings = rng.standard_normal((600, 64)).astype(np.float32)
+    rows = [
+        SimpleNamespace(user_id=str(i), to_dict=lambda i=i: {"row": i})
+        for i in range(len(embeddings))
+    ]
+    index = built_index()
+    index.embedding_service = SimpleNamespace(
+        generate_embeddings=lambda profiles: embeddings[[p["row"] for p in profiles]]
+    )
+    added = rng.standard_normal(64).astype(np.float32)
+    stream = FakeStream([rows[:300], rows[300:]], lambda: index.add("submitted", added))
+
+    async def stream_rows(statement):
+        return stream
+
+    asyncio.run(index.load(SimpleNamespace(stream=stream_rows)))
+    assert index.built_size == 600
+    assert index.query(added, 1)[0][0] == "submitted"
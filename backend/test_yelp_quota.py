@@ -0,0 +1,161 @@
+"""
+TasteSync Yelp Quota Tests
+Runs the shared token-bucket Lua script against Redis (fakeredis with
+Lua support by default, or a real server when REDIS_TEST_URL is set) and
+checks how coalesced calls use the quota
+
+Run with: pytest test_yelp_quota.py
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.core.exceptions import YelpQuotaExceededException
+from app.db.redis_client import redis_client
+from app.services.yelp_coalescer import YelpRequestCoalescer
+from app.services.yelp_quota import YelpQuotaGovernor, quota_lane
+
+
+def make_redis():
+    url = os.environ.get("REDIS_TEST_URL")
+    if url:
+        import redis.asyncio as redis
+        return redis.from_url(url, decode_responses=True)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def shared_redis():
+    client = make_redis()
+    previous = redis_client._client
+    redis_client._client = client
+    asyncio.run(client.delete(YelpQuotaGovernor.BUCKET_KEY, YelpQuotaGovernor.CONSUMED_KEY))
+    yield client
+    redis_client._client = previous
+
+
+def governor(rate: float = 1.0, burst: int = 4) -> YelpQuotaGovernor:
+    return YelpQuotaGovernor(rate=rate, burst=burst, enabled=True)
+
+
+def test_script_takes_tokens_from_the_shared_bucket(shared_redis):
+    async def run():
+        quota = governor()
+        for _ in range(4):
+            await quota.acquire("business", deadline=0)
+        with pytest.raises(YelpQuotaExceededException):
+            await quota.acquire("business", deadline=0)
+        return await shared_redis.hgetall(quota.BUCKET_KEY), await quota.cluster_consumed()
+
+    bucket, consumed = asyncio.run(run())
+    assert float(bucket["tokens"]) < 1
+    assert consumed == {"business": 4}
+
+
+def test_workers_share_one_bucket(shared_redis):
+    async def run():
+        first, second = governor(), governor()
+        for _ in range(2):
+            await first.acquire("search", deadline=0)
+            await second.acquire("business", deadline=0)
+        with pytest.raises(YelpQuotaExceededException):
+            await second.acquire("business", deadline=0)
+        return await first.cluster_consumed()
+
+    assert asyncio.run(run()) == {"search": 2, "business": 2}
+
+
+def test_background_lane_leaves_half_the_bucket(shared_redis):
+    async def run():
+        quota = governor()
+        for _ in range(2):
+            await quota.acquire("business", lane="background", deadline=0)
+        with pytest.raises(YelpQuotaExceededException):
+            await quota.acquire("business", lane="background", deadline=0)
+        for _ in range(2):
+            await quota.acquire("business", lane="user", deadline=0)
+
+    asyncio.run(run())
+
+
+def test_script_returns_fractional_waits(shared_redis):
+    async def run():
+        quota = governor(rate=4.0, burst=1)
+        assert await quota._take("business", 0.0) == 0.0
+        return await quota._take("business", 0.0)
+
+    wait = asyncio.run(run())
+    assert 0.0 < wait <= 0.25
+
+
+def test_coalesced_followers_keep_the_quota_error(shared_redis):
+    async def run():
+        leader, follower = YelpRequestCoalescer(wait=1.0), YelpRequestCoalescer(wait=1.0)
+        key = leader.request_key("GET", "/businesses/abc")
+
+        async def exhausted():
+            await asyncio.sleep(0.1)
+            raise YelpQuotaExceededException("business")
+
+        async def never_called():
+            raise AssertionError("follower should use the leader's result")
+
+        lead = asyncio.create_task(leader.run(key, exhausted))
+        await asyncio.sleep(0.02)
+        results = await asyncio.gather(lead, follower.run(key, never_called), return_exceptions=True)
+        return results, follower.stats()
+
+    results, stats = asyncio.run(run())
+    assert all(isinstance(error, YelpQuotaExceededException) for error in results)
+    assert results[1].status_code == 503
+    assert stats["remote_joins"] == 1
+
+
+def test_leader_only_releases_its_own_lock(shared_redis):
+    async def run():
+        coalescer = YelpRequestCoalescer(wait=1.0)
+        key = coalescer.request_key("GET", "/businesses/slow")
+        lock_key = f"{coalescer.KEY_PREFIX}:{key}"
+
+        async def slow():
+            # Our lock expires mid-call and another worker takes it
+            assert await shared_redis.ttl(lock_key) >= coalescer.LOCK_TTL - 1
+            await shared_redis.set(lock_key, "other-leader", ex=60)
+            return {"id": "slow"}
+
+        result = await coalescer.run(key, slow)
+        return result, await shared_redis.get(lock_key), await shared_redis.get(f"{lock_key}:result")
+
+    result, lock, published = asyncio.run(run())
+    assert result == {"id": "slow"}
+    assert lock == "other-leader"
+    assert published is not None
+
+
+def test_shared_call_is_promoted_when_a_user_joins():
+    async def run():
+        quota = governor(rate=0.5, burst=2)
+        await quota.acquire("business", deadline=0)  # Leaves 1 token: under the background reserve
+        coalescer = YelpRequestCoalescer(cross_worker=False)
+        key = coalescer.request_key("GET", "/businesses/abc")
+
+        async def call():
+            await quota.acquire("business")
+            return {"id": "abc"}
+
+        start = time.monotonic()
+        with quota_lane("background"):
+            refresh = asyncio.create_task(coalescer.run(key, call))
+        await asyncio.sleep(0.1)
+        user = await coalescer.run(key, call)
+        return user, await refresh, time.monotonic() - start, quota.stats()["lanes"]
+
+    user, refresh, elapsed, lanes = asyncio.run(run())
+    assert user == refresh == {"id": "abc"}
+    assert elapsed < 1.0  # A background token would take 2s to refill
+    assert lanes["user"]["granted"] == 2 and lanes["background"]["granted"] == 0
@@ -153,12 +153,14 @@ export default function RestaurantPage() {
                 <span>{restaurant.phone}</span>
               </div>
             )}
-            <div className="flex items-center gap-2">
-              <Clock className="w-5 h-5 flex-shrink-0 text-[#ADB5BD]" />
-              <span className={restaurant.is_closed ? "text-[#FF6B6B]" : "text-[#51CF66]"}>
-                {restaurant.is_closed ? "Closed" : "Open Now"}
-              </span>
-            </div>
+            {restaurant.is_closed != null && (
+              <div className="flex items-center gap-2">
+                <Clock className="w-5 h-5 flex-shrink-0 text-[#ADB5BD]" />
+                <span className={restaurant.is_closed ? "text-[#FF6B6B]" : "text-[#51CF66]"}>
+                  {restaurant.is_closed ? "Closed" : "Open Now"}
+                </span>
+              </div>
+            )}
           </div>
         </div>
 
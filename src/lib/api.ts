@@ -451,8 +451,8 @@ export interface SearchResponse {
 export interface RestaurantDetail extends Restaurant {
   photos: string[]
   phone: string
-  hours: { day: number; start: string; end: string; is_overnight: boolean }[]
-  is_closed: boolean
+  hours: { day: number; start: string; end: string; is_overnight: boolean }[] | null
+  is_closed: boolean | null
   url: string
 }
 